@@ -0,0 +1,321 @@
+"""Offline throughput benchmark for the crawl, GitHub listing and download pipelines.
+
+Serves a generated documentation site and a fake GitHub (API, raw files and tarballs) from a
+local server, then runs each scenario in a fresh interpreter and records pages/sec, peak RSS,
+requests issued and browser launches. Results are written as JSON; pass `--compare` with an
+earlier results file to fail on regressions.
+
+    uv run python benchmarks/pipeline.py --pages 500 --output benchmarks/results/main.json
+    uv run python benchmarks/pipeline.py --compare benchmarks/results/main.json
+"""
+
+import argparse
+from datetime import UTC, datetime
+import gzip
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import io
+import json
+import os
+from pathlib import Path
+import random
+import subprocess
+import sys
+import tarfile
+import tempfile
+import threading
+
+SCENARIOS = ["crawl", "github-list", "download-raw", "download-tarball"]
+
+# Metrics where a larger value is a regression
+_LOWER_IS_BETTER = ["seconds", "peak_rss_mb", "requests", "browser_launches"]
+
+_WORDS = ["api", "async", "cache", "client", "config", "crawl", "docs", "file", "guide", "index", "page", "queue"]
+
+_OWNER, _REPO, _SHA = "bench", "docs", "0123456789abcdef0123456789abcdef01234567"
+
+
+class FakeSite:
+    """A generated docs site and GitHub repo, with the same pages in both."""
+
+    def __init__(self, pages: int, depth: int, page_kb: float, seed: int = 0):
+        self.depth = depth
+        # Each page links to `fanout` children, enough for `pages` pages within `depth` levels
+        fanout = 1
+        while sum(fanout**d for d in range(depth + 1)) < pages:
+            fanout += 1
+
+        rng = random.Random(seed)
+        self.paths = ["index"]
+        self.children: dict[int, list[int]] = {}
+        for i in range(1, pages):
+            parent = (i - 1) // fanout
+            self.children.setdefault(parent, []).append(i)
+            self.paths.append(f"{self.paths[parent].removesuffix('/index')}/page-{i}/index".removeprefix("index/"))
+        self._index = {path: i for i, path in enumerate(self.paths)}
+
+        words = int(page_kb * 1024 / 7)
+        self.bodies = [" ".join(rng.choice(_WORDS) for _ in range(words)) for _ in range(pages)]
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._tarball: bytes | None = None
+
+    def count(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def html(self, i: int) -> str:
+        links = [f'<a href="/docs/{self.paths[c]}.html">Page {c}</a>' for c in self.children.get(i, [])]
+        if i:
+            links.append('<a href="/docs/index.html">Home</a>')
+        paragraphs = "".join(f"<p>{self.bodies[i][j : j + 400]}</p>" for j in range(0, len(self.bodies[i]), 400))
+        return f"<html><body><main><h1>Page {i}</h1>{paragraphs}<nav>{''.join(links)}</nav></main></body></html>"
+
+    def markdown(self, i: int) -> str:
+        return f"# Page {i}\n\n{self.bodies[i]}\n"
+
+    def sitemap(self, origin: str) -> str:
+        urls = "".join(f"<url><loc>{origin}/docs/{path}.html</loc></url>" for path in self.paths)
+        return f'<?xml version="1.0"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{urls}</urlset>'
+
+    def tree(self) -> dict:
+        items = [{"path": f"docs/{path}.md", "type": "blob", "sha": f"{i:040x}"} for i, path in enumerate(self.paths)]
+        return {"sha": _SHA, "tree": items, "truncated": False}
+
+    def tarball(self) -> bytes:
+        if self._tarball is None:
+            buffer = io.BytesIO()
+            with tarfile.open(fileobj=buffer, mode="w") as tar:
+                for i, path in enumerate(self.paths):
+                    data = self.markdown(i).encode()
+                    info = tarfile.TarInfo(f"{_OWNER}-{_REPO}-{_SHA[:7]}/docs/{path}.md")
+                    info.size = len(data)
+                    tar.addfile(info, io.BytesIO(data))
+            self._tarball = gzip.compress(buffer.getvalue())
+        return self._tarball
+
+    def route(self, host: str, path: str, origin: str) -> tuple[int, str, bytes]:
+        """Get (status, content type, body) for a request."""
+        if host == "api.github.com":
+            if path == f"/repos/{_OWNER}/{_REPO}/commits/HEAD":
+                return 200, "text/plain", _SHA.encode()
+            if path.startswith(f"/repos/{_OWNER}/{_REPO}/git/trees/{_SHA}"):
+                return 200, "application/json", json.dumps(self.tree()).encode()
+        elif host == "raw.githubusercontent.com":
+            prefix = f"/{_OWNER}/{_REPO}/{_SHA}/docs/"
+            if path.startswith(prefix) and path.endswith(".md"):
+                name = path[len(prefix) : -len(".md")]
+                if name in self._index:
+                    return 200, "text/plain", self.markdown(self._index[name]).encode()
+        elif host == "codeload.github.com":
+            if path == f"/{_OWNER}/{_REPO}/tar.gz/{_SHA}":
+                return 200, "application/x-gzip", self.tarball()
+        elif path == "/sitemap.xml":
+            return 200, "application/xml", self.sitemap(origin).encode()
+        elif path.startswith("/docs/") and path.endswith(".html"):
+            name = path.removeprefix("/docs/").removesuffix(".html")
+            if name in self._index:
+                return 200, "text/html; charset=utf-8", self.html(self._index[name]).encode()
+        return 404, "text/plain", b"not found"
+
+
+def _serve(site: FakeSite) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self) -> None:
+            site.count()
+            host = self.headers.get("Host", "").split(":")[0]
+            origin = f"http://{self.headers.get('Host')}"
+            status, content_type, body = site.route(host, self.path.split("?")[0], origin)
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: object) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# Runs in a fresh interpreter so peak RSS and imports belong to one scenario only
+_CHILD = """
+import asyncio, json, resource, sys, tempfile, time
+from pathlib import Path
+
+import crawl4ai
+import httpx
+
+from docs_updater.crawler import crawl_docs
+from docs_updater.downloader import download_all
+from docs_updater.github_source import get_github_files
+from docs_updater.http_cache import HttpCache
+from docs_updater.http_client import DEFAULT_LIMITS, create_http_client
+from docs_updater.scheduler import SchedulerConfig
+
+scenario, port, host_rate, depth = sys.argv[1], int(sys.argv[2]), float(sys.argv[3]), int(sys.argv[4])
+
+launches = 0
+_start = crawl4ai.AsyncWebCrawler.start
+
+async def counting_start(self, *args, **kwargs):
+    global launches
+    launches += 1
+    return await _start(self, *args, **kwargs)
+
+crawl4ai.AsyncWebCrawler.start = counting_start
+
+
+class LocalTransport(httpx.AsyncBaseTransport):
+    # Sends every request to the local server; the Host header keeps the original host for routing
+    def __init__(self):
+        self.inner = httpx.AsyncHTTPTransport(limits=DEFAULT_LIMITS)
+
+    async def handle_async_request(self, request):
+        request.url = request.url.copy_with(scheme="http", host="127.0.0.1", port=port)
+        return await self.inner.handle_async_request(request)
+
+    async def aclose(self):
+        await self.inner.aclose()
+
+
+async def main():
+    tmp = Path(tempfile.mkdtemp())
+    config = SchedulerConfig(default_rate=host_rate, default_burst=host_rate, host_rates={})
+    client = create_http_client(LocalTransport(), config)
+    cache = HttpCache(tmp / "cache.sqlite")
+    baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.perf_counter()
+    if scenario == "crawl":
+        crawl = await crawl_docs(
+            f"http://127.0.0.1:{port}/docs/index.html", max_depth=depth + 1, max_pages=1_000_000,
+            client=client, cache=cache,
+        )
+        files = crawl.files
+        pages = len(files)
+    else:
+        files = await get_github_files("https://github.com/bench/docs", client, cache)
+        if scenario != "github-list":
+            threshold = 1 if scenario == "download-tarball" else len(files) + 1
+            results = [r async for r in download_all(files, tmp / "out", client=client, tarball_threshold=threshold)]
+            files = [r for r in results if r.ok]
+        pages = len(files)
+    seconds = time.perf_counter() - start
+
+    await client.aclose()
+    cache.close()
+    print(json.dumps({
+        "pages": pages,
+        "seconds": round(seconds, 3),
+        "pages_per_sec": round(pages / seconds, 1) if seconds else 0.0,
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "baseline_rss_mb": round(baseline_rss / 1024, 1),
+        "browser_launches": launches,
+    }))
+
+asyncio.run(main())
+"""
+
+
+def _run_scenario(scenario: str, site: FakeSite, port: int, host_rate: float) -> dict:
+    site.requests = 0
+    with tempfile.TemporaryDirectory() as cache_dir:
+        env = {**os.environ, "DOCS_UPDATER_CACHE_DIR": cache_dir, "GITHUB_TOKEN": ""}
+        output = subprocess.run(
+            [sys.executable, "-c", _CHILD, scenario, str(port), str(host_rate), str(site.depth)],
+            check=True,
+            capture_output=True,
+            text=True,
+            env=env,
+        ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    result["requests"] = site.requests
+    return result
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"], check=True, capture_output=True, text=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """List every metric that got worse than the baseline by more than `tolerance` (a fraction)."""
+    regressions = []
+    for scenario, metrics in results["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(scenario)
+        if not before:
+            continue
+        if metrics["pages_per_sec"] < before["pages_per_sec"] * (1 - tolerance):
+            regressions.append(f"{scenario}: pages/sec {before['pages_per_sec']} -> {metrics['pages_per_sec']}")
+        for metric in _LOWER_IS_BETTER:
+            if metrics[metric] > before[metric] * (1 + tolerance) and metrics[metric] - before[metric] > 1:
+                regressions.append(f"{scenario}: {metric} {before[metric]} -> {metrics[metric]}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=300, help="Pages in the generated site and repo")
+    parser.add_argument("--depth", type=int, default=3, help="Link depth of the generated site")
+    parser.add_argument("--page-kb", type=float, default=8, help="Approximate size of each page")
+    parser.add_argument(
+        "--host-rate",
+        type=float,
+        default=1000,
+        help="Per-host request rate for the scheduler; lower it to benchmark with production pacing",
+    )
+    parser.add_argument("--scenario", choices=SCENARIOS, action="append", help="Run only these (repeatable)")
+    parser.add_argument("--output", type=Path, help="Write results JSON here")
+    parser.add_argument("--compare", type=Path, help="Fail if results regress against this results JSON")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed regression as a fraction")
+    args = parser.parse_args()
+
+    site = FakeSite(args.pages, args.depth, args.page_kb)
+    server = _serve(site)
+    port = server.server_address[1]
+
+    results = {
+        "revision": _git_revision(),
+        "timestamp": datetime.now(UTC).isoformat(),
+        "python": sys.version.split()[0],
+        "params": {"pages": args.pages, "depth": args.depth, "page_kb": args.page_kb, "host_rate": args.host_rate},
+        "scenarios": {},
+    }
+    try:
+        for scenario in args.scenario or SCENARIOS:
+            metrics = _run_scenario(scenario, site, port, args.host_rate)
+            results["scenarios"][scenario] = metrics
+            print(
+                f"{scenario:17} {metrics['pages']:5} pages  {metrics['pages_per_sec']:8.1f} pages/s  "
+                f"{metrics['peak_rss_mb']:7.1f} MB peak  {metrics['requests']:5} requests  "
+                f"{metrics['browser_launches']} browser launches"
+            )
+    finally:
+        server.shutdown()
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"Wrote {args.output}")
+
+    if args.compare:
+        if results["params"] != (baseline := json.loads(args.compare.read_text())).get("params"):
+            print(f"WARNING: parameters differ from {args.compare}, comparison may not be meaningful")
+        regressions = _compare(results, baseline, args.tolerance)
+        if regressions:
+            print("FAIL: " + "; ".join(regressions))
+            sys.exit(1)
+        print(f"OK: no regressions against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
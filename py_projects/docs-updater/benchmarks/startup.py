@@ -0,0 +1,97 @@
+"""Cold-start regression benchmark for docs-updater.
+
+Starts the TUI headless in a fresh interpreter, waits for its first frame and exits. Fails if
+that takes longer than the budget, or if any heavy dependency was imported before a fetch was
+requested.
+
+    uv run python benchmarks/startup.py --budget-ms 800
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+# Modules that must not be loaded just to show the first screen. They are slow to import, so the
+# modules that use them import them inside the functions that need them, with the module-level
+# imports kept under TYPE_CHECKING for annotations only
+HEAVY_MODULES = ["crawl4ai", "playwright", "httpx", "pydantic", "openai", "azure.identity", "tiktoken"]
+
+_CHILD = """
+import json, sys
+from docs_updater.app import DocsUpdaterApp
+
+async def auto_pilot(pilot):
+    await pilot.pause()
+    pilot.app.exit()
+
+DocsUpdaterApp().run(headless=True, auto_pilot=auto_pilot)
+print(json.dumps(sorted(m for m in {heavy} if m in sys.modules)))
+"""
+
+
+def _run_once() -> tuple[float, list[str]]:
+    start = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-c", _CHILD.format(heavy=HEAVY_MODULES)],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    return elapsed_ms, json.loads(output.strip().splitlines()[-1])
+
+
+def _import_breakdown(top: int) -> list[tuple[int, str]]:
+    """Get the slowest imports (cumulative microseconds) from `python -X importtime`."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import docs_updater.app"],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stderr
+
+    timings = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        timings.append((int(cumulative), name.strip()))
+    return sorted(timings, reverse=True)[:top]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=800, help="Max median cold start to first frame")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    timings = []
+    heavy: set[str] = set()
+    for _ in range(args.runs):
+        elapsed_ms, loaded = _run_once()
+        timings.append(elapsed_ms)
+        heavy.update(loaded)
+
+    median = statistics.median(timings)
+    print(f"Cold start to first frame: median {median:.0f} ms, min {min(timings):.0f} ms over {args.runs} runs")
+    print("Slowest imports (cumulative):")
+    for cumulative, name in _import_breakdown(top=10):
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    failures = []
+    if median > args.budget_ms:
+        failures.append(f"median {median:.0f} ms is over the {args.budget_ms:.0f} ms budget")
+    if heavy:
+        failures.append(f"heavy modules imported at startup: {', '.join(sorted(heavy))}")
+
+    if failures:
+        print("FAIL: " + "; ".join(failures))
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,522 @@
+"""Textual TUI for docs-updater."""
+
+import asyncio
+from pathlib import Path
+import sys
+from typing import TYPE_CHECKING, ClassVar
+from urllib.parse import urlparse
+
+from loguru import logger
+from textual import on, work
+from textual.app import App, ComposeResult
+from textual.containers import Container, Horizontal, HorizontalGroup, ScrollableContainer
+from textual.screen import Screen
+from textual.widgets import Button, Footer, Header, Input, Label, LoadingIndicator, Tree
+from textual.widgets.tree import TreeNode
+
+from docs_updater.manifest import Manifest
+from docs_updater.models import MarkdownFile
+from docs_updater.progress import ProgressTracker
+from docs_updater.resources import close_shared_resources
+from docs_updater.selection import SelectionTree
+
+# The crawler and downloader pull in crawl4ai (Playwright), httpx and pydantic, so they are
+# imported when a fetch is first requested rather than here, to keep startup fast.
+if TYPE_CHECKING:
+    from docs_updater.downloader import DownloadResult
+
+
+class FileSelectionScreen(Screen):
+    """Screen for selecting files to download."""
+
+    CSS = """
+    #file-tree {
+        height: 75%;
+        border: solid $primary;
+        margin: 1 0;
+    }
+    
+    .button-row {
+        margin: 2 0;
+        align: center middle;
+        height: 3;
+    }
+    
+    #selection-count {
+        color: $text-muted;
+        text-style: italic;
+    }
+    """
+
+    def __init__(self, files: list[MarkdownFile], folder_name: str):
+        super().__init__()
+        self.files = files
+        self.folder_name = folder_name
+        self.selection = SelectionTree(files)
+        # Directory nodes that have been created so far, keyed by directory path
+        self._dir_nodes: dict[str, TreeNode] = {}
+
+    def compose(self) -> ComposeResult:
+        """Create the UI for file selection."""
+        yield Header()
+        yield Container(
+            Label("Select files to download (click to toggle selection):", classes="title"),
+            ScrollableContainer(
+                Tree("Files"),
+                id="file-tree",
+            ),
+            Label("0 files selected", id="selection-count", classes="status-label"),
+            Horizontal(
+                Button("Select All", id="select-all", variant="primary"),
+                Button("Deselect All", id="deselect-all"),
+                Button("Download Selected", id="download", variant="success"),
+                Button("Cancel", id="cancel", variant="error"),
+                classes="button-row",
+            ),
+            id="main-container",
+        )
+        yield Footer()
+
+    def on_mount(self) -> None:
+        """Populate the top level of the tree; deeper levels are added as they are expanded."""
+        tree = self.query_one(Tree)
+        tree.show_root = False
+        self._populate(tree.root, "")
+        self.update_selection_count()
+
+    def _populate(self, parent: TreeNode, dir_path: str) -> None:
+        """Add the direct children of a directory to its tree node."""
+        dirs, files = self.selection.list_dir(dir_path)
+        for directory in dirs:
+            node = parent.add(self._get_dir_label(directory.path), data=directory.path, allow_expand=True)
+            self._dir_nodes[directory.path] = node
+        for file in files:
+            parent.add_leaf(self._get_file_label(file, self.selection.is_selected(file)), data=file)
+
+    @on(Tree.NodeExpanded)
+    def on_tree_node_expanded(self, event: Tree.NodeExpanded) -> None:
+        """Lazily add a directory's children the first time it is expanded."""
+        node = event.node
+        if isinstance(node.data, str) and not node.children:
+            self._populate(node, node.data)
+
+    def update_selection_count(self) -> None:
+        """Update the selection count label."""
+        count_label = self.query_one("#selection-count", Label)
+        selected = self.selection.selected
+        total = self.selection.total
+
+        if selected == 0:
+            count_label.update("No files selected")
+        elif selected == total:
+            count_label.update(f"All {total} files selected")
+        else:
+            count_label.update(f"{selected} of {total} files selected")
+
+    def _get_file_label(self, file: MarkdownFile, selected: bool) -> str:
+        """Get the label for a file node."""
+        filename = file.path.split("/")[-1]
+        return f"✅ 📄 {filename}" if selected else f"📄 {filename}"
+
+    def _get_dir_label(self, dir_path: str) -> str:
+        """Get the label for a directory node, with how many of its files are selected."""
+        name = dir_path.rsplit("/", 1)[-1]
+        selected, total = self.selection.dir_counts(dir_path)
+        if selected == 0:
+            return f"📁 {name}"
+        if selected == total:
+            return f"✅ 📁 {name}"
+        return f"📁 {name} ({selected}/{total})"
+
+    def _refresh_labels(self, dir_path: str) -> None:
+        """Re-render the labels of nodes affected by a change under a directory.
+
+        Only nodes that exist (i.e. whose parent was expanded) are touched: the directory's
+        ancestors, plus the directory itself and whatever has been expanded beneath it.
+        """
+        parts = dir_path.split("/") if dir_path else []
+        for i in range(1, len(parts) + 1):
+            ancestor = "/".join(parts[:i])
+            self._dir_nodes[ancestor].set_label(self._get_dir_label(ancestor))
+
+        prefix = f"{dir_path}/" if dir_path else ""
+        for path, node in self._dir_nodes.items():
+            if path.startswith(prefix) and path != dir_path:
+                node.set_label(self._get_dir_label(path))
+            if (path == dir_path or path.startswith(prefix)) and node.is_expanded:
+                self._refresh_file_labels(node)
+        if not dir_path:
+            self._refresh_file_labels(self.query_one(Tree).root)
+
+    def _refresh_file_labels(self, node: TreeNode) -> None:
+        for child in node.children:
+            if isinstance(child.data, MarkdownFile):
+                child.set_label(self._get_file_label(child.data, self.selection.is_selected(child.data)))
+
+    @on(Tree.NodeSelected)
+    def on_tree_node_selected(self, event: Tree.NodeSelected) -> None:
+        """Toggle selection of a file, or of everything in a directory, on click."""
+        data = event.node.data
+        if isinstance(data, MarkdownFile):
+            self.selection.toggle_file(data)
+            event.node.set_label(self._get_file_label(data, self.selection.is_selected(data)))
+            self._refresh_labels(data.path.rpartition("/")[0])
+        elif isinstance(data, str):
+            self.selection.toggle_dir(data)
+            self._refresh_labels(data)
+        self.update_selection_count()
+
+    @on(Button.Pressed, "#select-all")
+    def action_select_all(self) -> None:
+        """Select all files."""
+        self.selection.set_dir("", True)
+        self._refresh_labels("")
+        self.update_selection_count()
+
+    @on(Button.Pressed, "#deselect-all")
+    def action_deselect_all(self) -> None:
+        """Deselect all files."""
+        self.selection.set_dir("", False)
+        self._refresh_labels("")
+        self.update_selection_count()
+
+    @on(Button.Pressed, "#download")
+    def action_download(self) -> None:
+        """Download selected files."""
+        if not self.selection.selected:
+            self.notify("No files selected", severity="warning")
+            return
+
+        selected = sorted(self.selection.selected_files(), key=lambda f: f.path)
+        self.app.pop_screen()
+
+        if isinstance(self.app, DocsUpdaterApp):
+            self.app.download_files(selected, self.folder_name)
+
+    @on(Button.Pressed, "#cancel")
+    def action_cancel(self) -> None:
+        """Cancel and return to main screen."""
+        self.app.pop_screen()
+
+
+class DocsUpdaterApp(App):
+    """A Textual app for updating documentation."""
+
+    CSS = """
+    #main-container {
+        padding: 1;
+    }
+
+    .title {
+        text-style: bold;
+        margin: 1 0;
+    }
+
+    Input {
+        margin: 1 0;
+    }
+
+    Button {
+        margin: 1 2;
+    }
+
+    LoadingIndicator {
+        height: 3;
+        margin: 2;
+    }
+
+    .status-label {
+        margin: 1;
+        text-align: center;
+    }
+    """
+
+    BINDINGS: ClassVar = [
+        ("escape", "quit", "Quit"),
+    ]
+
+    def __init__(self, download_concurrency: int = 8, per_host_rate: float | None = None):
+        super().__init__()
+        self.download_concurrency = download_concurrency
+        self.per_host_rate = per_host_rate
+        if per_host_rate:
+            from docs_updater.http_client import configure_http_client
+            from docs_updater.scheduler import scheduler_config
+
+            configure_http_client(scheduler_config(per_host_rate))
+        self.source_url = ""
+        # Progress of the fetch or download currently running, if any
+        self.tracker: ProgressTracker | None = None
+
+    def compose(self) -> ComposeResult:
+        """Create the main UI."""
+        yield Header()
+        yield Container(
+            Label("Enter URL (GitHub repo or documentation website):", classes="title"),
+            Input(
+                placeholder="https://github.com/user/repo or https://docs.example.com",
+                id="url-input",
+            ),
+            Label("Enter folder name (will be saved to ai_context/docs/<name>):", classes="title"),
+            Input(
+                placeholder="my-docs",
+                id="folder-input",
+            ),
+            Label("Optional crawl link rules (+include -exclude, e.g. +/v2/ -*changelog*):", classes="title"),
+            Input(
+                placeholder="+/api/ -*/blog/*",
+                id="rules-input",
+            ),
+            HorizontalGroup(
+                Button("Fetch Documentation", id="fetch-btn", variant="primary"),
+                Button("Refresh Existing", id="refresh-btn"),
+            ),
+            id="main-container",
+        )
+        yield Footer()
+
+    def on_mount(self) -> None:
+        """Start refreshing the progress line."""
+        self.set_interval(0.5, self._update_progress)
+
+    async def on_unmount(self) -> None:
+        """Shut down the shared browser, HTTP client and cache when the app exits."""
+        await close_shared_resources()
+
+    def _get_inputs(self) -> tuple[str, str] | None:
+        """Get and validate input values."""
+        url_input = self.query_one("#url-input", Input)
+        folder_input = self.query_one("#folder-input", Input)
+
+        url = url_input.value.strip()
+        folder_name = folder_input.value.strip()
+
+        if not url:
+            self.notify("Please enter a URL", severity="error")
+            return None
+
+        if not folder_name:
+            self.notify("Please enter a folder name", severity="error")
+            return None
+
+        return url, folder_name
+
+    def _show_loading(self, message: str) -> None:
+        """Show loading indicator with message, a live progress line and a cancel button."""
+        container = self.query_one("#main-container", Container)
+        container.mount(LoadingIndicator())
+        container.mount(Label(message, classes="status-label"))
+        container.mount(Label("", id="progress-label", classes="status-label"))
+        container.mount(Button("Cancel", id="cancel-fetch-btn", variant="error"))
+
+    def _hide_loading(self) -> None:
+        """Remove loading indicator, status labels and cancel button."""
+        self.tracker = None
+        container = self.query_one("#main-container", Container)
+        for widget in container.query("LoadingIndicator, .status-label, #cancel-fetch-btn"):
+            widget.remove()
+
+    def _track_progress(self) -> ProgressTracker:
+        """Start tracking a new phase of work, returning the tracker to pass as a progress callback."""
+        self.tracker = ProgressTracker()
+        return self.tracker
+
+    def _update_progress(self) -> None:
+        """Render files/sec, ETA and counts for the work in progress."""
+        if self.tracker is None:
+            return
+        for label in self.query("#progress-label").results(Label):
+            label.update(self.tracker.format())
+
+    @on(Button.Pressed, "#cancel-fetch-btn")
+    async def action_cancel_fetch(self) -> None:
+        """Cancel the running fetch or download and tear down its in-flight work."""
+        # Cancelling the worker cancels its in-flight requests; the browser is closed too so that
+        # pages mid-render stop immediately. Both are recreated on the next fetch.
+        self.workers.cancel_group(self, "default")
+        if "docs_updater.browser_pool" in sys.modules:
+            from docs_updater.browser_pool import close_browser_pool
+
+            await close_browser_pool()
+
+        self._hide_loading()
+        self.notify("Cancelled", severity="warning")
+
+    @on(Button.Pressed, "#fetch-btn")
+    def on_fetch_pressed(self) -> None:
+        """Handle fetch button press."""
+        inputs = self._get_inputs()
+        if inputs:
+            url, folder_name = inputs
+            self.fetch_documentation(url, folder_name)
+
+    @on(Button.Pressed, "#refresh-btn")
+    def on_refresh_pressed(self) -> None:
+        """Handle refresh button press."""
+        folder_name = self.query_one("#folder-input", Input).value.strip()
+        if not folder_name:
+            self.notify("Please enter a folder name", severity="error")
+            return
+
+        # The URL defaults to the source recorded when the folder was first downloaded
+        url = self.query_one("#url-input", Input).value.strip() or Manifest.load(self._output_dir(folder_name)).source
+        if not url:
+            self.notify("Please enter a URL", severity="error")
+            return
+
+        self.refresh_documentation(url, folder_name)
+
+    @staticmethod
+    def _output_dir(folder_name: str) -> Path:
+        return Path.cwd() / "ai_context" / "docs" / folder_name
+
+    @staticmethod
+    async def _index_folder(output_dir: Path) -> str:
+        """Write the folder's token index, returning e.g. " (12,345 tokens)" for the status message."""
+        from docs_updater.tokens import report_folder
+
+        try:
+            report = await asyncio.to_thread(report_folder, output_dir)
+        except Exception as e:
+            # Counting needs the tokenizer, which is downloaded on first use; a download works without it
+            logger.warning(f"Could not count tokens in {output_dir}: {e}")
+            return ""
+        return f" ({report.total:,} tokens)"
+
+    async def _list_files(self, url: str) -> list[MarkdownFile]:
+        """List the markdown files available at a GitHub repo or documentation site."""
+        from docs_updater.crawler import crawl_docs
+        from docs_updater.github_source import get_github_files
+        from docs_updater.journal import Journal
+        from docs_updater.url_filter import UrlFilter, parse_rules
+
+        parsed = urlparse(url)
+        if "github.com" in (parsed.hostname or ""):
+            return await get_github_files(url)
+
+        include, exclude = parse_rules(self.query_one("#rules-input", Input).value)
+        url_filter = UrlFilter(url, include=include, exclude=exclude)
+        # An interrupted crawl of the same URL picks up where it stopped; the journal is kept
+        # until the pages are saved, see _finish_crawl
+        journal = Journal.open("crawl", url)
+        try:
+            crawl = await crawl_docs(url, progress=self._track_progress(), url_filter=url_filter, journal=journal)
+        finally:
+            journal.close()
+        return crawl.files
+
+    @staticmethod
+    def _finish_crawl(url: str) -> None:
+        """Delete the journal of the crawl that listed `url`, once its pages have been saved."""
+        from docs_updater.journal import Journal, journal_path
+
+        if journal_path("crawl", url).exists():
+            Journal.open("crawl", url).finish()
+
+    @work(exclusive=True)
+    async def fetch_documentation(self, url: str, folder_name: str) -> None:
+        """Fetch documentation from the URL."""
+        self._show_loading("Fetching documentation...")
+
+        try:
+            files = await self._list_files(url)
+            self.source_url = url
+
+            self._hide_loading()
+
+            if not files:
+                self.notify("No markdown files found", severity="warning")
+                return
+
+            # Show file selection screen
+            self.push_screen(FileSelectionScreen(files, folder_name))
+
+        except Exception as e:
+            logger.error(f"Error fetching documentation: {e}")
+            self.notify(f"Error: {e!s}", severity="error")
+            self._hide_loading()
+
+    @work(exclusive=True)
+    async def download_files(self, files: list[MarkdownFile], folder_name: str) -> None:
+        """Download and save selected files."""
+        from docs_updater.downloader import download_all
+        from docs_updater.journal import Journal
+
+        self._show_loading(f"Downloading {len(files)} files...")
+
+        try:
+            output_dir = self._output_dir(folder_name)
+            output_dir.mkdir(parents=True, exist_ok=True)
+            manifest = Manifest.load(output_dir)
+            manifest.source = self.source_url or manifest.source
+
+            # Files are written as they finish; a failed file does not stop the rest of the batch
+            failed: list[DownloadResult] = []
+            progress = self._track_progress()
+            # Files saved by an interrupted download into the same folder are not fetched again
+            journal = Journal.open("download", str(output_dir.resolve()))
+            try:
+                async for result in download_all(
+                    files, output_dir, self.download_concurrency, progress=progress, journal=journal
+                ):
+                    if result.ok:
+                        manifest.record(result.file)
+                    else:
+                        failed.append(result)
+            finally:
+                # Record whatever was written, even if the download was cancelled part way
+                manifest.save(output_dir)
+                journal.close()
+            journal.finish()
+            self._finish_crawl(self.source_url)
+            tokens = await self._index_folder(output_dir)
+
+            self._hide_loading()
+
+            saved = len(files) - len(failed)
+            message = f"Successfully downloaded {saved} files to ai_context/docs/{folder_name}{tokens}"
+            if failed:
+                message += f" ({len(failed)} failed)"
+                self.notify(message, severity="warning")
+            else:
+                self.notify(message, severity="information")
+            logger.info(message)
+
+        except Exception as e:
+            logger.error(f"Error downloading files: {e}")
+            self.notify(f"Error: {e!s}", severity="error")
+            self._hide_loading()
+
+    @work(exclusive=True)
+    async def refresh_documentation(self, url: str, folder_name: str) -> None:
+        """Download only what changed since the folder was last downloaded."""
+        from docs_updater.downloader import refresh_folder
+
+        self._show_loading("Refreshing documentation...")
+
+        try:
+            files = await self._list_files(url)
+            plan, failed = await refresh_folder(
+                files,
+                self._output_dir(folder_name),
+                url,
+                self.download_concurrency,
+                progress=self._track_progress(),
+            )
+            self._finish_crawl(url)
+            tokens = await self._index_folder(self._output_dir(folder_name))
+
+            self._hide_loading()
+
+            message = f"Refreshed ai_context/docs/{folder_name}: {plan.summary()}{tokens}"
+            if failed:
+                message += f" ({len(failed)} failed)"
+                self.notify(message, severity="warning")
+            else:
+                self.notify(message, severity="information")
+            logger.info(message)
+
+        except Exception as e:
+            logger.error(f"Error refreshing documentation: {e}")
+            self.notify(f"Error: {e!s}", severity="error")
+            self._hide_loading()
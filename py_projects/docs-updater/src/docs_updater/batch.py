@@ -0,0 +1,222 @@
+"""Non-interactive sync of many documentation sources from a config file."""
+
+import asyncio
+from dataclasses import dataclass, field
+from fnmatch import fnmatchcase
+from pathlib import Path
+import tomllib
+from urllib.parse import urlparse
+
+from loguru import logger
+
+from docs_updater.crawler import crawl_docs
+from docs_updater.downloader import refresh_folder
+from docs_updater.github_source import get_github_files
+from docs_updater.http_client import configure_http_client
+from docs_updater.journal import Journal
+from docs_updater.models import MarkdownFile
+from docs_updater.progress import LoggingProgress
+from docs_updater.resources import close_shared_resources
+from docs_updater.scheduler import SchedulerConfig, scheduler_config
+from docs_updater.tokens import chunk_folder, chunks_dir, report_folder
+from docs_updater.url_filter import UrlFilter
+
+
+@dataclass
+class SourceConfig:
+    """One documentation source to keep in sync."""
+
+    url: str
+    folder: str
+    # fnmatch-style patterns matched against each file's path; an empty include list keeps everything
+    include: list[str] = field(default_factory=list)
+    exclude: list[str] = field(default_factory=list)
+    max_depth: int = 3
+    max_pages: int = 500
+    # Also drop crawled pages that are nearly identical to one already kept
+    near_duplicates: bool = False
+    # Extra rules for which links a crawl follows; see `UrlFilter`
+    follow: list[str] = field(default_factory=list)
+    skip: list[str] = field(default_factory=list)
+    # Count tokens after each sync and flag files over this many; see `docs_updater.tokens`
+    token_budget: int | None = None
+    # Also write a `<folder>-chunks` copy with big pages split and small ones packed to the budget
+    split: bool = False
+    pack: bool = False
+    # Delete crawled pages that a crawl without failures no longer finds; GitHub sources always do
+    prune: bool = False
+
+    def matches(self, path: str) -> bool:
+        if self.include and not any(fnmatchcase(path, pattern) for pattern in self.include):
+            return False
+        return not any(fnmatchcase(path, pattern) for pattern in self.exclude)
+
+
+@dataclass
+class SourceSummary:
+    """What happened to one source during a sync."""
+
+    source: SourceConfig
+    summary: str = ""
+    failed: int = 0
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.failed == 0
+
+
+def load_sources(path: Path) -> list[SourceConfig]:
+    """Load sources from a TOML config file with one [[sources]] table per source.
+
+    ```toml
+    [[sources]]
+    url = "https://github.com/owner/repo/tree/main/docs"
+    folder = "repo"
+    exclude = ["CHANGELOG.md"]
+    ```
+    """
+    data = tomllib.loads(path.read_text())
+    sources = [SourceConfig(**source) for source in data.get("sources", [])]
+
+    folders = [source.folder for source in sources]
+    duplicates = sorted({folder for folder in folders if folders.count(folder) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate folder names in {path}: {', '.join(duplicates)}")
+
+    return sources
+
+
+def load_scheduler_config(path: Path, per_host_rate: float | None = None) -> SchedulerConfig:
+    """Load the request pacing settings from the top of a sync config file.
+
+    ```toml
+    per_host_rate = 4  # requests per second to any one host
+    host_rates = { "api.github.com" = 2 }  # overrides for single hosts
+
+    [[sources]]
+    ...
+    ```
+
+    A `per_host_rate` argument, e.g. from the command line, takes precedence over the file's.
+    """
+    data = tomllib.loads(path.read_text())
+    return scheduler_config(per_host_rate or data.get("per_host_rate"), data.get("host_rates"))
+
+
+def _is_github(source: SourceConfig) -> bool:
+    return "github.com" in (urlparse(source.url).hostname or "")
+
+
+async def _list_source_files(
+    source: SourceConfig, journal: Journal | None = None
+) -> tuple[list[MarkdownFile], list[str]]:
+    """List a source's files, and the URLs of any pages its crawl could not fetch."""
+    if _is_github(source):
+        files, failed = await get_github_files(source.url), []
+    else:
+        crawl = await crawl_docs(
+            source.url,
+            max_depth=source.max_depth,
+            max_pages=source.max_pages,
+            near_duplicates=source.near_duplicates,
+            url_filter=UrlFilter(source.url, include=source.follow, exclude=source.skip),
+            progress=LoggingProgress(f"{source.folder} crawl"),
+            journal=journal,
+        )
+        files, failed = crawl.files, crawl.failed
+    return [file for file in files if source.matches(file.path)], failed
+
+
+def _resize_to_budget(source: SourceConfig, output_dir: Path, budget: int) -> str:
+    """Write the folder's token index and, if asked for, its resized copy; returns a summary."""
+    report = report_folder(output_dir, budget)
+    if source.split or source.pack:
+        chunk_folder(output_dir, chunks_dir(output_dir), budget, source.split, source.pack)
+    return report.summary()
+
+
+async def sync_source(
+    source: SourceConfig,
+    output_root: Path,
+    download_concurrency: int,
+    budget: asyncio.Semaphore,
+) -> SourceSummary:
+    """List and incrementally download one source, capturing any error in the summary.
+
+    Crawl and download progress is journaled, so a sync that is interrupted resumes where it stopped.
+    """
+    output_dir = output_root / source.folder
+    crawl_journal = None if _is_github(source) else Journal.open("crawl", source.url)
+    download_journal = Journal.open("download", str(output_dir.resolve()))
+    try:
+        files, crawl_failed = await _list_source_files(source, crawl_journal)
+        if crawl_failed:
+            logger.warning(f"{len(crawl_failed)} pages of {source.url} failed to crawl; keeping any files not listed")
+        # A crawl may miss pages that still exist, so crawled sources only delete files when asked to,
+        # and never after pages failed to crawl
+        prune = None if _is_github(source) else source.prune and not crawl_failed
+        plan, failed = await refresh_folder(
+            files,
+            output_dir,
+            source.url,
+            download_concurrency,
+            budget=budget,
+            progress=LoggingProgress(f"{source.folder} download"),
+            journal=download_journal,
+            prune=prune,
+        )
+        for journal in (crawl_journal, download_journal):
+            if journal:
+                journal.finish()
+
+        summary = plan.summary()
+        if source.token_budget:
+            summary += f"; {await asyncio.to_thread(_resize_to_budget, source, output_dir, source.token_budget)}"
+        return SourceSummary(source=source, summary=summary, failed=len(failed) + len(crawl_failed))
+    except Exception as e:
+        logger.error(f"Error syncing {source.url}: {e}")
+        return SourceSummary(source=source, error=str(e) or type(e).__name__)
+    finally:
+        for journal in (crawl_journal, download_journal):
+            if journal:
+                journal.close()
+
+
+async def run_batch(
+    sources: list[SourceConfig],
+    output_root: Path,
+    max_sources: int = 4,
+    max_requests: int = 16,
+    scheduler: SchedulerConfig | None = None,
+) -> list[SourceSummary]:
+    """Sync sources concurrently.
+
+    At most `max_sources` sources are processed at once, and all of them share a budget of
+    `max_requests` in-flight downloads. Every request (crawls, GitHub API calls and downloads)
+    goes through one HTTP client, paced per host by `scheduler` (see `load_scheduler_config`).
+    """
+    if scheduler is not None:
+        configure_http_client(scheduler)
+    source_slots = asyncio.Semaphore(max_sources)
+    budget = asyncio.Semaphore(max_requests)
+
+    async def run(source: SourceConfig) -> SourceSummary:
+        async with source_slots:
+            return await sync_source(source, output_root, max_requests, budget)
+
+    try:
+        return await asyncio.gather(*(run(source) for source in sources))
+    finally:
+        await close_shared_resources()
+
+
+def format_summaries(summaries: list[SourceSummary]) -> str:
+    lines = []
+    for summary in summaries:
+        status = "OK" if summary.ok else "FAILED"
+        detail = summary.error.splitlines()[0] if summary.error else summary.summary
+        if summary.failed:
+            detail += f" ({summary.failed} files failed)"
+        lines.append(f"[{status}] {summary.source.folder}: {detail}")
+    return "\n".join(lines)
@@ -0,0 +1,191 @@
+"""Long-lived, bounded pool of crawl4ai browser pages shared by every crawl."""
+
+import asyncio
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+import functools
+import time
+import uuid
+
+from crawl4ai import AsyncWebCrawler
+from crawl4ai.async_configs import BrowserConfig, CrawlerRunConfig
+from crawl4ai.models import CrawlResult
+from loguru import logger
+
+from docs_updater.tracing import span, tracer
+
+# crawl4ai hooks that mark the boundaries between the stages of one render, in order
+_RENDER_HOOKS = ("before_goto", "after_goto", "before_retrieve_html", "before_return_html")
+# The stage that runs from each hook to the next (the last one runs until arun returns)
+_RENDER_STAGES = {
+    "before_goto": "browser.navigate",
+    "after_goto": "browser.settle",  # waiting for the page and scan_full_page scrolling
+    "before_retrieve_html": "browser.html",
+    "before_return_html": "browser.process",  # crawl4ai's markdown generation and link extraction
+}
+
+
+@dataclass
+class _PageSlot:
+    """A reusable browser page, identified by its crawl4ai session id."""
+
+    session_id: str
+    uses: int = 0
+
+
+class BrowserPool:
+    """A single headless Chromium shared by a bounded number of reusable pages.
+
+    Chromium is launched lazily on first use and kept alive until `close` is called.
+    Each page is recycled after `max_uses_per_page` navigations, and the browser is
+    restarted if a health check finds it disconnected.
+    """
+
+    def __init__(self, size: int = 4, max_uses_per_page: int = 50, verbose: bool = False):
+        if size < 1:
+            raise ValueError("Browser pool size must be at least 1")
+
+        self.size = size
+        self.max_uses_per_page = max_uses_per_page
+        self.verbose = verbose
+
+        self._crawler: AsyncWebCrawler | None = None
+        self._slots: asyncio.Queue[_PageSlot] = asyncio.Queue()
+        self._lock = asyncio.Lock()
+        # Per-session hook timestamps of the render in progress, only collected while tracing
+        self._marks: dict[str, dict[str, int]] = {}
+
+    def _browser_config(self) -> BrowserConfig:
+        return BrowserConfig(
+            browser_type="chromium",
+            headless=True,
+            verbose=self.verbose,
+            user_agent_mode="random",
+            java_script_enabled=True,
+            extra_args=["--disable-blink-features=AutomationControlled", "--disable-web-security"],
+        )
+
+    def _is_healthy(self) -> bool:
+        """Check that the crawler is started and its browser is still connected."""
+        if self._crawler is None or not self._crawler.ready:
+            return False
+
+        browser = getattr(self._crawler.crawler_strategy, "browser_manager", None)
+        browser = getattr(browser, "browser", None)
+        # Persistent contexts have no separate Browser object, so only check when there is one
+        return browser is None or browser.is_connected()
+
+    async def _ensure_started(self) -> AsyncWebCrawler:
+        """Start the browser if needed, restarting it when the health check fails."""
+        async with self._lock:
+            if self._is_healthy():
+                assert self._crawler is not None
+                return self._crawler
+
+            if self._crawler is not None:
+                logger.warning("Browser pool is unhealthy, restarting Chromium")
+                await self._shutdown()
+
+            logger.info(f"Starting browser pool with {self.size} pages")
+            crawler = AsyncWebCrawler(config=self._browser_config())
+            with span("browser.launch", pages=self.size):
+                await crawler.start()
+            if tracer.enabled:
+                for hook in _RENDER_HOOKS:
+                    crawler.crawler_strategy.set_hook(hook, functools.partial(self._mark, hook))  # type: ignore
+            self._crawler = crawler
+            self._slots = asyncio.Queue()
+            for _ in range(self.size):
+                self._slots.put_nowait(_PageSlot(session_id=str(uuid.uuid4())))
+            return crawler
+
+    def _mark(self, hook: str, *args, config: CrawlerRunConfig | None = None, **kwargs) -> None:
+        session_id = getattr(config, "session_id", None)
+        if session_id:
+            self._marks.setdefault(session_id, {})[hook] = time.perf_counter_ns()
+
+    def _record_stages(self, session_id: str, url: str) -> None:
+        """Turn the hook timestamps of a finished render into one span per stage."""
+        marks = self._marks.pop(session_id, {})
+        times = [(hook, marks[hook]) for hook in _RENDER_HOOKS if hook in marks]
+        ends = [t for _, t in times[1:]] + [time.perf_counter_ns()]
+        for (hook, start), end in zip(times, ends, strict=True):
+            tracer.record(_RENDER_STAGES[hook], start, end, url=url)
+
+    async def _recycle(self, crawler: AsyncWebCrawler, slot: _PageSlot) -> _PageSlot:
+        """Close a worn-out page and hand back a fresh slot in its place."""
+        try:
+            await crawler.crawler_strategy.kill_session(slot.session_id)  # type: ignore
+        except Exception as e:
+            logger.warning(f"Failed to close browser page {slot.session_id}: {e}")
+        return _PageSlot(session_id=str(uuid.uuid4()))
+
+    @asynccontextmanager
+    async def page(self) -> AsyncGenerator[tuple[AsyncWebCrawler, str], None]:
+        """Borrow a page from the pool, yielding the crawler and the page's session id."""
+        crawler = await self._ensure_started()
+        slots = self._slots
+        with span("browser.wait"):
+            slot = await slots.get()
+        failed = False
+        try:
+            yield crawler, slot.session_id
+        except Exception:
+            failed = True
+            raise
+        finally:
+            slot.uses += 1
+            if crawler is self._crawler and (failed or slot.uses >= self.max_uses_per_page):
+                slot = await self._recycle(crawler, slot)
+            slots.put_nowait(slot)
+
+    async def arun(self, url: str, config: CrawlerRunConfig) -> CrawlResult:
+        """Crawl a URL on a pooled page."""
+        async with self.page() as (crawler, session_id):
+            with span("browser.render", url=url, scan_full_page=config.scan_full_page):
+                result = await crawler.arun(url=url, config=config.clone(session_id=session_id))
+            if tracer.enabled:
+                self._record_stages(session_id, url)
+        return result  # type: ignore
+
+    async def _shutdown(self) -> None:
+        crawler, self._crawler = self._crawler, None
+        if crawler is None:
+            return
+
+        try:
+            await crawler.close()
+        except Exception as e:
+            logger.warning(f"Error while closing browser: {e}")
+
+    async def close(self) -> None:
+        """Close every page and shut down the browser."""
+        async with self._lock:
+            await self._shutdown()
+
+    async def __aenter__(self) -> "BrowserPool":
+        await self._ensure_started()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
+
+
+_default_pool: BrowserPool | None = None
+
+
+def get_browser_pool() -> BrowserPool:
+    """Get the process-wide browser pool, creating it on first use."""
+    global _default_pool
+    if _default_pool is None:
+        _default_pool = BrowserPool()
+    return _default_pool
+
+
+async def close_browser_pool() -> None:
+    """Shut down the process-wide browser pool if it was ever started."""
+    global _default_pool
+    pool, _default_pool = _default_pool, None
+    if pool is not None:
+        await pool.close()
@@ -1,18 +1,36 @@
 """Documentation crawler using crawl4ai."""
 
-from dataclasses import dataclass
+import asyncio
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
 import re
 from urllib.parse import urljoin, urlparse
+from urllib.robotparser import RobotFileParser
 
-from crawl4ai import AsyncWebCrawler, CacheMode
-from crawl4ai.async_configs import BrowserConfig, CrawlerRunConfig
+from crawl4ai import CacheMode
+from crawl4ai.async_configs import CrawlerRunConfig
 from crawl4ai.markdown_generation_strategy import DefaultMarkdownGenerator
 import httpx
 from loguru import logger
 from pydantic import BaseModel
 
-
-class Link(BaseModel):
+from docs_updater.browser_pool import BrowserPool, get_browser_pool
+from docs_updater.dedup import ContentIndex
+from docs_updater.discovery import discover_pages
+from docs_updater.frontier import CrawlFrontier
+from docs_updater.http_cache import HttpCache, cached_get, content_hash, get_http_cache
+from docs_updater.http_client import get_http_client
+from docs_updater.journal import DONE, FAILED, PENDING, SKIPPED, Journal
+from docs_updater.models import MarkdownFile
+from docs_updater.postprocess import MarkdownProcessor, get_markdown_processor
+from docs_updater.progress import ProgressCallback, ProgressKind, emit
+from docs_updater.render_policy import RenderLevel, RenderPolicy, get_render_policy, incomplete_reason
+from docs_updater.tracing import span
+from docs_updater.url_filter import UrlFilter
+
+
+@dataclass(frozen=True, slots=True)
+class Link:
     """Represents a link found on a page."""
 
     url: str
@@ -20,245 +38,404 @@ class Link(BaseModel):
 
 
 class URLResult(BaseModel):
-    """Result from crawling a URL."""
+    """Result from crawling a URL: its markdown and the links worth following.
+
+    The page's HTML is only kept when asked for with `keep_html`, since large pages would otherwise
+    hold several copies of it in memory while the crawl moves on.
+    """
 
     url: str
-    html: str
     markdown: str
     links: list[Link] = []
+    html: str | None = None
+    # Markdown or plain text served as-is, which never needs a browser render
+    is_markdown: bool = False
 
 
 @dataclass
-class MarkdownFile:
-    """Represents a markdown file to download."""
+class CrawlResult:
+    """The pages a crawl found, and the URLs it could not fetch."""
 
-    url: str
-    path: str
-    content: str = ""
+    files: list[MarkdownFile]
+    # A crawl with failures may be missing pages that still exist, so it is not a complete listing
+    failed: list[str] = field(default_factory=list)
 
 
-async def _handle_web_content(url: str, verbose: bool = False) -> URLResult:
-    """Fetch and parse web content using crawl4ai."""
-    browser_config = BrowserConfig(
-        browser_type="chromium",
-        headless=True,
-        verbose=verbose,
-        user_agent_mode="random",
-        java_script_enabled=True,
-        extra_args=["--disable-blink-features=AutomationControlled", "--disable-web-security"],
-    )
+# Links that never lead to another page
+_NOT_NAVIGABLE = ("#", "mailto:", "javascript:", "tel:", "data:")
+
+
+def _iter_links(links: Iterable[tuple[str, str]]) -> Iterator[Link]:
+    """Yield a `Link` for each distinct, navigable (href, text) pair, in page order."""
+    seen: set[str] = set()
+    for href, text in links:
+        if href and href not in seen and not href.lower().startswith(_NOT_NAVIGABLE):
+            seen.add(href)
+            yield Link(url=href, text=text)
+
+
+async def _handle_web_content(
+    url: str,
+    verbose: bool = False,
+    pool: BrowserPool | None = None,
+    scan_full_page: bool = True,
+    keep_html: bool = False,
+) -> URLResult:
+    """Fetch and parse web content using crawl4ai on a pooled browser page.
+
+    With `scan_full_page` the page is scrolled to the bottom first so lazily loaded content renders.
+    Only same-site links are returned, since a crawl never follows links to other sites.
+    """
     run_config = CrawlerRunConfig(
-        scan_full_page=True,
+        scan_full_page=scan_full_page,
         user_agent_mode="random",
         cache_mode=CacheMode.DISABLED,
         markdown_generator=DefaultMarkdownGenerator(),
         verbose=verbose,
     )
 
-    async with AsyncWebCrawler(config=browser_config) as crawler:
-        result = await crawler.arun(
-            url=url,
-            config=run_config,
-        )
+    pool = pool or get_browser_pool()
+    result = await pool.arun(url, run_config)
 
-    links: list[Link] = []
-    seen_urls: set[str] = set()
-    combined_link_data = result.links.get("internal", []) + result.links.get("external", [])  # type: ignore
-    for link_data in combined_link_data:
-        href = link_data.get("href", "")
-        if href and href not in seen_urls:
-            seen_urls.add(href)
-            link = Link(
-                url=href,
-                text=link_data.get("title", "") or link_data.get("text", ""),
-            )
-            links.append(link)
-
-    url_result = URLResult(
+    link_data = result.links.get("internal", [])  # type: ignore
+    links = _iter_links((data.get("href", ""), data.get("title", "") or data.get("text", "")) for data in link_data)
+    return URLResult(
         url=url,
-        html=result.html or "",  # type: ignore
-        markdown=result.markdown or "",  # type: ignore
-        links=links,
+        # crawl4ai's markdown is a str subclass that references the whole generation result; keep just the text
+        markdown=str(result.markdown or ""),  # type: ignore
+        links=list(links),
+        html=result.html if keep_html else None,  # type: ignore
     )
-    return url_result
-
-
-async def get_github_files(repo_url: str) -> list[MarkdownFile]:
-    """Get markdown files from a GitHub repository."""
-    # Parse GitHub URL to get owner and repo
-    parsed = urlparse(repo_url)
-    path_parts = parsed.path.strip("/").split("/")
-
-    if len(path_parts) < 2:
-        raise ValueError("Invalid GitHub repository URL")
-
-    owner = path_parts[0]
-    repo = path_parts[1]
 
-    # Default branch could be specified in URL after /tree/
-    branch = "main"
-    subpath = ""
 
-    if len(path_parts) > 2 and path_parts[2] == "tree" and len(path_parts) > 3:
-        branch = path_parts[3]
-        if len(path_parts) > 4:
-            subpath = "/".join(path_parts[4:])
+_MARKDOWN_LINK = re.compile(r"\[([^\]]*)\]\(([^)\s]+)\)")
 
-    # Use GitHub API to get repository contents
-    api_url = f"https://api.github.com/repos/{owner}/{repo}/git/trees/{branch}?recursive=1"
 
-    files: list[MarkdownFile] = []
-
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(api_url, headers={"Accept": "application/vnd.github.v3+json"})
-            response.raise_for_status()
-
-            data = response.json()
-            tree = data.get("tree", [])
-
-            for item in tree:
-                if item["type"] == "blob":
-                    path = item["path"]
-
-                    # Filter to only markdown files
-                    if path.endswith((".md", ".mdx")):
-                        # If subpath is specified, only include files under that path
-                        if subpath and not path.startswith(subpath):
-                            continue
-
-                        # Remove subpath prefix if present
-                        display_path = path[len(subpath) :].lstrip("/") if subpath else path
-
-                        # Construct raw content URL
-                        raw_url = f"https://raw.githubusercontent.com/{owner}/{repo}/{branch}/{path}"
-
-                        files.append(MarkdownFile(url=raw_url, path=display_path))
-
-        except httpx.HTTPStatusError as e:
-            if e.response.status_code == 404:
-                # Try with master branch if main doesn't exist
-                if branch == "main":
-                    api_url = api_url.replace("/main?", "/master?")
-                    response = await client.get(api_url, headers={"Accept": "application/vnd.github.v3+json"})
-                    response.raise_for_status()
+def _content_type(response: httpx.Response) -> str:
+    return response.headers.get("content-type", "").split(";")[0].strip().lower()
 
-                    data = response.json()
-                    tree = data.get("tree", [])
 
-                    for item in tree:
-                        if item["type"] == "blob":
-                            path = item["path"]
-
-                            if path.endswith((".md", ".mdx")):
-                                if subpath and not path.startswith(subpath):
-                                    continue
-
-                                display_path = path[len(subpath) :].lstrip("/") if subpath else path
-                                raw_url = f"https://raw.githubusercontent.com/{owner}/{repo}/master/{path}"
-
-                                files.append(MarkdownFile(url=raw_url, path=display_path))
-                else:
-                    raise
-            else:
-                raise
-
-    return sorted(files, key=lambda f: f.path)
+def _is_markdown(url: str, response: httpx.Response) -> bool:
+    """Whether a response is markdown or plain text, which is used as it is rather than converted or rendered."""
+    return _content_type(response) in ("text/markdown", "text/x-markdown", "text/plain") or url.endswith(
+        (".md", ".mdx")
+    )
 
 
-async def crawl_docs(url: str) -> list[MarkdownFile]:
-    """Crawl a documentation website and find markdown pages."""
+async def _parse_static_content(
+    url: str, response: httpx.Response, keep_html: bool = False, processor: MarkdownProcessor | None = None
+) -> URLResult | None:
+    """Convert a plain HTTP response to markdown.
+
+    Returns None if the response is not a page we can convert. Markdown and plain text responses
+    come back as they are, with `is_markdown` set; they never need rendering.
+    """
+    content_type = _content_type(response)
+    text = response.text
+
+    if _is_markdown(url, response):
+        links = _iter_links((href, title) for title, href in _MARKDOWN_LINK.findall(text))
+        return URLResult(url=url, markdown=text, links=list(links), is_markdown=True)
+
+    if content_type not in ("text/html", "application/xhtml+xml"):
+        return None
+
+    # Converting HTML is CPU-bound, so it runs in a worker process to keep the event loop responsive
+    with span("markdown.static", url=url, bytes=len(text)):
+        markdown, anchors = await (processor or get_markdown_processor()).convert(url, text)
+    return URLResult(url=url, markdown=markdown, links=list(_iter_links(anchors)), html=text if keep_html else None)
+
+
+async def _fetch_page(
+    url: str,
+    pool: BrowserPool | None = None,
+    client: httpx.AsyncClient | None = None,
+    cache: HttpCache | None = None,
+    policy: RenderPolicy | None = None,
+    keep_html: bool = False,
+) -> URLResult:
+    """Fetch a page as cheaply as possible, escalating to the browser only when the markdown looks unfinished.
+
+    Markdown and plain text responses are returned as they are. For HTML, the render policy says
+    which level to start at for the page's site section: a static fetch, a browser render without
+    scrolling, or a full-page scroll. If the markdown from that level looks incomplete the next
+    level is tried, and the policy remembers the level that worked.
+
+    The static request is always made, to revalidate the HTTP cache, and a page whose HTML has not
+    changed since it was last rendered reuses that render instead of starting the browser again.
+
+    The result carries the page's HTML only with `keep_html`.
+    """
+    client = client or get_http_client()
+    cache = cache or get_http_cache()
+    policy = policy or get_render_policy()
+    level = policy.level_for(url)
+
+    try:
+        with span("fetch.static", url=url) as timer:
+            response, revalidated = await cached_get(client, url, cache)
+            timer.set(status=response.status_code, cached=revalidated)
+        response.raise_for_status()
+    except httpx.HTTPError as e:
+        logger.debug(f"Static fetch failed for {url}: {e}")
+        response = None
+
+    # The best result so far and the level it came from, to fall back on if rendering adds nothing
+    previous: tuple[RenderLevel, URLResult] | None = None
+    fetched = response is not None
+    if response is not None:
+        # Markdown and plain text never need the browser, whatever level the site section's HTML needs;
+        # HTML is only converted here when the policy starts at a static fetch
+        static = (
+            await _parse_static_content(url, response, keep_html)
+            if level == RenderLevel.STATIC or _is_markdown(url, response)
+            else None
+        )
+        if static is not None and static.is_markdown:
+            return static
+        if static is not None:
+            reason = incomplete_reason(static.markdown)
+            if reason is None:
+                policy.record(url, RenderLevel.STATIC)
+                return static
+            logger.debug(f"Static fetch of {url} looks incomplete ({reason})")
+            previous = (RenderLevel.STATIC, static)
+
+        entry = cache.get(url)
+        if entry and entry.rendered and not keep_html:
+            logger.debug(f"Reusing cached render of {url}")
+            return URLResult.model_validate_json(entry.rendered)
+        # Neither the response nor the cached body is needed while the browser renders
+        del response, entry
+
+    level = max(level, RenderLevel.RENDER)
+    while True:
+        logger.debug(f"Rendering {url} in the browser ({level.name})")
+        result = await _handle_web_content(
+            url, pool=pool, scan_full_page=level == RenderLevel.SCROLL, keep_html=keep_html
+        )
+        reason = incomplete_reason(result.markdown)
+        if reason is None:
+            break
+        if previous is not None and len(result.markdown) <= len(previous[1].markdown) * 1.1:
+            # Rendering more did not add content, so the page is just short and the cheaper level was enough
+            level, result = previous
+            break
+        if level == RenderLevel.SCROLL:
+            break
+        logger.debug(f"{level.name} render of {url} looks incomplete ({reason}), escalating")
+        previous = (level, result)
+        level = RenderLevel(level + 1)
+
+    policy.record(url, level)
+    if fetched:
+        cache.put_rendered(url, result.model_dump_json(exclude={"html"}))
+    return result
+
+
+def _url_to_path(url: str) -> str:
+    """Generate a flat markdown file name for a crawled URL."""
+    path = urlparse(url).path.strip("/")
+
+    # Clean up the path
+    if not path:
+        path = "index"
+
+    # Ensure .md extension
+    if not path.endswith((".md", ".mdx")):
+        path += ".md"
+
+    # Replace slashes with underscores for flat structure
+    return path.replace("/", "_")
+
+
+async def _load_robots(base_url: str, client: httpx.AsyncClient) -> RobotFileParser | None:
+    """Fetch and parse the site's robots.txt, returning None if it is unavailable."""
+    try:
+        response = await client.get(f"{base_url}/robots.txt")
+    except httpx.HTTPError as e:
+        logger.debug(f"Could not fetch robots.txt for {base_url}: {e}")
+        return None
+
+    if response.status_code != 200:
+        return None
+
+    robots = RobotFileParser()
+    robots.parse(response.text.splitlines())
+    return robots
+
+
+def _robots_allow(robots: RobotFileParser | None, url: str) -> bool:
+    return robots is None or robots.can_fetch("*", url)
+
+
+async def crawl_docs(
+    url: str,
+    max_depth: int = 3,
+    max_pages: int = 500,
+    workers: int = 4,
+    respect_robots: bool = True,
+    discover: bool = True,
+    pool: BrowserPool | None = None,
+    client: httpx.AsyncClient | None = None,
+    cache: HttpCache | None = None,
+    progress: ProgressCallback | None = None,
+    near_duplicates: bool = False,
+    url_filter: UrlFilter | None = None,
+    render_policy: RenderPolicy | None = None,
+    journal: Journal | None = None,
+) -> CrawlResult:
+    """Crawl a documentation website breadth-first and return its pages with their markdown.
+
+    Links are followed up to `max_depth` hops from `url` and at most `max_pages` pages are
+    fetched, by `workers` concurrent workers that share the browser pool.
+
+    With `discover`, pages listed in the site's llms.txt and sitemaps are queued up front (a site's
+    llms-full.txt is not kept, since it would repeat the content of every crawled page). Every
+    page is fetched with plain HTTP first; the browser is only used for pages that need JavaScript
+    to render, and only scrolls the full page where `render_policy` found that necessary.
+
+    Pages are deduplicated by canonical URL before fetching, and by content after: a page with the
+    same markdown as one already crawled is dropped and its links are not followed. With
+    `near_duplicates`, pages that are almost identical (by SimHash) are dropped too.
+
+    `url_filter` decides which links are followed; by default only same-site links under the
+    seed's path or that look like documentation are.
+
+    With a `journal`, every page queued, crawled, skipped or failed is recorded as it happens. If
+    the journal already holds progress from an interrupted crawl with the same settings that began
+    less than a day ago (see `Journal.resume`), that crawl is resumed instead: pages it finished are
+    returned from the journal and only its queued and failed pages are fetched. Older progress is
+    discarded. The journal is left in place; the caller deletes it once the pages are saved.
+
+    A page that fails does not stop the crawl; its URL is listed in the result's `failed`.
+    `progress` receives an event for every page discovered, started, fetched or failed.
+    """
     logger.info(f"Crawling documentation from: {url}")
 
-    # Fetch the main page
-    result = await _handle_web_content(url)
+    parsed = urlparse(url)
+    base_url = f"{parsed.scheme}://{parsed.netloc}"
+    url_filter = url_filter or UrlFilter(url)
+
+    client = client or get_http_client()
+    robots = await _load_robots(base_url, client) if respect_robots else None
+    frontier = CrawlFrontier(max_depth=max_depth, max_pages=max_pages)
+    index = ContentIndex(near_duplicates=near_duplicates)
 
     files: list[MarkdownFile] = []
-    seen_urls: set[str] = set()
-
-    # Add the main page if it has content
-    if result.markdown.strip():
-        parsed = urlparse(url)
-        filename = parsed.path.strip("/").replace("/", "_") or "index"
-        if not filename.endswith(".md"):
-            filename += ".md"
-        files.append(MarkdownFile(url=url, path=filename, content=result.markdown))
-        seen_urls.add(url)
-
-    # Filter links to find potential documentation pages
-    base_url = f"{urlparse(url).scheme}://{urlparse(url).netloc}"
-
-    for link in result.links:
-        link_url = link.url
-
-        # Make absolute URL if relative
-        if not link_url.startswith(("http://", "https://")):
-            link_url = urljoin(url, link_url)
-
-        # Skip if already seen
-        if link_url in seen_urls:
-            continue
-
-        # Skip external links (different domain)
-        if not link_url.startswith(base_url):
-            continue
-
-        # Skip non-documentation links
-        skip_patterns = [
-            r"#",  # Anchors
-            r"\.(jpg|jpeg|png|gif|svg|ico|pdf|zip|tar|gz|exe|dmg)$",  # Binary files
-            r"/signin|/login|/signup|/register|/auth",  # Auth pages
-            r"/search\?",  # Search queries
-            r"github\.com|twitter\.com|facebook\.com|linkedin\.com",  # Social media
-        ]
-
-        if any(re.search(pattern, link_url, re.IGNORECASE) for pattern in skip_patterns):
-            continue
-
-        # Include if it looks like a documentation page
-        include_patterns = [
-            r"/docs/",
-            r"/documentation/",
-            r"/guide/",
-            r"/tutorial/",
-            r"/reference/",
-            r"/api/",
-            r"/manual/",
-            r"\.md$",
-            r"\.mdx$",
-        ]
-
-        if any(re.search(pattern, link_url, re.IGNORECASE) for pattern in include_patterns):
-            # Generate a reasonable file path
-            parsed = urlparse(link_url)
-            path = parsed.path.strip("/")
-
-            # Clean up the path
-            if not path:
-                path = "index"
-
-            # Ensure .md extension
-            if not path.endswith((".md", ".mdx")):
-                path += ".md"
-
-            # Replace slashes with underscores for flat structure
-            path = path.replace("/", "_")
-
-            files.append(MarkdownFile(url=link_url, path=path))
-            seen_urls.add(link_url)
-
-    return sorted(files, key=lambda f: f.path)
-
-
-async def fetch_single_file(url: str) -> str:
+    failed: list[str] = []
+
+    def enqueue(page_url: str, depth: int) -> None:
+        if frontier.add(page_url, depth):
+            page_url = CrawlFrontier.normalize(page_url)
+            if journal:
+                journal.add_pending(page_url, depth)
+            emit(progress, ProgressKind.DISCOVERED, page_url)
+
+    def keep(file: MarkdownFile) -> None:
+        files.append(file)
+        if journal:
+            journal.mark_done(file.url, file.path, content_hash(file.content.encode()), content=file.content)
+
+    # A journal only resumes a crawl with the same settings, so it never returns pages another crawl chose
+    settings = {
+        "url": url,
+        "max_depth": max_depth,
+        "max_pages": max_pages,
+        "respect_robots": respect_robots,
+        "discover": discover,
+        "near_duplicates": near_duplicates,
+        "include": url_filter.include.rules,
+        "exclude": url_filter.exclude.rules,
+    }
+    if journal and journal.resume(settings):
+        refetch = []
+        for entry in journal.entries(DONE, SKIPPED):
+            content = entry.content
+            if entry.status == DONE and (content is None or content_hash(content.encode()) != entry.content_hash):
+                # A page without journaled content, or whose content does not match its hash, is crawled again
+                refetch.append(entry)
+                continue
+            frontier.mark_seen(entry.url)
+            if content is not None:
+                files.append(MarkdownFile(url=entry.url, path=entry.path or _url_to_path(entry.url), content=content))
+                index.add(entry.url, content)
+        for entry in [*journal.entries(PENDING, FAILED), *refetch]:
+            enqueue(entry.url, entry.depth)
+        logger.info(f"Resuming crawl of {url}: {len(files)} pages already crawled")
+    else:
+        enqueue(url, 0)
+        if discover:
+            discovered = await discover_pages(base_url, client, sitemaps=robots.site_maps() if robots else None)
+            for page_url in discovered:
+                if url_filter.accepts(page_url) and _robots_allow(robots, page_url):
+                    enqueue(page_url, 0)
+
+    async def worker() -> None:
+        while True:
+            item = await frontier.get()
+            emit(progress, ProgressKind.STARTED, item.url)
+            try:
+                result = await _fetch_page(item.url, pool=pool, client=client, cache=cache, policy=render_policy)
+                emit(progress, ProgressKind.FETCHED, item.url, size=len(result.markdown))
+
+                if result.markdown.strip():
+                    duplicate_of = index.add(item.url, result.markdown)
+                    if duplicate_of:
+                        logger.debug(f"Skipping {item.url}: same content as {duplicate_of}")
+                        if journal:
+                            journal.mark_skipped(item.url, f"same content as {duplicate_of}")
+                        continue
+
+                for link in result.links:
+                    # Make absolute URL if relative
+                    link_url = urljoin(item.url, link.url)
+                    link_url = CrawlFrontier.normalize(link_url)
+
+                    if frontier.seen(link_url) or not url_filter.accepts(link_url):
+                        continue
+                    if not _robots_allow(robots, link_url):
+                        logger.debug(f"Skipping {link_url}: disallowed by robots.txt")
+                        continue
+
+                    enqueue(link_url, item.depth + 1)
+
+                # Keep the markdown we already rendered so the page is not fetched again on download.
+                # It is journaled only after its links, so a resumed crawl never loses them.
+                if result.markdown.strip():
+                    keep(MarkdownFile(url=item.url, path=_url_to_path(item.url), content=result.markdown))
+                elif journal:
+                    journal.mark_skipped(item.url, "no content")
+            except Exception as e:
+                logger.warning(f"Failed to crawl {item.url}: {e}")
+                error = str(e) or type(e).__name__
+                failed.append(item.url)
+                if journal:
+                    journal.mark_failed(item.url, error)
+                emit(progress, ProgressKind.ERROR, item.url, error=error)
+            finally:
+                frontier.task_done()
+
+    tasks = [asyncio.create_task(worker()) for _ in range(max(1, workers))]
+    try:
+        await frontier.join()
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    logger.info(f"Crawled {len(files)} pages from {url}" + (f", {len(failed)} failed" if failed else ""))
+    return CrawlResult(sorted(files, key=lambda f: f.path), sorted(failed))
+
+
+async def fetch_single_file(url: str, client: httpx.AsyncClient | None = None, cache: HttpCache | None = None) -> str:
     """Fetch content of a single file."""
     # Check if it's a raw GitHub URL
     if "raw.githubusercontent.com" in url:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url)
-            response.raise_for_status()
-            return response.text
+        response, _ = await cached_get(client or get_http_client(), url, cache or get_http_cache())
+        response.raise_for_status()
+        return response.text
 
-    # Otherwise, use crawl4ai to get the markdown
-    result = await _handle_web_content(url)
+    # Otherwise, fetch statically or with crawl4ai and return the markdown
+    result = await _fetch_page(url, client=client, cache=cache)
     return result.markdown
@@ -0,0 +1,70 @@
+"""Exact and near-duplicate detection for crawled page content."""
+
+import hashlib
+import re
+
+from docs_updater.http_cache import content_hash
+
+_WORD = re.compile(r"\w+")
+
+# Bits in a SimHash fingerprint, and how many bands it is split into for candidate lookup
+_SIMHASH_BITS = 64
+_BANDS = 4
+
+
+def _normalize(markdown: str) -> str:
+    """Collapse whitespace so that formatting-only differences hash the same."""
+    return " ".join(markdown.split())
+
+
+def simhash(text: str, shingle: int = 3) -> int:
+    """64-bit SimHash of a text's word shingles; similar texts get fingerprints a few bits apart."""
+    words = _WORD.findall(text.lower())
+    shingles = [" ".join(words[i : i + shingle]) for i in range(max(1, len(words) - shingle + 1))]
+
+    weights = [0] * _SIMHASH_BITS
+    for item in shingles:
+        value = int.from_bytes(hashlib.blake2b(item.encode(), digest_size=8).digest(), "big")
+        for bit in range(_SIMHASH_BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+class ContentIndex:
+    """Remembers the content of pages seen so far and spots pages that repeat one of them.
+
+    Exact duplicates (ignoring whitespace) are always detected. With `near_duplicates`, pages whose
+    SimHash is within `max_distance` bits of an earlier page are treated as duplicates too. The
+    fingerprint is split into bands so that only pages sharing a band are compared; any pair within
+    `max_distance` is guaranteed to share one as long as `max_distance < _BANDS`.
+    """
+
+    def __init__(self, near_duplicates: bool = False, max_distance: int = 3):
+        self.near_duplicates = near_duplicates
+        self.max_distance = max_distance
+        self._hashes: dict[str, str] = {}
+        self._bands: list[dict[int, list[tuple[int, str]]]] = [{} for _ in range(_BANDS)]
+
+    def add(self, url: str, markdown: str) -> str | None:
+        """Record a page, returning the URL of an earlier page with the same content, if any."""
+        text = _normalize(markdown)
+        digest = content_hash(text.encode())
+        if digest in self._hashes:
+            return self._hashes[digest]
+        self._hashes[digest] = url
+
+        if not self.near_duplicates:
+            return None
+
+        fingerprint = simhash(text)
+        width = _SIMHASH_BITS // _BANDS
+        keys = [fingerprint >> (band * width) & ((1 << width) - 1) for band in range(_BANDS)]
+        for band, key in zip(self._bands, keys, strict=True):
+            for other, other_url in band.get(key, []):
+                if (fingerprint ^ other).bit_count() <= self.max_distance:
+                    return other_url
+
+        for band, key in zip(self._bands, keys, strict=True):
+            band.setdefault(key, []).append((fingerprint, url))
+        return None
@@ -0,0 +1,105 @@
+"""Cheap page discovery from sitemaps and llms.txt, before any browser is started."""
+
+import gzip
+import re
+from urllib.parse import urljoin
+from xml.etree import ElementTree
+
+import httpx
+from loguru import logger
+
+# Markdown links in llms.txt, e.g. "- [Quickstart](https://example.com/docs/quickstart.md): Get started"
+_MARKDOWN_LINK = re.compile(r"\[[^\]]*\]\(([^)\s]+)\)")
+
+_GZIP_MAGIC = b"\x1f\x8b"
+
+
+def _local_name(tag: str) -> str:
+    """Strip the XML namespace from a tag, e.g. "{http://...}loc" -> "loc"."""
+    return tag.rsplit("}", 1)[-1]
+
+
+def _parse_sitemap(content: bytes) -> tuple[list[str], list[str]]:
+    """Parse a sitemap or sitemap index, returning (page URLs, nested sitemap URLs)."""
+    if content.startswith(_GZIP_MAGIC):
+        content = gzip.decompress(content)
+
+    root = ElementTree.fromstring(content)
+    locs = [
+        loc.text.strip()
+        for entry in root
+        for loc in entry
+        if _local_name(loc.tag) == "loc" and loc.text and loc.text.strip()
+    ]
+
+    if _local_name(root.tag) == "sitemapindex":
+        return [], locs
+    return locs, []
+
+
+async def _get(client: httpx.AsyncClient, url: str) -> httpx.Response | None:
+    """GET a URL, returning None on network errors or non-200 responses."""
+    try:
+        response = await client.get(url)
+    except httpx.HTTPError as e:
+        logger.debug(f"Could not fetch {url}: {e}")
+        return None
+
+    return response if response.status_code == 200 else None
+
+
+async def fetch_sitemap_urls(
+    base_url: str,
+    client: httpx.AsyncClient,
+    sitemaps: list[str] | None = None,
+    max_urls: int = 10_000,
+) -> list[str]:
+    """Collect page URLs from the site's sitemaps, following sitemap indexes and gzip sitemaps."""
+    pending = list(sitemaps or [f"{base_url}/sitemap.xml"])
+    visited: set[str] = set()
+    urls: list[str] = []
+
+    while pending and len(urls) < max_urls:
+        sitemap_url = pending.pop(0)
+        if sitemap_url in visited:
+            continue
+        visited.add(sitemap_url)
+
+        response = await _get(client, sitemap_url)
+        if response is None:
+            continue
+
+        try:
+            pages, nested = _parse_sitemap(response.content)
+        except (ElementTree.ParseError, OSError) as e:
+            logger.debug(f"Could not parse sitemap {sitemap_url}: {e}")
+            continue
+
+        urls.extend(pages)
+        pending.extend(nested)
+
+    return urls[:max_urls]
+
+
+async def fetch_llms_txt(base_url: str, client: httpx.AsyncClient) -> list[str]:
+    """Read the page list from /llms.txt if the site publishes one.
+
+    /llms-full.txt is not read: it repeats every page's content in one file, and the crawl already
+    saves each page as its own file, which refreshes, page selection and token budgets work on.
+    """
+    index = await _get(client, f"{base_url}/llms.txt")
+    if index is None:
+        return []
+    index_url = str(index.url)
+    return [urljoin(index_url, link) for link in _MARKDOWN_LINK.findall(index.text)]
+
+
+async def discover_pages(base_url: str, client: httpx.AsyncClient, sitemaps: list[str] | None = None) -> list[str]:
+    """Find a site's pages from llms.txt and its sitemaps with a handful of plain HTTP requests."""
+    llms_urls = await fetch_llms_txt(base_url, client)
+    sitemap_urls = await fetch_sitemap_urls(base_url, client, sitemaps=sitemaps)
+
+    urls = list(dict.fromkeys([*llms_urls, *sitemap_urls]))
+
+    logger.info(f"Discovered {len(urls)} pages for {base_url} from llms.txt/sitemaps")
+    return urls
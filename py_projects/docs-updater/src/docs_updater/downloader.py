@@ -0,0 +1,290 @@
+"""Concurrent, bounded download pipeline for markdown files."""
+
+import asyncio
+from collections.abc import AsyncGenerator, Iterator
+import contextlib
+from dataclasses import dataclass
+import os
+from pathlib import Path
+import tempfile
+from typing import BinaryIO
+
+import httpx
+from loguru import logger
+
+from docs_updater.crawler import fetch_single_file
+from docs_updater.github_archive import TARBALL_THRESHOLD, RawUrl, stream_github_tarball
+from docs_updater.http_cache import content_hash
+from docs_updater.http_client import get_http_client
+from docs_updater.journal import DONE, Journal
+from docs_updater.manifest import Manifest, RefreshPlan, is_complete_listing, plan_refresh
+from docs_updater.models import MarkdownFile
+from docs_updater.progress import ProgressCallback, ProgressKind, emit
+from docs_updater.tracing import span
+
+
+@dataclass
+class DownloadResult:
+    """Outcome of downloading a single file."""
+
+    file: MarkdownFile
+    path: Path
+    error: str | None = None
+    size: int = 0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@contextlib.contextmanager
+def _atomic_open(path: Path) -> Iterator[BinaryIO]:
+    """Open a temp file next to `path` that replaces it once fully written, and is removed on failure."""
+    fd, name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    tmp = Path(name)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            yield f
+        tmp.replace(path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def _make_dirs(files: list[MarkdownFile], output_dir: Path) -> None:
+    """Create every directory the files will be written to, once each, before any downloads start."""
+    for directory in sorted({(output_dir / file.path).parent for file in files}):
+        directory.mkdir(parents=True, exist_ok=True)
+
+
+def _write_file(file: MarkdownFile, output_dir: Path) -> DownloadResult:
+    """Write a file's content atomically, then drop the content so it is not kept in memory."""
+    file_path = output_dir / file.path
+    data = file.content.encode()
+    with span("file.write", path=file.path, bytes=len(data)), _atomic_open(file_path) as f:
+        f.write(data)
+    file.content = ""
+    logger.info(f"Saved: {file_path}")
+    return DownloadResult(file=file, path=file_path, size=len(data))
+
+
+async def _stream_to_file(file: MarkdownFile, output_dir: Path, client: httpx.AsyncClient) -> DownloadResult:
+    """Stream a raw file straight to disk in chunks, without holding its content in memory."""
+    file_path = output_dir / file.path
+    size = 0
+    with span("download.stream", url=file.url) as timer:
+        async with client.stream("GET", file.url) as response:
+            response.raise_for_status()
+            with _atomic_open(file_path) as f:
+                async for chunk in response.aiter_bytes():
+                    f.write(chunk)
+                    size += len(chunk)
+        timer.set(bytes=size)
+    logger.info(f"Saved: {file_path}")
+    return DownloadResult(file=file, path=file_path, size=size)
+
+
+async def _download_one(
+    file: MarkdownFile,
+    output_dir: Path,
+    client: httpx.AsyncClient | None,
+    budget: asyncio.Semaphore | None,
+    progress: ProgressCallback | None,
+) -> DownloadResult:
+    try:
+        if file.content:
+            result = _write_file(file, output_dir)
+        else:
+            async with budget or contextlib.nullcontext():
+                emit(progress, ProgressKind.STARTED, file.url)
+                # Raw GitHub URLs are pinned to a commit, so they can go straight to disk uncached
+                if RawUrl.parse(file.url) is not None:
+                    result = await _stream_to_file(file, output_dir, client or get_http_client())
+                else:
+                    with span("download.fetch", url=file.url):
+                        file.content = await fetch_single_file(file.url, client=client)
+                    result = _write_file(file, output_dir)
+
+        emit(progress, ProgressKind.FETCHED, file.url, size=result.size)
+        return result
+    except Exception as e:
+        logger.error(f"Error downloading {file.url}: {e}")
+        error = str(e) or type(e).__name__
+        emit(progress, ProgressKind.ERROR, file.url, error=error)
+        return DownloadResult(file=file, path=output_dir / file.path, error=error)
+
+
+def _file_hash(file: MarkdownFile) -> str:
+    """What identifies a file's version in the journal: its blob sha, else a hash of its crawled content."""
+    return file.sha or (content_hash(file.content.encode()) if file.content else "")
+
+
+def _journaled(journal: Journal, file: MarkdownFile, output_dir: Path) -> bool:
+    """Whether an interrupted run already saved this exact file (same path and hash) and it is still on disk."""
+    entry = journal.get(file.url)
+    return (
+        entry is not None
+        and entry.status == DONE
+        and entry.path == file.path
+        and entry.content_hash == _file_hash(file)
+        and (output_dir / file.path).exists()
+    )
+
+
+def _group_by_repo(files: list[MarkdownFile], threshold: int) -> dict[tuple[str, str, str], dict[str, MarkdownFile]]:
+    """Group raw GitHub files by (owner, repo, ref), keeping only groups big enough to fetch as a tarball."""
+    groups: dict[tuple[str, str, str], dict[str, MarkdownFile]] = {}
+    for file in files:
+        raw = RawUrl.parse(file.url) if not file.content else None
+        if raw is not None:
+            groups.setdefault((raw.owner, raw.repo, raw.ref), {})[raw.path] = file
+
+    return {key: paths for key, paths in groups.items() if len(paths) >= threshold}
+
+
+async def download_all(
+    files: list[MarkdownFile],
+    output_dir: Path,
+    concurrency: int = 8,
+    client: httpx.AsyncClient | None = None,
+    tarball_threshold: int = TARBALL_THRESHOLD,
+    budget: asyncio.Semaphore | None = None,
+    progress: ProgressCallback | None = None,
+    journal: Journal | None = None,
+) -> AsyncGenerator[DownloadResult, None]:
+    """Download files concurrently, yielding each result as soon as its file is written.
+
+    Every file is written to a temp file and renamed into place, so an interrupted run never
+    leaves a partial file behind, and its content is released once it is on disk.
+
+    A failure only affects its own file; it is reported as a `DownloadResult` with an error
+    and the rest of the batch carries on. When at least `tarball_threshold` files come from the
+    same GitHub repository, they are extracted from one streamed tarball instead of being
+    fetched one by one; anything missing from the archive falls back to a per-file fetch.
+
+    Pass a shared `budget` semaphore to cap in-flight requests across several concurrent calls.
+    Requests to each host are paced by the HTTP client's scheduler (see `configure_http_client`).
+    `progress` receives an event as each file is queued, started, written or failed.
+
+    With a `journal`, each result is recorded as it arrives, and files that an interrupted run with
+    the same journal already saved are not downloaded again (they are yielded as successes first).
+    The journal is left in place; the caller deletes it once the whole batch is handled.
+    """
+    resumed = [file for file in files if _journaled(journal, file, output_dir)] if journal else []
+    if resumed:
+        logger.info(f"Resuming download to {output_dir}: {len(resumed)} files already saved")
+        skip = {id(file) for file in resumed}
+        files = [file for file in files if id(file) not in skip]
+    for file in resumed:
+        emit(progress, ProgressKind.DISCOVERED, file.url)
+        emit(progress, ProgressKind.FETCHED, file.url)
+        yield DownloadResult(file=file, path=output_dir / file.path)
+
+    # Content is released once written, so the hashes to journal are taken up front
+    hashes = {id(file): _file_hash(file) for file in files} if journal else {}
+    _make_dirs(files, output_dir)
+    for file in files:
+        emit(progress, ProgressKind.DISCOVERED, file.url)
+    groups = _group_by_repo(files, tarball_threshold)
+    in_tarball = {id(file) for paths in groups.values() for file in paths.values()}
+
+    pending: asyncio.Queue[MarkdownFile] = asyncio.Queue()
+    for file in files:
+        if id(file) not in in_tarball:
+            pending.put_nowait(file)
+    results: asyncio.Queue[DownloadResult] = asyncio.Queue()
+
+    async def worker() -> None:
+        while True:
+            file = await pending.get()
+            results.put_nowait(await _download_one(file, output_dir, client, budget, progress))
+
+    async def tarball(owner: str, repo: str, ref: str, paths: dict[str, MarkdownFile]) -> None:
+        written: set[int] = set()
+        try:
+            async with budget or contextlib.nullcontext():
+                async for file in stream_github_tarball(owner, repo, ref, paths, client or get_http_client()):
+                    try:
+                        result = _write_file(file, output_dir)
+                        emit(progress, ProgressKind.FETCHED, file.url, size=result.size)
+                    except OSError as e:
+                        result = DownloadResult(file=file, path=output_dir / file.path, error=str(e))
+                        emit(progress, ProgressKind.ERROR, file.url, error=str(e))
+                    written.add(id(file))
+                    results.put_nowait(result)
+        except Exception as e:
+            logger.warning(f"Tarball download of {owner}/{repo}@{ref} failed, fetching files one by one: {e}")
+
+        for file in paths.values():
+            if id(file) not in written:
+                pending.put_nowait(file)
+
+    tasks = [asyncio.create_task(worker()) for _ in range(max(1, min(concurrency, len(files))))]
+    tasks += [asyncio.create_task(tarball(*key, paths)) for key, paths in groups.items()]
+    try:
+        for _ in range(len(files)):
+            result = await results.get()
+            if journal and result.ok:
+                journal.mark_done(result.file.url, result.file.path, content_hash=hashes[id(result.file)])
+            elif journal:
+                journal.mark_failed(result.file.url, result.error or "")
+            yield result
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def refresh_folder(
+    files: list[MarkdownFile],
+    output_dir: Path,
+    source: str = "",
+    concurrency: int = 8,
+    client: httpx.AsyncClient | None = None,
+    budget: asyncio.Semaphore | None = None,
+    progress: ProgressCallback | None = None,
+    journal: Journal | None = None,
+    prune: bool | None = None,
+) -> tuple[RefreshPlan, list[DownloadResult]]:
+    """Bring a previously downloaded folder up to date using its manifest.
+
+    Only files whose sha changed (or that are new) are downloaded, and the manifest is rewritten.
+    With `prune`, files that are no longer listed at the source are deleted; by default they are
+    only deleted when `files` is a complete listing (see `is_complete_listing`), and kept otherwise.
+    Failed downloads are left out of the manifest so the next refresh retries them. `journal` is
+    passed on to `download_all`.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest = Manifest.load(output_dir)
+    manifest.source = source or manifest.source
+    plan = plan_refresh(files, manifest)
+    if not (is_complete_listing(files) if prune is None else prune):
+        plan.kept, plan.removed = plan.removed, []
+    logger.info(f"Refreshing {output_dir}: {plan.summary()}")
+
+    failed: list[DownloadResult] = []
+    try:
+        async for result in download_all(
+            plan.to_download,
+            output_dir,
+            concurrency,
+            client,
+            budget=budget,
+            progress=progress,
+            journal=journal,
+        ):
+            if result.ok:
+                manifest.record(result.file)
+            else:
+                failed.append(result)
+                manifest.files.pop(result.file.path, None)
+
+        for path in plan.removed:
+            (output_dir / path).unlink(missing_ok=True)
+            manifest.files.pop(path, None)
+            logger.info(f"Removed: {output_dir / path}")
+    finally:
+        # Save progress even if the refresh is cancelled part way
+        manifest.save(output_dir)
+
+    return plan, failed
@@ -0,0 +1,96 @@
+"""Deduplicating, depth-limited URL frontier for breadth-first crawls."""
+
+import asyncio
+from dataclasses import dataclass
+from urllib.parse import parse_qsl, urldefrag, urlencode, urlsplit, urlunsplit
+
+# Index documents that are the same page as their directory
+_INDEX_PAGES = ("index.html", "index.htm", "index.php")
+
+# Query parameters that only track where a visitor came from
+_TRACKING_PARAMS = {"ref", "fbclid", "gclid", "mc_cid", "mc_eid"}
+
+
+@dataclass(frozen=True)
+class FrontierItem:
+    """A URL waiting to be crawled and how many links away from the seed it is."""
+
+    url: str
+    depth: int
+
+
+def canonicalize(url: str) -> str:
+    """Reduce the different spellings of a page's URL to one key for deduplication.
+
+    Lowercases the scheme and host, drops default ports, fragments, trailing slashes, index
+    documents and tracking query parameters, and sorts what is left of the query string.
+    """
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+    if (scheme, netloc.rpartition(":")[2]) in (("http", "80"), ("https", "443")):
+        netloc = netloc.rpartition(":")[0]
+
+    path = parts.path or "/"
+    head, _, last = path.rpartition("/")
+    if last.lower() in _INDEX_PAGES:
+        path = head + "/"
+    if len(path) > 1:
+        path = path.rstrip("/")
+
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in _TRACKING_PARAMS
+    )
+    return urlunsplit((scheme, netloc, path, urlencode(query), ""))
+
+
+class CrawlFrontier:
+    """FIFO queue of URLs to crawl that never yields the same page twice.
+
+    URLs are deduplicated on their canonical form (see `canonicalize`), but queued as given so
+    that relative links on the fetched page still resolve against the URL it was served from.
+
+    URLs deeper than `max_depth` are dropped, and once `max_pages` URLs have been
+    accepted no more are queued.
+    """
+
+    def __init__(self, max_depth: int = 3, max_pages: int = 500):
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self._seen: set[str] = set()
+        self._queue: asyncio.Queue[FrontierItem] = asyncio.Queue()
+
+    @staticmethod
+    def normalize(url: str) -> str:
+        """Normalize a URL for deduplication by dropping its fragment."""
+        return urldefrag(url).url
+
+    def seen(self, url: str) -> bool:
+        return canonicalize(url) in self._seen
+
+    def add(self, url: str, depth: int) -> bool:
+        """Queue a URL, returning False if it was already seen or is over a limit."""
+        url = self.normalize(url)
+        key = canonicalize(url)
+        if depth > self.max_depth or len(self._seen) >= self.max_pages or key in self._seen:
+            return False
+
+        self._seen.add(key)
+        self._queue.put_nowait(FrontierItem(url=url, depth=depth))
+        return True
+
+    def mark_seen(self, url: str) -> None:
+        """Count a URL that was already crawled (e.g. by an interrupted run) without queueing it."""
+        self._seen.add(canonicalize(self.normalize(url)))
+
+    async def get(self) -> FrontierItem:
+        return await self._queue.get()
+
+    def task_done(self) -> None:
+        self._queue.task_done()
+
+    async def join(self) -> None:
+        """Wait until every queued URL has been processed."""
+        await self._queue.join()
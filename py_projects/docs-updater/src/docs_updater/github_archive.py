@@ -0,0 +1,185 @@
+"""Stream a GitHub repository tarball and extract markdown files without buffering the archive."""
+
+from collections.abc import AsyncGenerator, Callable, Iterator
+from dataclasses import dataclass
+import zlib
+
+import httpx
+from loguru import logger
+
+from docs_updater.models import MarkdownFile
+from docs_updater.tracing import span
+
+_BLOCK = 512
+
+# Repos with at least this many files to download are fetched as one tarball instead of file by file
+TARBALL_THRESHOLD = 50
+
+
+@dataclass(frozen=True)
+class RawUrl:
+    """The parts of a raw.githubusercontent.com URL."""
+
+    owner: str
+    repo: str
+    ref: str
+    path: str
+
+    @classmethod
+    def parse(cls, url: str) -> "RawUrl | None":
+        """Parse a raw GitHub URL, assuming the ref has no slashes (a commit sha or simple branch name)."""
+        prefix = "https://raw.githubusercontent.com/"
+        if not url.startswith(prefix):
+            return None
+
+        parts = url[len(prefix) :].split("/", 3)
+        if len(parts) < 4:
+            return None
+        return cls(*parts)
+
+
+def _parse_octal(field: bytes) -> int:
+    # Sizes too large for octal are stored base-256 with the high bit set
+    if field and field[0] & 0x80:
+        return int.from_bytes(field[1:], "big")
+    return int(field.strip(b"\0 ") or b"0", 8)
+
+
+def _parse_pax_path(data: bytes) -> str | None:
+    """Read the path record out of a pax extended header, e.g. b"30 path=some/long/path.md\\n"."""
+    while data:
+        length_str, _, rest = data.partition(b" ")
+        length = int(length_str)
+        record = rest[: length - len(length_str) - 2]
+        key, _, value = record.partition(b"=")
+        if key == b"path":
+            return value.decode()
+        data = data[length:]
+    return None
+
+
+class TarStreamReader:
+    """Incremental tar parser that only keeps the bytes of members it is asked for.
+
+    Feed it decompressed chunks as they arrive; it yields (path, content) for every regular
+    file whose path passes `want`, and skips everything else without holding on to it.
+    """
+
+    def __init__(self, want: Callable[[str], bool]):
+        self.want = want
+        self.done = False
+
+        self._buffer = bytearray()
+        self._remaining = 0
+        self._padding = 0
+        self._collecting: bytearray | None = None
+        self._member_path = ""
+        self._member_type = b""
+        self._next_path: str | None = None
+
+    def feed(self, data: bytes) -> Iterator[tuple[str, bytes]]:
+        self._buffer += data
+
+        while not self.done:
+            if self._remaining or self._padding:
+                if not self._consume_member():
+                    return
+                if self._remaining == 0 and self._padding == 0:
+                    yield from self._finish_member()
+                continue
+
+            if len(self._buffer) < _BLOCK:
+                return
+            header = bytes(self._buffer[:_BLOCK])
+            del self._buffer[:_BLOCK]
+            self._start_member(header)
+            if self._remaining == 0 and self._padding == 0:
+                yield from self._finish_member()
+
+    def _start_member(self, header: bytes) -> None:
+        if header == b"\0" * _BLOCK:
+            self.done = True
+            return
+
+        name = header[0:100].split(b"\0", 1)[0].decode()
+        size = _parse_octal(header[124:136])
+        member_type = header[156:157]
+        if header[257:262] == b"ustar":
+            prefix = header[345:500].split(b"\0", 1)[0].decode()
+            if prefix:
+                name = f"{prefix}/{name}"
+
+        # A preceding pax or GNU long-name header overrides the (possibly truncated) name field
+        if self._next_path is not None and member_type not in (b"x", b"L"):
+            name, self._next_path = self._next_path, None
+
+        self._member_path = name
+        self._member_type = member_type
+        self._remaining = size
+        self._padding = -size % _BLOCK
+
+        keep = member_type in (b"x", b"L") or (member_type in (b"0", b"\0") and self.want(name))
+        self._collecting = bytearray() if keep else None
+
+    def _consume_member(self) -> bool:
+        """Consume as much of the current member as is buffered, returning False if more data is needed."""
+        if self._remaining:
+            chunk = min(self._remaining, len(self._buffer))
+            if self._collecting is not None:
+                self._collecting += self._buffer[:chunk]
+            del self._buffer[:chunk]
+            self._remaining -= chunk
+            if self._remaining:
+                return False
+
+        chunk = min(self._padding, len(self._buffer))
+        del self._buffer[:chunk]
+        self._padding -= chunk
+        return self._padding == 0
+
+    def _finish_member(self) -> Iterator[tuple[str, bytes]]:
+        data, self._collecting = self._collecting, None
+        if data is None:
+            return
+
+        if self._member_type == b"x":
+            self._next_path = _parse_pax_path(bytes(data))
+        elif self._member_type == b"L":
+            self._next_path = data.rstrip(b"\0").decode()
+        else:
+            yield self._member_path, bytes(data)
+
+
+async def stream_github_tarball(
+    owner: str,
+    repo: str,
+    ref: str,
+    paths: dict[str, MarkdownFile],
+    client: httpx.AsyncClient,
+) -> AsyncGenerator[MarkdownFile, None]:
+    """Download a repository tarball once and yield the requested files with their content filled in.
+
+    `paths` maps repository paths to the files to fill in. The archive is decompressed and parsed
+    as it streams, so only the requested members are ever held in memory.
+    """
+    url = f"https://codeload.github.com/{owner}/{repo}/tar.gz/{ref}"
+    logger.info(f"Streaming {len(paths)} files from {url}")
+
+    def want(member: str) -> bool:
+        # Members are nested under a "<owner>-<repo>-<sha>/" top-level directory
+        return member.partition("/")[2] in paths
+
+    reader = TarStreamReader(want)
+    decompressor = zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+
+    # Includes the time the caller spends on each yielded file, e.g. writing it
+    with span("github.tarball", url=url, files=len(paths)):
+        async with client.stream("GET", url) as response:
+            response.raise_for_status()
+            async for chunk in response.aiter_raw():
+                for member, content in reader.feed(decompressor.decompress(chunk)):
+                    file = paths[member.partition("/")[2]]
+                    file.content = content.decode("utf-8", errors="replace")
+                    yield file
+                if reader.done:
+                    break
@@ -0,0 +1,153 @@
+"""List markdown files in a GitHub repository, pinned to a single commit."""
+
+import asyncio
+from dataclasses import dataclass
+import time
+from urllib.parse import quote, urlparse
+
+import httpx
+from loguru import logger
+
+from docs_updater.http_cache import HttpCache, cached_get, get_http_cache
+from docs_updater.http_client import get_http_client
+from docs_updater.models import MarkdownFile
+from docs_updater.tracing import span
+
+_API = "https://api.github.com"
+_JSON = {"Accept": "application/vnd.github+json"}
+# Makes the commits endpoint return just the commit sha as plain text
+_SHA = {"Accept": "application/vnd.github.sha"}
+
+# How long a resolved ref -> commit sha is reused before asking GitHub again
+REF_CACHE_SECONDS = 60.0
+
+_resolved_refs: dict[tuple[str, str, str], tuple[str, str, float]] = {}
+
+
+@dataclass(frozen=True)
+class GitHubSource:
+    """A repository (or a directory in it) at a commit."""
+
+    owner: str
+    repo: str
+    ref: str
+    sha: str
+    subpath: str = ""
+
+    def raw_url(self, path: str) -> str:
+        return f"https://raw.githubusercontent.com/{self.owner}/{self.repo}/{self.sha}/{path}"
+
+
+async def _commit_sha(
+    owner: str, repo: str, ref: str, client: httpx.AsyncClient, cache: HttpCache | None
+) -> str | None:
+    """Resolve a branch, tag or sha ("HEAD" for the default branch) to a commit sha, or None if it does not exist."""
+    url = f"{_API}/repos/{owner}/{repo}/commits/{quote(ref, safe='')}"
+    with span("github.resolve", url=url):
+        response, _ = await cached_get(client, url, cache, _SHA)
+    if response.status_code in (404, 422):
+        return None
+    response.raise_for_status()
+    return response.text.strip()
+
+
+async def resolve_source(
+    repo_url: str, client: httpx.AsyncClient | None = None, cache: HttpCache | None = None
+) -> GitHubSource:
+    """Work out which repo, commit and directory a github.com URL points at.
+
+    Without a `/tree/<ref>` part the repo's default branch is used. Refs can contain slashes
+    (e.g. `/tree/release/v2/docs`), so successively longer prefixes of the path are tried until
+    one resolves. Resolved shas are cached per repo and ref for `REF_CACHE_SECONDS`.
+    """
+    path_parts = urlparse(repo_url).path.strip("/").split("/")
+    if len(path_parts) < 2:
+        raise ValueError("Invalid GitHub repository URL")
+
+    owner, repo = path_parts[0], path_parts[1].removesuffix(".git")
+    # (ref, subpath) pairs to try, shortest ref first
+    candidates = [("HEAD", "")]
+    if len(path_parts) > 3 and path_parts[2] == "tree":
+        rest = path_parts[3:]
+        candidates = [("/".join(rest[:i]), "/".join(rest[i:])) for i in range(1, len(rest) + 1)]
+
+    client = client or get_http_client()
+    cache = cache or get_http_cache()
+    now = time.monotonic()
+    for ref, subpath in candidates:
+        cached = _resolved_refs.get((owner, repo, ref))
+        if cached and now - cached[2] < REF_CACHE_SECONDS:
+            return GitHubSource(owner, repo, cached[0], cached[1], subpath)
+
+        sha = await _commit_sha(owner, repo, ref, client, cache)
+        if sha:
+            _resolved_refs[owner, repo, ref] = (ref, sha, now)
+            logger.debug(f"{owner}/{repo}@{ref} is {sha}")
+            return GitHubSource(owner, repo, ref, sha, subpath)
+
+    raise ValueError(f"Could not find {candidates[0][0]} in {owner}/{repo}")
+
+
+async def _get_tree(
+    source: GitHubSource, tree_sha: str, recursive: bool, client: httpx.AsyncClient, cache: HttpCache | None
+) -> dict:
+    url = f"{_API}/repos/{source.owner}/{source.repo}/git/trees/{tree_sha}"
+    if recursive:
+        url += "?recursive=1"
+    with span("github.tree", url=url):
+        response, _ = await cached_get(client, url, cache, _JSON)
+    response.raise_for_status()
+    return response.json()
+
+
+def _overlaps(path: str, subpath: str) -> bool:
+    """Whether a directory can contain files under subpath (or is itself under it)."""
+    return not subpath or path == subpath or path.startswith(f"{subpath}/") or subpath.startswith(f"{path}/")
+
+
+async def _list_blobs(
+    source: GitHubSource, tree_sha: str, prefix: str, client: httpx.AsyncClient, cache: HttpCache | None
+) -> list[dict]:
+    """List every blob below a tree, with paths relative to the repo root.
+
+    GitHub truncates recursive listings of very large trees. When that happens this tree is
+    listed one level deep instead, and its subdirectories are listed in parallel.
+    """
+    data = await _get_tree(source, tree_sha, True, client, cache)
+    if not data.get("truncated"):
+        return [{**item, "path": prefix + item["path"]} for item in data["tree"] if item["type"] == "blob"]
+
+    logger.debug(f"Tree listing of {source.owner}/{source.repo}/{prefix} was truncated, listing subtrees")
+    data = await _get_tree(source, tree_sha, False, client, cache)
+    blobs = [{**item, "path": prefix + item["path"]} for item in data["tree"] if item["type"] == "blob"]
+    subtrees = [
+        item for item in data["tree"] if item["type"] == "tree" and _overlaps(prefix + item["path"], source.subpath)
+    ]
+    for result in await asyncio.gather(
+        *(_list_blobs(source, item["sha"], f"{prefix}{item['path']}/", client, cache) for item in subtrees)
+    ):
+        blobs.extend(result)
+    return blobs
+
+
+async def get_github_files(
+    repo_url: str, client: httpx.AsyncClient | None = None, cache: HttpCache | None = None
+) -> list[MarkdownFile]:
+    """Get markdown files from a GitHub repository, with raw URLs pinned to the resolved commit."""
+    client = client or get_http_client()
+    cache = cache or get_http_cache()
+    source = await resolve_source(repo_url, client, cache)
+
+    subpath = source.subpath
+    files = []
+    for item in await _list_blobs(source, source.sha, "", client, cache):
+        path = item["path"]
+        if not path.endswith((".md", ".mdx")):
+            continue
+        if subpath and not path.startswith(f"{subpath}/"):
+            continue
+
+        display_path = path[len(subpath) :].lstrip("/")
+        files.append(MarkdownFile(url=source.raw_url(path), path=display_path, sha=item.get("sha", "")))
+
+    return sorted(files, key=lambda f: f.path)
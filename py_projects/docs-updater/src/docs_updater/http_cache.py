@@ -0,0 +1,200 @@
+"""Persistent on-disk HTTP cache with ETag/Last-Modified revalidation."""
+
+from dataclasses import dataclass
+import hashlib
+import os
+from pathlib import Path
+import sqlite3
+import time
+
+import httpx
+from loguru import logger
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    content_type TEXT,
+    content_hash TEXT NOT NULL,
+    content BLOB NOT NULL,
+    rendered TEXT,
+    fetched_at REAL NOT NULL
+)
+"""
+
+# Responses not fetched or revalidated for this long are dropped when the cache is opened
+MAX_AGE = 30 * 24 * 60 * 60
+# Beyond this total size, the least recently fetched responses are dropped as well
+MAX_BYTES = 512 * 1024 * 1024
+
+
+def default_cache_path() -> Path:
+    """Get the cache database location, honouring DOCS_UPDATER_CACHE_DIR and XDG_CACHE_HOME."""
+    cache_dir = os.environ.get("DOCS_UPDATER_CACHE_DIR")
+    if not cache_dir:
+        cache_dir = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "docs-updater"
+    return Path(cache_dir) / "http_cache.sqlite"
+
+
+def content_hash(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+@dataclass
+class CacheEntry:
+    """A cached response body and the validators needed to revalidate it."""
+
+    url: str
+    etag: str | None
+    last_modified: str | None
+    content_type: str | None
+    content_hash: str
+    content: bytes
+    # Browser-rendered result for pages that need JavaScript, stored as JSON
+    rendered: str | None
+    fetched_at: float
+
+
+class HttpCache:
+    """SQLite-backed store of response bodies keyed by URL."""
+
+    def __init__(self, path: Path | None = None):
+        self.path = path or default_cache_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(_SCHEMA)
+
+    def get(self, url: str) -> CacheEntry | None:
+        row = self._db.execute(
+            "SELECT url, etag, last_modified, content_type, content_hash, content, rendered, fetched_at"
+            " FROM responses WHERE url = ?",
+            (url,),
+        ).fetchone()
+        return CacheEntry(*row) if row else None
+
+    def put(self, url: str, response: httpx.Response) -> CacheEntry:
+        """Store a 200 response, keeping its rendered result if the body did not change."""
+        content = response.content
+        digest = content_hash(content)
+
+        previous = self.get(url)
+        rendered = previous.rendered if previous and previous.content_hash == digest else None
+
+        entry = CacheEntry(
+            url=url,
+            etag=response.headers.get("etag"),
+            last_modified=response.headers.get("last-modified"),
+            content_type=response.headers.get("content-type"),
+            content_hash=digest,
+            content=content,
+            rendered=rendered,
+            fetched_at=time.time(),
+        )
+        with self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    entry.url,
+                    entry.etag,
+                    entry.last_modified,
+                    entry.content_type,
+                    entry.content_hash,
+                    entry.content,
+                    entry.rendered,
+                    entry.fetched_at,
+                ),
+            )
+        return entry
+
+    def put_rendered(self, url: str, rendered: str) -> None:
+        """Attach a browser-rendered result to an already cached response."""
+        with self._db:
+            self._db.execute("UPDATE responses SET rendered = ? WHERE url = ?", (rendered, url))
+
+    def prune(self, max_age: float = MAX_AGE, max_bytes: int = MAX_BYTES) -> int:
+        """Drop responses not fetched for `max_age` seconds, then the oldest beyond `max_bytes` in total.
+
+        Returns how many responses were dropped.
+        """
+        with self._db:
+            removed = self._db.execute("DELETE FROM responses WHERE fetched_at < ?", (time.time() - max_age,)).rowcount
+            sizes = self._db.execute(
+                "SELECT url, length(content) + coalesce(length(rendered), 0) FROM responses ORDER BY fetched_at DESC"
+            ).fetchall()
+            total = 0
+            oversized = []
+            for url, size in sizes:
+                total += size
+                if total > max_bytes:
+                    oversized.append((url,))
+            self._db.executemany("DELETE FROM responses WHERE url = ?", oversized)
+        removed += len(oversized)
+        if removed:
+            logger.debug(f"Pruned {removed} responses from {self.path}")
+        return removed
+
+    def touch(self, url: str) -> None:
+        with self._db:
+            self._db.execute("UPDATE responses SET fetched_at = ? WHERE url = ?", (time.time(), url))
+
+    def close(self) -> None:
+        self._db.close()
+
+
+def _response_from_entry(entry: CacheEntry, request: httpx.Request) -> httpx.Response:
+    headers = {"content-type": entry.content_type} if entry.content_type else {}
+    return httpx.Response(200, headers=headers, content=entry.content, request=request)
+
+
+async def cached_get(
+    client: httpx.AsyncClient,
+    url: str,
+    cache: HttpCache | None,
+    headers: dict[str, str] | None = None,
+) -> tuple[httpx.Response, bool]:
+    """GET a URL, revalidating any cached copy with If-None-Match/If-Modified-Since.
+
+    Returns the response and whether it was served from the cache after a 304. Responses that
+    are not 200 or 304 are returned untouched so callers can raise for status as usual.
+    """
+    entry = cache.get(url) if cache else None
+
+    request_headers = dict(headers or {})
+    if entry and entry.etag:
+        request_headers["If-None-Match"] = entry.etag
+    if entry and entry.last_modified:
+        request_headers["If-Modified-Since"] = entry.last_modified
+
+    response = await client.get(url, headers=request_headers)
+
+    if response.status_code == 304 and entry and cache:
+        logger.debug(f"Not modified: {url}")
+        cache.touch(url)
+        return _response_from_entry(entry, response.request), True
+
+    if response.status_code == 200 and cache:
+        cache.put(url, response)
+
+    return response, False
+
+
+_default_cache: HttpCache | None = None
+
+
+def get_http_cache() -> HttpCache:
+    """Get the process-wide HTTP cache, opening and pruning it on first use."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = HttpCache()
+        _default_cache.prune()
+    return _default_cache
+
+
+def close_http_cache() -> None:
+    """Close the process-wide HTTP cache if it was ever opened."""
+    global _default_cache
+    cache, _default_cache = _default_cache, None
+    if cache is not None:
+        cache.close()
@@ -0,0 +1,55 @@
+"""Shared, pooled httpx client used for all plain HTTP fetches."""
+
+import httpx
+
+from docs_updater.scheduler import SchedulerConfig, SchedulingTransport
+
+DEFAULT_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32, keepalive_expiry=30)
+DEFAULT_TIMEOUT = httpx.Timeout(30, connect=10)
+
+
+def create_http_client(
+    transport: httpx.AsyncBaseTransport | None = None, scheduler: SchedulerConfig | None = None
+) -> httpx.AsyncClient:
+    """Create an HTTP/2 client with keep-alive, tuned connection limits and request scheduling.
+
+    Every request goes through a `SchedulingTransport`, which paces requests per host and retries
+    rate-limited or failed ones. Pass `transport` to route requests somewhere other than the network,
+    e.g. an `httpx.MockTransport`.
+    """
+    if transport is None:
+        transport = httpx.AsyncHTTPTransport(http2=True, limits=DEFAULT_LIMITS)
+    return httpx.AsyncClient(
+        timeout=DEFAULT_TIMEOUT,
+        follow_redirects=True,
+        transport=SchedulingTransport(transport, scheduler),
+    )
+
+
+_default_client: httpx.AsyncClient | None = None
+_default_scheduler: SchedulerConfig | None = None
+
+
+def configure_http_client(scheduler: SchedulerConfig) -> None:
+    """Set the per-host rates and retries of the process-wide HTTP client.
+
+    Takes effect when the client is next created, so call it before making any requests.
+    """
+    global _default_scheduler
+    _default_scheduler = scheduler
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the process-wide HTTP client, creating it on first use."""
+    global _default_client
+    if _default_client is None or _default_client.is_closed:
+        _default_client = create_http_client(scheduler=_default_scheduler)
+    return _default_client
+
+
+async def close_http_client() -> None:
+    """Close the process-wide HTTP client if it was ever created."""
+    global _default_client
+    client, _default_client = _default_client, None
+    if client is not None:
+        await client.aclose()
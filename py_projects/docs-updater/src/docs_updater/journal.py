@@ -0,0 +1,159 @@
+"""On-disk journal of crawl and download progress, so interrupted runs can resume."""
+
+from collections.abc import Iterator
+from dataclasses import dataclass
+import hashlib
+import json
+from pathlib import Path
+import sqlite3
+import time
+import zlib
+
+from loguru import logger
+
+from docs_updater.http_cache import default_cache_path
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    url TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    depth INTEGER NOT NULL DEFAULT 0,
+    path TEXT,
+    content_hash TEXT,
+    content BLOB,
+    error TEXT,
+    updated_at REAL NOT NULL
+)
+"""
+
+_META_SCHEMA = "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+
+_COLUMNS = "url, status, depth, path, content_hash, content, error"
+
+# A journal older than this was left by a run that was abandoned rather than interrupted
+MAX_AGE = 24 * 60 * 60
+
+PENDING = "pending"
+DONE = "done"
+SKIPPED = "skipped"
+FAILED = "failed"
+
+
+@dataclass
+class JournalEntry:
+    """What happened to one URL in a journaled run."""
+
+    url: str
+    status: str
+    depth: int
+    path: str | None
+    content_hash: str | None
+    content: str | None
+    error: str | None
+
+
+def _entry(row: tuple) -> JournalEntry:
+    url, status, depth, path, digest, data, error = row
+    content = zlib.decompress(data).decode() if data is not None else None
+    return JournalEntry(url, status, depth, path, digest, content, error)
+
+
+def journal_path(kind: str, key: str) -> Path:
+    """Where the journal for a job lives, next to the HTTP cache; `key` identifies the job (e.g. its URL)."""
+    digest = hashlib.sha256(key.encode()).hexdigest()[:16]
+    return default_cache_path().parent / "journals" / f"{kind}-{digest}.sqlite"
+
+
+class Journal:
+    """SQLite-backed record of every URL in a crawl or download: pending, done, skipped or failed.
+
+    Each change is committed as it happens, so the journal survives Ctrl-C, crashes and lost
+    connections. Once a run finishes, `finish` deletes it so the next run starts fresh. The journal
+    records when it was created and, through `resume`, the settings of the run it belongs to.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        # WAL with synchronous=NORMAL survives process crashes; only an OS crash may lose the last few writes
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(_SCHEMA)
+        self._db.execute(_META_SCHEMA)
+        self._db.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('created_at', ?)", (str(time.time()),))
+
+    @classmethod
+    def open(cls, kind: str, key: str) -> "Journal":
+        return cls(journal_path(kind, key))
+
+    def has_progress(self) -> bool:
+        return self._db.execute("SELECT 1 FROM entries LIMIT 1").fetchone() is not None
+
+    def resume(self, params: dict[str, object], max_age: float = MAX_AGE) -> bool:
+        """Whether the journal holds progress of a run with the same `params` that began at most `max_age` seconds ago.
+
+        Otherwise any progress it holds is discarded, and it is started over for a run with `params`.
+        """
+        meta = dict(self._db.execute("SELECT key, value FROM meta").fetchall())
+        settings = json.dumps(params, sort_keys=True)
+        if self.has_progress():
+            age = time.time() - float(meta.get("created_at", 0))
+            if age <= max_age and meta.get("params") == settings:
+                logger.info(f"Resuming from {self.path}")
+                return True
+            reason = f"it is {age / 3600:.0f} hours old" if age > max_age else "it was made with other settings"
+            logger.info(f"Discarding {self.path}: {reason}")
+
+        self._db.execute("DELETE FROM entries")
+        self._db.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('created_at', ?), ('params', ?)",
+            (str(time.time()), settings),
+        )
+        return False
+
+    def _set(self, url: str, status: str, **fields: object) -> None:
+        columns = ["url", "status", "updated_at", *fields]
+        placeholders = ", ".join("?" * len(columns))
+        updates = ", ".join(f"{column} = excluded.{column}" for column in columns[1:])
+        self._db.execute(
+            f"INSERT INTO entries ({', '.join(columns)}) VALUES ({placeholders})"
+            f" ON CONFLICT(url) DO UPDATE SET {updates}",
+            (url, status, time.time(), *fields.values()),
+        )
+
+    def add_pending(self, url: str, depth: int = 0) -> None:
+        self._set(url, PENDING, depth=depth)
+
+    def mark_done(self, url: str, path: str, content_hash: str = "", content: str | None = None) -> None:
+        """Record a finished URL, optionally with its content so a resumed run can return it without refetching."""
+        data = zlib.compress(content.encode()) if content is not None else None
+        self._set(url, DONE, path=path, content_hash=content_hash, content=data, error=None)
+
+    def mark_skipped(self, url: str, reason: str) -> None:
+        self._set(url, SKIPPED, error=reason)
+
+    def mark_failed(self, url: str, error: str) -> None:
+        self._set(url, FAILED, error=error)
+
+    def get(self, url: str) -> JournalEntry | None:
+        row = self._db.execute(f"SELECT {_COLUMNS} FROM entries WHERE url = ?", (url,)).fetchone()
+        return _entry(row) if row else None
+
+    def entries(self, *statuses: str) -> Iterator[JournalEntry]:
+        """Yield the entries with any of the given statuses, in the order they were first recorded."""
+        rows = self._db.execute(
+            f"SELECT {_COLUMNS} FROM entries WHERE status IN ({', '.join('?' * len(statuses))}) ORDER BY rowid",
+            statuses,
+        )
+        for row in rows:
+            yield _entry(row)
+
+    def close(self) -> None:
+        self._db.close()
+
+    def finish(self) -> None:
+        """Delete the journal after a run completed."""
+        self.close()
+        for suffix in ("", "-wal", "-shm"):
+            Path(f"{self.path}{suffix}").unlink(missing_ok=True)
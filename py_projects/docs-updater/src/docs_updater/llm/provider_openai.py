@@ -4,20 +4,22 @@ import asyncio
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
 import os
-from typing import Literal
-
-from azure.identity import DefaultAzureCredential, get_bearer_token_provider
-from openai import AsyncAzureOpenAI, AsyncOpenAI, DefaultAioHttpClient
+from typing import TYPE_CHECKING, Literal
 
 from docs_updater.utils.dotenv_helper import load_root_dotenv
 
+if TYPE_CHECKING:
+    from openai import AsyncAzureOpenAI, AsyncOpenAI
+
 load_root_dotenv()
 
 
 @asynccontextmanager
 async def create_client(
     provider: Literal["openai", "azure_openai"] = "openai",
-) -> AsyncGenerator[AsyncOpenAI | AsyncAzureOpenAI, None]:
+) -> AsyncGenerator["AsyncOpenAI | AsyncAzureOpenAI", None]:
+    from openai import AsyncAzureOpenAI, AsyncOpenAI, DefaultAioHttpClient
+
     match provider:
         case "openai":
             client = AsyncOpenAI(
@@ -39,6 +41,8 @@ async def create_client(
                     http_client=DefaultAioHttpClient(),
                 )
             else:
+                from azure.identity import DefaultAzureCredential, get_bearer_token_provider
+
                 token_provider = get_bearer_token_provider(
                     DefaultAzureCredential(),
                     "https://cognitiveservices.azure.com/.default",
@@ -0,0 +1,296 @@
+"""Summarize downloaded doc pages with an LLM and condense them into an llms.txt-style digest."""
+
+import asyncio
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+import hashlib
+from pathlib import Path
+import random
+import sqlite3
+import time
+from typing import TYPE_CHECKING
+
+from loguru import logger
+
+from docs_updater.http_cache import default_cache_path
+from docs_updater.manifest import Manifest
+from docs_updater.models import MarkdownFile
+from docs_updater.tokens import INDEX_NAME
+
+if TYPE_CHECKING:
+    from openai import AsyncAzureOpenAI, AsyncOpenAI
+
+DEFAULT_MODEL = "gpt-5-mini"
+
+PAGE_PROMPT = (
+    "You summarize one page of software documentation for an index that helps an AI coding assistant "
+    "decide which pages to read. Reply with one or two plain sentences (no markdown, at most 40 words) "
+    "saying what the page covers and when a developer would need it."
+)
+
+DIGEST_PROMPT = (
+    "You are given one-line summaries of every page in a documentation set. Reply with two or three "
+    "plain sentences (no markdown) describing what the documentation covers as a whole."
+)
+
+# Longer pages are cut to this many characters before summarizing; the start of a page says what it is about
+MAX_INPUT_CHARS = 100_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS summaries (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    created_at REAL NOT NULL
+)
+"""
+
+
+def summary_key(model: str, instructions: str, text: str) -> str:
+    """Cache key for a summary: the same model, prompt and content always get the same summary."""
+    digest = hashlib.sha256()
+    for part in (model, instructions, text):
+        digest.update(hashlib.sha256(part.encode()).digest())
+    return digest.hexdigest()
+
+
+class SummaryCache:
+    """SQLite-backed store of LLM responses, keyed by `summary_key`."""
+
+    def __init__(self, path: Path | None = None):
+        self.path = path or default_cache_path().with_name("summaries.sqlite")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(_SCHEMA)
+
+    def get(self, key: str) -> str | None:
+        row = self._db.execute("SELECT summary FROM summaries WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def put(self, key: str, model: str, summary: str) -> None:
+        with self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO summaries (key, model, summary, created_at) VALUES (?, ?, ?, ?)",
+                (key, model, summary, time.time()),
+            )
+
+    def close(self) -> None:
+        self._db.close()
+
+
+class AdaptiveLimiter:
+    """Concurrency limit that backs off when the API rate-limits and recovers as requests succeed.
+
+    Starts at `max_concurrency` requests in flight. A 429 halves the limit (down to 1, once per
+    burst of 429s) and holds every new request until its Retry-After has passed. Each run of
+    successes as long as the current limit raises it by one again, up to `max_concurrency`.
+    """
+
+    def __init__(self, max_concurrency: int = 8):
+        self.max_concurrency = max_concurrency
+        self.limit = max_concurrency
+        self.in_flight = 0
+        self._successes = 0
+        self._paused_until = 0.0
+        self._changed = asyncio.Condition()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncGenerator[None, None]:
+        async with self._changed:
+            await self._changed.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+        try:
+            delay = self._paused_until - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            yield
+        finally:
+            async with self._changed:
+                self.in_flight -= 1
+                self._changed.notify_all()
+
+    def succeeded(self) -> None:
+        self._successes += 1
+        if self._successes >= self.limit and self.limit < self.max_concurrency:
+            self.limit += 1
+            self._successes = 0
+
+    def rate_limited(self, retry_after: float) -> None:
+        now = time.monotonic()
+        # Requests that were already in flight when the first 429 arrived only extend the pause
+        if now >= self._paused_until and self.limit > 1:
+            self.limit //= 2
+            logger.info(f"Rate limited by the LLM API, lowering concurrency to {self.limit}")
+        self._successes = 0
+        self._paused_until = max(self._paused_until, now + retry_after)
+
+
+def _retry_after(error: Exception, attempt: int) -> float:
+    """Seconds to wait before retrying, from the response's Retry-After header or exponential backoff."""
+    response = getattr(error, "response", None)
+    header = response.headers.get("retry-after") if response is not None else None
+    if header is not None:
+        try:
+            return max(0.0, float(header))
+        except ValueError:
+            # An HTTP-date; the backoff below is close enough
+            logger.debug(f"Ignoring Retry-After that is not a number of seconds: {header}")
+    return min(60.0, 2**attempt) * random.uniform(0.5, 1.0)
+
+
+@dataclass
+class PageSummary:
+    """The summary of one page, or why it could not be summarized."""
+
+    file: MarkdownFile
+    summary: str = ""
+    cached: bool = False
+    error: str | None = None
+
+
+class Summarizer:
+    """Summarizes texts with an OpenAI-compatible Responses API, as cheaply as the API allows.
+
+    - A summary is cached by model, prompt and content, so an unchanged page is never sent twice.
+    - Identical requests that are in flight at the same time share one API call.
+    - At most `max_concurrency` calls run at once, fewer while the API answers with 429s.
+    - Rate-limited, overloaded and failed connections are retried up to `max_retries` times.
+    """
+
+    def __init__(
+        self,
+        client: "AsyncOpenAI | AsyncAzureOpenAI",
+        model: str = DEFAULT_MODEL,
+        max_concurrency: int = 8,
+        max_retries: int = 5,
+        cache: SummaryCache | None = None,
+    ):
+        # Retries are handled here, so the limiter sees every 429
+        self.client = client.with_options(max_retries=0)
+        self.model = model
+        self.max_retries = max_retries
+        self.cache = cache or SummaryCache()
+        self.limiter = AdaptiveLimiter(max_concurrency)
+        self.api_calls = 0
+        self._in_flight: dict[str, asyncio.Future[str]] = {}
+
+    async def summarize(self, text: str, instructions: str = PAGE_PROMPT) -> tuple[str, bool]:
+        """Summarize a text, returning the summary and whether it came from the cache."""
+        text = text[:MAX_INPUT_CHARS]
+        key = summary_key(self.model, instructions, text)
+        if (summary := self.cache.get(key)) is not None:
+            return summary, True
+
+        if (pending := self._in_flight.get(key)) is not None:
+            return await asyncio.shield(pending), False
+
+        future = self._in_flight[key] = asyncio.get_running_loop().create_future()
+        try:
+            summary = await self._call(instructions, text)
+            self.cache.put(key, self.model, summary)
+            future.set_result(summary)
+            return summary, False
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Callers that joined this request see the error too; mark it retrieved in case there are none
+            future.exception()
+            raise
+        finally:
+            del self._in_flight[key]
+
+    async def _call(self, instructions: str, text: str) -> str:
+        from openai import APIConnectionError, APIStatusError, RateLimitError
+
+        attempt = 0
+        while True:
+            async with self.limiter.slot():
+                try:
+                    self.api_calls += 1
+                    response = await self.client.responses.create(
+                        model=self.model, instructions=instructions, input=text
+                    )
+                    self.limiter.succeeded()
+                    return response.output_text.strip()
+                except RateLimitError as e:
+                    if attempt >= self.max_retries:
+                        raise
+                    # The limiter holds back every request until the API is ready again
+                    self.limiter.rate_limited(_retry_after(e, attempt))
+                    delay = 0.0
+                except (APIConnectionError, APIStatusError) as e:
+                    overloaded = isinstance(e, APIConnectionError) or e.status_code >= 500
+                    if not overloaded or attempt >= self.max_retries:
+                        raise
+                    delay = _retry_after(e, attempt)
+                    logger.debug(f"LLM request failed ({e}), retrying in {delay:.1f}s")
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def summarize_files(self, files: list[MarkdownFile], folder: Path | None = None) -> list[PageSummary]:
+        """Summarize pages concurrently, reading each from `folder` if its content was already released."""
+
+        async def one(file: MarkdownFile) -> PageSummary:
+            try:
+                text = file.content
+                if not text and folder is not None:
+                    text = (folder / file.path).read_text(errors="replace")
+                if not text.strip():
+                    return PageSummary(file, error="empty page")
+                summary, cached = await self.summarize(text)
+                return PageSummary(file, summary, cached)
+            except Exception as e:
+                logger.warning(f"Could not summarize {file.path}: {e}")
+                return PageSummary(file, error=str(e) or type(e).__name__)
+
+        return await asyncio.gather(*(one(file) for file in files))
+
+    async def digest(self, title: str, summaries: list[PageSummary]) -> str:
+        """Condense page summaries into an llms.txt-style digest: an overview, then one line per page."""
+        done = sorted((page for page in summaries if page.summary), key=lambda page: page.file.path)
+        lines = [f"- [{page.file.path}]({page.file.url}): {page.summary}" for page in done]
+        overview, _ = await self.summarize("\n".join(lines), DIGEST_PROMPT) if lines else ("", False)
+        header = [f"# {title}", ""] + ([f"> {overview}", ""] if overview else [])
+        return "\n".join([*header, "## Docs", "", *lines]) + "\n"
+
+
+def folder_files(folder: Path) -> list[MarkdownFile]:
+    """List the markdown pages in a downloaded folder, with their source URLs from its manifest."""
+    manifest = Manifest.load(folder)
+    files = []
+    for path in sorted(folder.rglob("*.md")):
+        relative = path.relative_to(folder).as_posix()
+        if relative != INDEX_NAME:
+            entry = manifest.files.get(relative)
+            files.append(MarkdownFile(url=entry.url if entry else relative, path=relative))
+    return files
+
+
+async def summarize_folder(
+    folder: Path,
+    client: "AsyncOpenAI | AsyncAzureOpenAI",
+    model: str = DEFAULT_MODEL,
+    max_concurrency: int = 8,
+    output: Path | None = None,
+) -> list[PageSummary]:
+    """Summarize every page in a downloaded folder and write the digest to `output` (default: `<folder>/llms.txt`)."""
+    files = folder_files(folder)
+    summarizer = Summarizer(client, model, max_concurrency)
+    try:
+        summaries = await summarizer.summarize_files(files, folder)
+        digest = await summarizer.digest(folder.name, summaries)
+    finally:
+        summarizer.cache.close()
+
+    output = output or folder / "llms.txt"
+    output.write_text(digest)
+    cached = sum(page.cached for page in summaries)
+    failed = sum(page.error is not None for page in summaries)
+    logger.info(
+        f"Wrote {output}: {len(files)} pages, {cached} from cache, {failed} failed, {summarizer.api_calls} API calls"
+    )
+    return summaries
@@ -0,0 +1,102 @@
+"""Per-folder manifest of downloaded files, used to refresh a doc set incrementally."""
+
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime
+import json
+from pathlib import Path
+
+from docs_updater.models import MarkdownFile
+
+MANIFEST_NAME = ".docs-manifest.json"
+
+
+@dataclass
+class ManifestEntry:
+    """What was downloaded to a path, and from where."""
+
+    sha: str
+    url: str
+    fetched_at: str
+
+
+@dataclass
+class Manifest:
+    """Maps each downloaded file's path (relative to its folder) to the blob it was downloaded from."""
+
+    source: str = ""
+    files: dict[str, ManifestEntry] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, folder: Path) -> "Manifest":
+        path = folder / MANIFEST_NAME
+        if not path.exists():
+            return cls()
+
+        data = json.loads(path.read_text())
+        files = {file_path: ManifestEntry(**entry) for file_path, entry in data.get("files", {}).items()}
+        return cls(source=data.get("source", ""), files=files)
+
+    def save(self, folder: Path) -> None:
+        data = {
+            "source": self.source,
+            "files": {file_path: asdict(entry) for file_path, entry in sorted(self.files.items())},
+        }
+        (folder / MANIFEST_NAME).write_text(json.dumps(data, indent=2) + "\n")
+
+    def record(self, file: MarkdownFile) -> None:
+        self.files[file.path] = ManifestEntry(sha=file.sha, url=file.url, fetched_at=datetime.now(UTC).isoformat())
+
+
+@dataclass
+class RefreshPlan:
+    """Difference between a manifest and the files currently available at the source."""
+
+    added: list[MarkdownFile] = field(default_factory=list)
+    changed: list[MarkdownFile] = field(default_factory=list)
+    unchanged: list[MarkdownFile] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    # Files no longer listed that are kept anyway, because the listing may be incomplete
+    kept: list[str] = field(default_factory=list)
+
+    @property
+    def to_download(self) -> list[MarkdownFile]:
+        return self.added + self.changed
+
+    def summary(self) -> str:
+        text = (
+            f"{len(self.added)} added, {len(self.changed)} changed, "
+            f"{len(self.removed)} removed, {len(self.unchanged)} unchanged"
+        )
+        if self.kept:
+            text += f", {len(self.kept)} no longer listed but kept"
+        return text
+
+
+def is_complete_listing(files: list[MarkdownFile]) -> bool:
+    """Whether a listing names every file at its source, so that anything missing from it was deleted.
+
+    Only GitHub tree listings, where every file has a blob sha, are complete; a crawl may miss
+    pages it could not reach or fetch.
+    """
+    return bool(files) and all(file.sha for file in files)
+
+
+def plan_refresh(files: list[MarkdownFile], manifest: Manifest) -> RefreshPlan:
+    """Work out which files need downloading or deleting to bring a folder up to date.
+
+    Files without a known sha (e.g. crawled web pages) are always treated as changed.
+    """
+    plan = RefreshPlan()
+    current = {file.path for file in files}
+
+    for file in files:
+        entry = manifest.files.get(file.path)
+        if entry is None:
+            plan.added.append(file)
+        elif file.sha and entry.sha == file.sha:
+            plan.unchanged.append(file)
+        else:
+            plan.changed.append(file)
+
+    plan.removed = sorted(path for path in manifest.files if path not in current)
+    return plan
@@ -0,0 +1,14 @@
+"""Lightweight data types shared by the crawler, downloader and UI."""
+
+from dataclasses import dataclass
+
+
+@dataclass
+class MarkdownFile:
+    """Represents a markdown file to download."""
+
+    url: str
+    path: str
+    content: str = ""
+    # Git blob sha for files from GitHub, used to skip unchanged files on refresh
+    sha: str = ""
@@ -0,0 +1,179 @@
+"""CPU-bound page post-processing (HTML to markdown, link extraction) in a pool of worker processes."""
+
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from html.parser import HTMLParser
+import multiprocessing
+import os
+
+from crawl4ai.markdown_generation_strategy import DefaultMarkdownGenerator
+from loguru import logger
+
+# A converted page: its markdown and the (href, text) of every link on it
+Converted = tuple[str, list[tuple[str, str]]]
+
+
+class _LinkExtractor(HTMLParser):
+    """Collects the href and text of every <a> tag in an HTML document."""
+
+    def __init__(self):
+        super().__init__()
+        self.anchors: list[tuple[str, str]] = []
+        self._href: str | None = None
+        self._text: list[str] = []
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag == "a":
+            self._href = dict(attrs).get("href")
+            self._text = []
+
+    def handle_data(self, data: str) -> None:
+        if self._href is not None:
+            self._text.append(data)
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "a" and self._href:
+            self.anchors.append((self._href, "".join(self._text).strip()))
+            self._href = None
+
+
+def convert_html(url: str, html: str) -> Converted:
+    """Convert an HTML page to markdown and collect its links."""
+    generator = DefaultMarkdownGenerator()
+    markdown = generator.generate_markdown(input_html=html, base_url=url, citations=False).raw_markdown
+    extractor = _LinkExtractor()
+    extractor.feed(html)
+    return markdown, extractor.anchors
+
+
+def _convert_batch(pages: list[tuple[str, str]]) -> list[Converted | Exception]:
+    """Convert a batch of pages in a worker process; a page that fails does not fail the others."""
+    results: list[Converted | Exception] = []
+    for url, html in pages:
+        try:
+            results.append(convert_html(url, html))
+        except Exception as e:
+            results.append(e)
+    return results
+
+
+@dataclass
+class _Job:
+    url: str
+    html: str
+    future: asyncio.Future[Converted]
+
+
+class MarkdownProcessor:
+    """Runs `convert_html` in worker processes so large pages never stall the event loop.
+
+    One dispatcher per worker process takes whatever pages are waiting, up to `batch_size`, and
+    sends them as one batch; small pages then share an inter-process round trip, and a busy pool
+    naturally produces bigger batches. At most `max_pending` pages are queued or converting at
+    once; further `convert` calls wait for room, which slows the crawl down to what the pool keeps
+    up with instead of buffering pages in memory.
+
+    Pages shorter than `inline_below` characters convert in a few milliseconds, less than the
+    round trip to a worker, so they are converted in-process.
+    """
+
+    def __init__(
+        self,
+        workers: int | None = None,
+        batch_size: int = 16,
+        max_pending: int | None = None,
+        inline_below: int = 32_768,
+    ):
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.inline_below = inline_below
+        self.max_pending = max_pending or self.workers * batch_size * 2
+        self._executor: Executor | None = None
+        self._queue: asyncio.Queue[_Job] | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self._dispatchers: list[asyncio.Task] = []
+
+    def _pool(self) -> Executor:
+        if self._executor is None:
+            # Workers are spawned rather than forked, since forking a process with running threads is unsafe
+            context = multiprocessing.get_context("spawn")
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+        return self._executor
+
+    def _start(self) -> tuple[asyncio.Queue[_Job], asyncio.Semaphore]:
+        if self._queue is None or self._slots is None:
+            self._queue = asyncio.Queue()
+            self._slots = asyncio.Semaphore(self.max_pending)
+            self._dispatchers = [asyncio.create_task(self._dispatch(self._queue)) for _ in range(self.workers)]
+        return self._queue, self._slots
+
+    async def convert(self, url: str, html: str) -> Converted:
+        """Convert an HTML page to markdown and collect its links, in a worker process unless it is small."""
+        if len(html) < self.inline_below:
+            return convert_html(url, html)
+        queue, slots = self._start()
+        async with slots:
+            future = asyncio.get_running_loop().create_future()
+            queue.put_nowait(_Job(url, html, future))
+            return await future
+
+    async def _dispatch(self, queue: asyncio.Queue[_Job]) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            jobs = [await queue.get()]
+            while len(jobs) < self.batch_size and not queue.empty():
+                jobs.append(queue.get_nowait())
+            # Skip pages whose caller gave up while they were queued
+            jobs = [job for job in jobs if not job.future.done()]
+            if not jobs:
+                continue
+
+            executor = self._pool()
+            try:
+                results = await loop.run_in_executor(executor, _convert_batch, [(job.url, job.html) for job in jobs])
+            except BrokenProcessPool as e:
+                logger.warning(f"Markdown worker process died, restarting the pool: {e}")
+                executor.shutdown(wait=False, cancel_futures=True)
+                if self._executor is executor:
+                    self._executor = None
+                results = [e] * len(jobs)
+
+            for job, result in zip(jobs, results, strict=True):
+                if job.future.done():
+                    continue
+                if isinstance(result, Exception):
+                    job.future.set_exception(result)
+                else:
+                    job.future.set_result(result)
+
+    async def close(self) -> None:
+        """Stop the dispatchers and shut down the worker processes."""
+        for task in self._dispatchers:
+            task.cancel()
+        await asyncio.gather(*self._dispatchers, return_exceptions=True)
+        self._dispatchers = []
+        self._queue = self._slots = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+_default_processor: MarkdownProcessor | None = None
+
+
+def get_markdown_processor() -> MarkdownProcessor:
+    """Get the process-wide markdown processor, creating it on first use."""
+    global _default_processor
+    if _default_processor is None:
+        _default_processor = MarkdownProcessor()
+    return _default_processor
+
+
+async def close_markdown_processor() -> None:
+    """Shut down the process-wide markdown processor's workers if it was ever created."""
+    global _default_processor
+    processor, _default_processor = _default_processor, None
+    if processor is not None:
+        await processor.close()
@@ -0,0 +1,121 @@
+"""Progress events emitted by crawls and downloads, and helpers to summarize them."""
+
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+from enum import StrEnum
+import time
+
+from loguru import logger
+
+
+class ProgressKind(StrEnum):
+    DISCOVERED = "discovered"
+    STARTED = "started"
+    FETCHED = "fetched"
+    ERROR = "error"
+
+
+@dataclass(frozen=True)
+class ProgressEvent:
+    """Something happened to one URL during a crawl or download."""
+
+    kind: ProgressKind
+    url: str
+    size: int = 0
+    error: str | None = None
+
+
+ProgressCallback = Callable[[ProgressEvent], None]
+
+
+class ProgressTracker:
+    """Aggregates progress events into counts, throughput and an ETA."""
+
+    def __init__(self, window: float = 10.0):
+        self.window = window
+        self.discovered = 0
+        self.fetched = 0
+        self.errors = 0
+        self.bytes = 0
+        self.in_flight = 0
+        self.started_at = time.monotonic()
+        self._completions: deque[float] = deque()
+
+    def __call__(self, event: ProgressEvent) -> None:
+        match event.kind:
+            case ProgressKind.DISCOVERED:
+                self.discovered += 1
+            case ProgressKind.STARTED:
+                self.in_flight += 1
+            case ProgressKind.FETCHED:
+                self.fetched += 1
+                self.bytes += event.size
+                self.in_flight = max(0, self.in_flight - 1)
+                self._completions.append(time.monotonic())
+            case ProgressKind.ERROR:
+                self.errors += 1
+                self.in_flight = max(0, self.in_flight - 1)
+                self._completions.append(time.monotonic())
+
+    @property
+    def done(self) -> int:
+        return self.fetched + self.errors
+
+    def rate(self) -> float:
+        """Files completed per second over the recent window."""
+        now = time.monotonic()
+        while self._completions and now - self._completions[0] > self.window:
+            self._completions.popleft()
+
+        elapsed = min(self.window, now - self.started_at)
+        return len(self._completions) / elapsed if elapsed > 0 else 0.0
+
+    def eta(self) -> float | None:
+        """Seconds until every discovered URL is done, or None if there is no rate yet."""
+        rate = self.rate()
+        remaining = self.discovered - self.done
+        if rate <= 0 or remaining <= 0:
+            return None
+        return remaining / rate
+
+    def format(self) -> str:
+        parts = [f"{self.done}/{self.discovered} done", f"{self.rate():.1f} files/s"]
+        if self.in_flight:
+            parts.append(f"{self.in_flight} in flight")
+        if self.errors:
+            parts.append(f"{self.errors} errors")
+        parts.append(f"{self.bytes / 1_000_000:.1f} MB")
+
+        eta = self.eta()
+        if eta is not None:
+            parts.append(f"ETA {int(eta) // 60}:{int(eta) % 60:02d}")
+        return ", ".join(parts)
+
+
+class LoggingProgress(ProgressTracker):
+    """Progress tracker that logs errors and a periodic summary line, for headless runs."""
+
+    def __init__(self, label: str, interval: float = 5.0):
+        super().__init__()
+        self.label = label
+        self.interval = interval
+        self._last_log = 0.0
+
+    def __call__(self, event: ProgressEvent) -> None:
+        super().__call__(event)
+        if event.kind == ProgressKind.ERROR:
+            logger.warning(f"[{self.label}] {event.url}: {event.error}")
+
+        now = time.monotonic()
+        if now - self._last_log >= self.interval:
+            self._last_log = now
+            logger.info(f"[{self.label}] {self.format()}")
+
+
+def emit(
+    progress: ProgressCallback | None, kind: ProgressKind, url: str, size: int = 0, error: str | None = None
+) -> None:
+    """Send an event to a progress callback, if there is one."""
+    if progress is not None:
+        progress(ProgressEvent(kind, url, size, error))
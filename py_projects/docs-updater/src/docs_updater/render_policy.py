@@ -0,0 +1,100 @@
+"""Per-site memory of how much rendering a page needs before its markdown is complete."""
+
+from enum import IntEnum
+import re
+from urllib.parse import urlsplit
+
+from loguru import logger
+
+# Pages with less markdown than this are assumed not to have rendered yet
+MIN_MARKDOWN = 200
+
+_JS_REQUIRED_MARKERS = ("enable javascript", "requires javascript", "javascript is disabled")
+
+# Text left behind by content that loads later, e.g. on scroll
+_PLACEHOLDER_MARKERS = ("loading...", "loading…", "load more", "show more results")
+
+_HEADING = re.compile(r"^#{1,6} ", re.MULTILINE)
+
+
+class RenderLevel(IntEnum):
+    """How a page is fetched, from cheapest to most expensive."""
+
+    STATIC = 0  # Plain HTTP fetch converted to markdown, no browser
+    RENDER = 1  # Browser render with JavaScript, without scrolling
+    SCROLL = 2  # Browser render that also scrolls the whole page (scan_full_page) for lazy content
+
+
+def incomplete_reason(markdown: str) -> str | None:
+    """Say why a page's markdown looks unfinished, or None if it looks complete.
+
+    The markdown is unfinished if it is very short, asks for JavaScript, has no headings at all
+    despite being a short page, or ends on a loading placeholder.
+    """
+    text = markdown.strip()
+    if len(text) < MIN_MARKDOWN:
+        return f"only {len(text)} characters"
+
+    lowered = text.lower()
+    head, tail = lowered[:2000], lowered[-500:]
+    if any(marker in head for marker in _JS_REQUIRED_MARKERS):
+        return "asks for JavaScript"
+    if any(marker in tail for marker in _PLACEHOLDER_MARKERS):
+        return "ends on a loading placeholder"
+    if len(text) < 1000 and not _HEADING.search(text):
+        return "short page without headings"
+    return None
+
+
+class RenderPolicy:
+    """Remembers the cheapest render level that produced complete pages, per host and path prefix.
+
+    A URL starts at the level learned for its prefix (host plus first path segment), or failing
+    that the lowest level learned anywhere on its host, or `STATIC`. When a level produces
+    incomplete markdown the page is retried one level up, and the prefix remembers the level
+    that worked. Every `reprobe_every` pages an escalated prefix tries one level lower again, so
+    one odd page does not make a whole section expensive for good.
+    """
+
+    def __init__(self, reprobe_every: int = 25):
+        self.reprobe_every = reprobe_every
+        self._prefixes: dict[str, RenderLevel] = {}
+        self._hosts: dict[str, RenderLevel] = {}
+        self._uses: dict[str, int] = {}
+
+    @staticmethod
+    def _keys(url: str) -> tuple[str, str]:
+        parts = urlsplit(url)
+        segment = parts.path.lstrip("/").partition("/")[0]
+        return parts.netloc, f"{parts.netloc}/{segment}"
+
+    def level_for(self, url: str) -> RenderLevel:
+        """The level to try first for a URL."""
+        host, prefix = self._keys(url)
+        level = self._prefixes.get(prefix)
+        if level is None:
+            return self._hosts.get(host, RenderLevel.STATIC)
+
+        uses = self._uses[prefix] = self._uses.get(prefix, 0) + 1
+        if level > RenderLevel.STATIC and uses % self.reprobe_every == 0:
+            return RenderLevel(level - 1)
+        return level
+
+    def record(self, url: str, level: RenderLevel) -> None:
+        """Remember that `level` produced a complete page for this URL."""
+        host, prefix = self._keys(url)
+        if self._prefixes.get(prefix) != level:
+            logger.debug(f"Render policy for {prefix}: {level.name}")
+        self._prefixes[prefix] = level
+        self._hosts[host] = min(level, self._hosts.get(host, level))
+
+
+_default_policy: RenderPolicy | None = None
+
+
+def get_render_policy() -> RenderPolicy:
+    """Get the process-wide render policy, creating it on first use."""
+    global _default_policy
+    if _default_policy is None:
+        _default_policy = RenderPolicy()
+    return _default_policy
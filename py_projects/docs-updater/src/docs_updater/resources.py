@@ -0,0 +1,30 @@
+"""Shutdown of process-wide resources (browser pool, markdown workers, HTTP client, HTTP cache)."""
+
+import sys
+
+
+async def close_shared_resources() -> None:
+    """Close every shared resource that was actually created.
+
+    Modules that were never imported are skipped, so shutting down does not pull in
+    crawl4ai or httpx just to find there is nothing to close.
+    """
+    if "docs_updater.browser_pool" in sys.modules:
+        from docs_updater.browser_pool import close_browser_pool
+
+        await close_browser_pool()
+
+    if "docs_updater.postprocess" in sys.modules:
+        from docs_updater.postprocess import close_markdown_processor
+
+        await close_markdown_processor()
+
+    if "docs_updater.http_client" in sys.modules:
+        from docs_updater.http_client import close_http_client
+
+        await close_http_client()
+
+    if "docs_updater.http_cache" in sys.modules:
+        from docs_updater.http_cache import close_http_cache
+
+        close_http_cache()
@@ -0,0 +1,176 @@
+"""Request scheduling shared by every HTTP call: per-host token buckets, retries and rate-limit handling."""
+
+import asyncio
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+import os
+import random
+import time
+
+import httpx
+from loguru import logger
+
+from docs_updater.utils.dotenv_helper import load_root_dotenv
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+GITHUB_HOSTS = {"api.github.com", "raw.githubusercontent.com", "codeload.github.com"}
+
+
+class TokenBucket:
+    """Allows `rate` requests per second on average, with bursts of up to `burst`."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+@dataclass
+class SchedulerConfig:
+    """Retry and pacing settings for a `SchedulingTransport`.
+
+    Every host gets a token bucket of `default_rate` requests per second, or its rate in `host_rates`.
+    """
+
+    max_retries: int = 5
+    backoff_base: float = 0.5
+    backoff_max: float = 30.0
+    # Waits longer than this (e.g. an hour-long GitHub rate-limit reset) give up instead of sleeping
+    max_wait: float = 300.0
+    default_rate: float = 20.0
+    default_burst: float = 20.0
+    host_rates: dict[str, float] = field(default_factory=lambda: {"api.github.com": 5.0})
+
+
+def scheduler_config(per_host_rate: float | None = None, host_rates: dict[str, float] | None = None) -> SchedulerConfig:
+    """Scheduler settings that allow at most `per_host_rate` requests per second to any one host.
+
+    Built-in per-host rates (e.g. for the GitHub API) are lowered to `per_host_rate` if they are above
+    it, and `host_rates` then sets the rate of individual hosts.
+    """
+    config = SchedulerConfig()
+    if per_host_rate:
+        config.default_rate = per_host_rate
+        config.host_rates = {host: min(rate, per_host_rate) for host, rate in config.host_rates.items()}
+    config.host_rates.update(host_rates or {})
+    return config
+
+
+def _retry_after(response: httpx.Response) -> float | None:
+    """Seconds the server asked us to wait, from Retry-After or GitHub's X-RateLimit headers."""
+    retry_after = response.headers.get("retry-after")
+    if retry_after:
+        if retry_after.isdigit():
+            return float(retry_after)
+        try:
+            return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+        except (TypeError, ValueError):
+            pass
+
+    if response.headers.get("x-ratelimit-remaining") == "0":
+        reset = response.headers.get("x-ratelimit-reset")
+        if reset and reset.isdigit():
+            return max(0.0, int(reset) - time.time()) + 1
+    return None
+
+
+def _is_rate_limited(response: httpx.Response) -> bool:
+    # GitHub reports rate limits as 403 rather than 429: an exhausted primary limit has no remaining
+    # quota, and a secondary limit (too many requests at once) comes with a Retry-After
+    return response.status_code == 429 or (
+        response.status_code == 403
+        and (response.headers.get("x-ratelimit-remaining") == "0" or "retry-after" in response.headers)
+    )
+
+
+class SchedulingTransport(httpx.AsyncBaseTransport):
+    """Transport wrapper that paces, authenticates and retries requests before handing them on.
+
+    Requests to each host go through a token bucket. 429s, 5xx responses, GitHub rate-limit 403s
+    and connection errors are retried with jittered exponential backoff, honouring Retry-After
+    and X-RateLimit-Reset. When a host reports no remaining quota, further requests to it wait
+    until the reset. A GITHUB_TOKEN from the environment or the repo's .env is sent to GitHub hosts.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, config: SchedulerConfig | None = None):
+        self.transport = transport
+        self.config = config or SchedulerConfig()
+        self._buckets: dict[str, TokenBucket] = {}
+        self._blocked_until: dict[str, float] = {}
+
+        load_root_dotenv()
+        self.github_token = os.environ.get("GITHUB_TOKEN") or None
+
+    def _bucket(self, host: str) -> TokenBucket:
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            rate = self.config.host_rates.get(host, self.config.default_rate)
+            bucket = self._buckets[host] = TokenBucket(rate, max(1.0, min(rate, self.config.default_burst)))
+        return bucket
+
+    def _backoff(self, attempt: int) -> float:
+        delay = min(self.config.backoff_max, self.config.backoff_base * 2**attempt)
+        return random.uniform(delay / 2, delay)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        if self.github_token and host in GITHUB_HOSTS and "authorization" not in request.headers:
+            request.headers["Authorization"] = f"Bearer {self.github_token}"
+
+        attempt = 0
+        while True:
+            blocked = self._blocked_until.get(host, 0) - time.time()
+            if blocked > 0:
+                await asyncio.sleep(blocked)
+            await self._bucket(host).acquire()
+
+            try:
+                response = await self.transport.handle_async_request(request)
+            except httpx.TransportError as e:
+                if attempt >= self.config.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                logger.debug(f"{request.url}: {e!r}, retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+
+            if response.headers.get("x-ratelimit-remaining") == "0":
+                wait = _retry_after(response)
+                if wait is not None and wait <= self.config.max_wait:
+                    self._blocked_until[host] = time.time() + wait
+
+            retryable = response.status_code in RETRY_STATUSES or _is_rate_limited(response)
+            if not retryable or attempt >= self.config.max_retries:
+                return response
+
+            wait = _retry_after(response)
+            delay = wait if wait is not None else self._backoff(attempt)
+            if delay > self.config.max_wait:
+                hint = ""
+                if host in GITHUB_HOSTS and not self.github_token:
+                    hint = " (set GITHUB_TOKEN for a higher rate limit)"
+                logger.error(f"{host} asked us to wait {delay:.0f}s, giving up on {request.url}{hint}")
+                return response
+
+            logger.warning(f"{request.url} returned {response.status_code}, retrying in {delay:.1f}s")
+            await response.aclose()
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
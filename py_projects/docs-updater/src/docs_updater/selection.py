@@ -0,0 +1,130 @@
+"""Path-indexed selection state for large file trees."""
+
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+
+from docs_updater.models import MarkdownFile
+
+
+@dataclass
+class DirNode:
+    """A directory in the selection trie, with per-subtree file and selection counts."""
+
+    path: str
+    parent: "DirNode | None" = None
+    dirs: dict[str, "DirNode"] = field(default_factory=dict)
+    files: dict[str, MarkdownFile] = field(default_factory=dict)
+    total: int = 0
+    selected: int = 0
+    selected_files: set[str] = field(default_factory=set)
+    # Pending "select/deselect everything below" that has not been pushed down to children yet
+    mark: bool | None = None
+
+
+class SelectionTree:
+    """Prefix trie of file paths that tracks which files are selected.
+
+    Selecting or deselecting a whole directory only updates that directory and its ancestors;
+    the change is pushed down to a directory's children lazily, the next time they are looked at.
+    """
+
+    def __init__(self, files: list[MarkdownFile]):
+        self.root = DirNode(path="")
+        for file in {file.path: file for file in files}.values():
+            *dirs, name = file.path.split("/")
+            node = self.root
+            node.total += 1
+            for part in dirs:
+                child = node.dirs.get(part)
+                if child is None:
+                    child = node.dirs[part] = DirNode(path=f"{node.path}/{part}".lstrip("/"), parent=node)
+                node = child
+                node.total += 1
+            node.files[name] = file
+
+    @property
+    def total(self) -> int:
+        return self.root.total
+
+    @property
+    def selected(self) -> int:
+        return self.root.selected
+
+    def _push_down(self, node: DirNode) -> None:
+        if node.mark is None:
+            return
+
+        for child in node.dirs.values():
+            child.mark = node.mark
+            child.selected = child.total if node.mark else 0
+        node.selected_files = set(node.files) if node.mark else set()
+        node.mark = None
+
+    def _find_dir(self, path: str) -> DirNode:
+        node = self.root
+        for part in filter(None, path.split("/")):
+            self._push_down(node)
+            node = node.dirs[part]
+        self._push_down(node)
+        return node
+
+    def _add_to_ancestors(self, node: DirNode | None, delta: int) -> None:
+        while node is not None:
+            node.selected += delta
+            node = node.parent
+
+    def list_dir(self, path: str = "") -> tuple[list[DirNode], list[MarkdownFile]]:
+        """List a directory's subdirectories and files, sorted by name."""
+        node = self._find_dir(path)
+        dirs = [node.dirs[name] for name in sorted(node.dirs)]
+        files = [node.files[name] for name in sorted(node.files)]
+        return dirs, files
+
+    def dir_counts(self, path: str) -> tuple[int, int]:
+        """Get (selected, total) for the files under a directory."""
+        node = self._find_dir(path)
+        return node.selected, node.total
+
+    def is_selected(self, file: MarkdownFile) -> bool:
+        dir_path, _, name = file.path.rpartition("/")
+        return name in self._find_dir(dir_path).selected_files
+
+    def set_file(self, file: MarkdownFile, selected: bool) -> None:
+        dir_path, _, name = file.path.rpartition("/")
+        node = self._find_dir(dir_path)
+        if (name in node.selected_files) == selected:
+            return
+
+        if selected:
+            node.selected_files.add(name)
+        else:
+            node.selected_files.discard(name)
+        self._add_to_ancestors(node, 1 if selected else -1)
+
+    def toggle_file(self, file: MarkdownFile) -> None:
+        self.set_file(file, not self.is_selected(file))
+
+    def set_dir(self, path: str, selected: bool) -> None:
+        """Select or deselect every file under a directory ("" for everything) in O(depth)."""
+        node = self._find_dir(path)
+        delta = (node.total if selected else 0) - node.selected
+        node.mark = selected
+        node.selected += delta
+        self._add_to_ancestors(node.parent, delta)
+
+    def toggle_dir(self, path: str) -> None:
+        """Select everything under a directory, or deselect it all if it is already fully selected."""
+        selected, total = self.dir_counts(path)
+        self.set_dir(path, selected < total)
+
+    def selected_files(self) -> Iterator[MarkdownFile]:
+        """Yield every selected file."""
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if node.selected == 0:
+                continue
+            self._push_down(node)
+            for name in node.selected_files:
+                yield node.files[name]
+            stack.extend(node.dirs.values())
@@ -0,0 +1,292 @@
+"""Token counts for downloaded doc folders, and splitting or packing their pages to a token budget."""
+
+from collections.abc import Callable
+from dataclasses import dataclass, field
+import functools
+import json
+from pathlib import Path
+import re
+from typing import TYPE_CHECKING
+
+from loguru import logger
+
+if TYPE_CHECKING:
+    from tiktoken import Encoding
+
+DEFAULT_ENCODING = "o200k_base"
+
+# Dot-prefixed so it cannot clash with a downloaded page, e.g. a Hugo section's `_index.md`
+INDEX_NAME = ".token-index.md"
+
+# Written by `chunk_folder` next to its output, listing the files it wrote so a later run may replace them
+CHUNKS_MARKER = ".docs-chunks.json"
+
+_HEADING = re.compile(r"^#{1,6} ")
+_FENCE = re.compile(r"^\s*(`{3,}|~{3,})(.*)$")
+_BLANK = re.compile(r"^\s*$")
+
+
+@functools.cache
+def get_encoder(name: str = DEFAULT_ENCODING) -> "Encoding":
+    """Get a tiktoken encoding, loading it once per process."""
+    import tiktoken
+
+    return tiktoken.get_encoding(name)
+
+
+def count_tokens(texts: list[str], encoding: str = DEFAULT_ENCODING) -> list[int]:
+    """Count the tokens in each text, encoding them in one batch across threads."""
+    return [len(tokens) for tokens in get_encoder(encoding).encode_ordinary_batch(texts)]
+
+
+def _blocks(markdown: str, boundary: re.Pattern[str]) -> list[str]:
+    """Split markdown before each line matching `boundary`, never inside a fenced code block."""
+    blocks: list[str] = []
+    current: list[str] = []
+    # The marker that opened the current code block; only a bare marker of the same kind, at least as long, closes it
+    fence = ""
+    for line in markdown.splitlines(keepends=True):
+        if match := _FENCE.match(line):
+            marker, rest = match.groups()
+            if not fence:
+                fence = marker
+            elif marker[0] == fence[0] and len(marker) >= len(fence) and not rest.strip():
+                fence = ""
+        elif not fence and boundary.match(line) and current:
+            blocks.append("".join(current))
+            current = []
+        current.append(line)
+    if current:
+        blocks.append("".join(current))
+    return blocks
+
+
+def _pack(pieces: list[str], budget: int, count: Callable[[str], int]) -> list[str]:
+    """Join consecutive pieces into chunks of at most `budget` tokens; a piece over budget stays whole."""
+    chunks: list[str] = []
+    current, current_tokens = "", 0
+    for piece in pieces:
+        tokens = count(piece)
+        if current and current_tokens + tokens > budget:
+            chunks.append(current)
+            current, current_tokens = "", 0
+        current += piece
+        current_tokens += tokens
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _paragraphs(section: str) -> list[str]:
+    """Split a section between paragraphs, keeping its heading with the first one."""
+    paragraphs = _blocks(section, _BLANK)
+    if len(paragraphs) > 1 and _HEADING.match(paragraphs[0]) and paragraphs[0].count("\n") <= 1:
+        paragraphs[:2] = [paragraphs[0] + paragraphs[1]]
+    return paragraphs
+
+
+def split_markdown(markdown: str, budget: int, count: Callable[[str], int]) -> list[str]:
+    """Split a page into chunks of at most `budget` tokens, at heading boundaries where possible.
+
+    Sections (a heading and everything up to the next heading) are packed into chunks in order.
+    A section that is over budget on its own gets chunks of its own, split between paragraphs
+    with the heading kept on the first; a single paragraph or code block over budget is kept
+    whole rather than cut mid-way.
+    """
+    if count(markdown) <= budget:
+        return [markdown]
+
+    chunks: list[str] = []
+    sections: list[str] = []
+    for section in _blocks(markdown, _HEADING):
+        if count(section) <= budget:
+            sections.append(section)
+            continue
+        chunks += _pack(sections, budget, count)
+        chunks += _pack(_paragraphs(section), budget, count)
+        sections = []
+    return chunks + _pack(sections, budget, count)
+
+
+@dataclass
+class FileTokens:
+    """A file in a folder report and its size in tokens."""
+
+    path: str
+    tokens: int
+    # Original pages a split or packed file was made from
+    sources: list[str] = field(default_factory=list)
+
+
+@dataclass
+class FolderReport:
+    """Token counts for every markdown file in a folder."""
+
+    folder: Path
+    encoding: str
+    files: list[FileTokens]
+    budget: int | None = None
+
+    @property
+    def total(self) -> int:
+        return sum(file.tokens for file in self.files)
+
+    @property
+    def oversized(self) -> list[FileTokens]:
+        return [file for file in self.files if self.budget and file.tokens > self.budget]
+
+    def summary(self) -> str:
+        text = f"{len(self.files)} files, {self.total:,} tokens"
+        if self.oversized:
+            text += f", {len(self.oversized)} over the {self.budget:,}-token budget"
+        return text
+
+    def write_index(self) -> Path:
+        """Write a markdown index of the folder's files and token counts, largest first."""
+        lines = [
+            f"# Index of {self.folder.name}",
+            "",
+            f"{self.summary()} ({self.encoding}).",
+            "",
+        ]
+        # Only resized folders have a "From" column, naming the pages each file was made from
+        resized = any(file.sources for file in self.files)
+        lines += (
+            ["| File | Tokens | From |", "| --- | ---: | --- |"] if resized else ["| File | Tokens |", "| --- | ---: |"]
+        )
+        for file in sorted(self.files, key=lambda file: (-file.tokens, file.path)):
+            marker = " (over budget)" if self.budget and file.tokens > self.budget else ""
+            row = f"| [{file.path}]({file.path}) | {file.tokens:,}{marker} |"
+            lines.append(f"{row} {', '.join(file.sources)} |" if resized else row)
+        path = self.folder / INDEX_NAME
+        path.write_text("\n".join(lines) + "\n")
+        return path
+
+
+def chunks_dir(folder: Path) -> Path:
+    """Where `chunk_folder` output for a downloaded folder goes by default: a sibling `<name>-chunks` folder."""
+    return folder.with_name(f"{folder.name}-chunks")
+
+
+def _prepare_output_dir(folder: Path, output_dir: Path) -> None:
+    """Check that `chunk_folder` may write to `output_dir`, and remove the files its previous run wrote there.
+
+    Only files listed in the output's marker are removed. An output that is, contains or lies inside
+    the source folder, or an existing non-empty folder without a marker, is refused.
+    """
+    source, output = folder.resolve(), output_dir.resolve()
+    if output == source or output in source.parents or source in output.parents:
+        raise ValueError(f"Chunk output {output_dir} must be outside the folder being chunked ({folder})")
+
+    marker = output_dir / CHUNKS_MARKER
+    if not marker.exists():
+        if output_dir.exists() and any(output_dir.iterdir()):
+            raise ValueError(f"{output_dir} already has files that were not written by a previous chunk run")
+        output_dir.mkdir(parents=True, exist_ok=True)
+        return
+
+    for name in json.loads(marker.read_text()).get("files", []):
+        path = (output_dir / name).resolve()
+        if path.is_relative_to(output):
+            path.unlink(missing_ok=True)
+
+
+def _read_pages(folder: Path) -> dict[str, str]:
+    pages = {}
+    for path in sorted(folder.rglob("*.md")):
+        relative = path.relative_to(folder).as_posix()
+        if relative != INDEX_NAME:
+            pages[relative] = path.read_text(errors="replace")
+    return pages
+
+
+def report_folder(folder: Path, budget: int | None = None, encoding: str = DEFAULT_ENCODING) -> FolderReport:
+    """Count the tokens of every markdown file in a folder and write its `.token-index.md`."""
+    pages = _read_pages(folder)
+    counts = count_tokens(list(pages.values()), encoding)
+    files = [FileTokens(path, tokens) for path, tokens in zip(pages, counts, strict=True)]
+    report = FolderReport(folder, encoding, files, budget)
+    report.write_index()
+    return report
+
+
+def chunk_folder(
+    folder: Path,
+    output_dir: Path,
+    budget: int,
+    split: bool = True,
+    pack: bool = True,
+    encoding: str = DEFAULT_ENCODING,
+) -> FolderReport:
+    """Write a copy of a folder's pages resized to a token budget, plus a `.token-index.md` of the result.
+
+    With `split`, pages over `budget` tokens are split at heading boundaries into numbered parts.
+    With `pack`, runs of pages that are small enough are concatenated (in path order) into
+    `pack-NNN.md` files of up to `budget` tokens, each page introduced by a comment naming it.
+    Every other page is copied as it is. Files that an earlier run wrote to `output_dir` (as listed
+    in its `.docs-chunks.json`) are removed first, so the output always mirrors the current pages;
+    nothing else there is touched. `output_dir` must not overlap `folder`, and must be new, empty
+    or a previous chunk output.
+
+    The source folder is not modified, so it can still be refreshed from its manifest.
+    """
+    encoder = get_encoder(encoding)
+
+    def count(text: str) -> int:
+        return len(encoder.encode_ordinary(text))
+
+    pages = _read_pages(folder)
+    sizes = dict(zip(pages, count_tokens(list(pages.values()), encoding), strict=True))
+
+    _prepare_output_dir(folder, output_dir)
+
+    outputs: dict[str, tuple[str, list[str]]] = {}
+    bundle: list[str] = []
+    bundle_tokens = packs = 0
+
+    def flush_bundle() -> None:
+        nonlocal bundle, bundle_tokens, packs
+        if len(bundle) == 1:
+            outputs[bundle[0]] = (pages[bundle[0]], bundle)
+        elif bundle:
+            packs += 1
+            text = "\n\n".join(f"<!-- source: {path} -->\n\n{pages[path].strip()}" for path in bundle)
+            outputs[f"pack-{packs:03d}.md"] = (text + "\n", bundle)
+        bundle, bundle_tokens = [], 0
+
+    for path, text in pages.items():
+        tokens = sizes[path]
+        if split and tokens > budget:
+            flush_bundle()
+            parts = split_markdown(text, budget, count)
+            stem = path.removesuffix(".md")
+            width = len(str(len(parts)))
+            for i, part in enumerate(parts, 1):
+                outputs[f"{stem}.part-{i:0{width}d}.md" if len(parts) > 1 else path] = (part, [path])
+        elif pack and tokens < budget:
+            # Count the comment that will introduce the page in a pack, so packs stay within budget
+            tokens += count(f"<!-- source: {path} -->\n\n\n\n")
+            if bundle_tokens + tokens > budget:
+                flush_bundle()
+            bundle.append(path)
+            bundle_tokens += tokens
+        else:
+            flush_bundle()
+            outputs[path] = (text, [path])
+    flush_bundle()
+
+    for name, (text, _) in outputs.items():
+        target = output_dir / name
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(text)
+
+    counts = count_tokens([text for text, _ in outputs.values()], encoding)
+    files = [
+        FileTokens(name, tokens, sources) for (name, (_, sources)), tokens in zip(outputs.items(), counts, strict=True)
+    ]
+    report = FolderReport(output_dir, encoding, files, budget)
+    report.write_index()
+    marker = {"source": str(folder), "files": [*outputs, INDEX_NAME]}
+    (output_dir / CHUNKS_MARKER).write_text(json.dumps(marker, indent=2) + "\n")
+    logger.info(f"Wrote {output_dir}: {report.summary()} (from {len(pages)} pages)")
+    return report
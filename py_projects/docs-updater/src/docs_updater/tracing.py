@@ -0,0 +1,192 @@
+"""Lightweight span timing for the crawl and download pipelines, exportable as trace files.
+
+Tracing is off by default and then costs one attribute check per span. Once enabled with
+`enable_tracing`, every `span(...)` block is recorded with its attributes and can be written as
+Chrome trace-event JSON (open in chrome://tracing or https://ui.perfetto.dev), as OTLP/JSON for
+OpenTelemetry tooling, or summarized as a p50/p95 table per stage.
+"""
+
+import asyncio
+from dataclasses import dataclass, field
+import json
+import os
+from pathlib import Path
+import secrets
+import statistics
+import threading
+import time
+from typing import Any
+
+
+@dataclass
+class Span:
+    """One timed operation. Times are `time.perf_counter_ns` values."""
+
+    name: str
+    start_ns: int
+    end_ns: int
+    track: int
+    attributes: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+
+class Tracer:
+    """Collects spans from every task and thread in the process."""
+
+    def __init__(self):
+        self.enabled = False
+        self.spans: list[Span] = []
+        self._tracks: dict[int, int] = {}
+        self._lock = threading.Lock()
+        # Offset from perf_counter to wall-clock time, for exporters that need absolute timestamps
+        self._epoch_offset_ns = time.time_ns() - time.perf_counter_ns()
+
+    def _track(self) -> int:
+        """A small, stable id for the current asyncio task (or thread), so concurrent spans get separate rows."""
+        try:
+            key = id(asyncio.current_task())
+        except RuntimeError:
+            key = threading.get_ident()
+        with self._lock:
+            return self._tracks.setdefault(key, len(self._tracks) + 1)
+
+    def record(self, name: str, start_ns: int, end_ns: int, **attributes: Any) -> None:
+        """Record a span that was timed elsewhere."""
+        if self.enabled:
+            span = Span(name, start_ns, end_ns, self._track(), attributes)
+            with self._lock:
+                self.spans.append(span)
+
+    def summary(self) -> str:
+        """A table of count, p50, p95 and total time per span name, slowest total first."""
+        durations: dict[str, list[float]] = {}
+        for span in self.spans:
+            durations.setdefault(span.name, []).append(span.duration_ms)
+        if not durations:
+            return "No spans recorded"
+
+        width = max(len("stage"), *map(len, durations))
+        lines = [f"{'stage':<{width}}  {'count':>6}  {'p50 ms':>9}  {'p95 ms':>9}  {'total s':>8}"]
+        for name, values in sorted(durations.items(), key=lambda item: -sum(item[1])):
+            p50, p95 = _percentile(values, 50), _percentile(values, 95)
+            lines.append(f"{name:<{width}}  {len(values):>6}  {p50:>9.1f}  {p95:>9.1f}  {sum(values) / 1000:>8.2f}")
+        return "\n".join(lines)
+
+    def to_chrome(self) -> dict:
+        """Chrome trace-event format: one complete ("X") event per span, microsecond timestamps."""
+        pid = os.getpid()
+        events = [
+            {
+                "name": span.name,
+                "cat": span.name.partition(".")[0],
+                "ph": "X",
+                "ts": span.start_ns / 1000,
+                "dur": (span.end_ns - span.start_ns) / 1000,
+                "pid": pid,
+                "tid": span.track,
+                "args": span.attributes,
+            }
+            for span in self.spans
+        ]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def to_otlp(self) -> dict:
+        """OTLP/JSON export request (as accepted by OpenTelemetry collectors' file and HTTP receivers)."""
+        trace_id = secrets.token_hex(16)
+        spans = [
+            {
+                "traceId": trace_id,
+                "spanId": secrets.token_hex(8),
+                "name": span.name,
+                "kind": 1,
+                "startTimeUnixNano": str(span.start_ns + self._epoch_offset_ns),
+                "endTimeUnixNano": str(span.end_ns + self._epoch_offset_ns),
+                "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in span.attributes.items()],
+            }
+            for span in self.spans
+        ]
+        resource = {"attributes": [{"key": "service.name", "value": {"stringValue": "docs-updater"}}]}
+        scope = {"scope": {"name": "docs_updater.tracing"}, "spans": spans}
+        return {"resourceSpans": [{"resource": resource, "scopeSpans": [scope]}]}
+
+    def write(self, path: Path, format: str = "chrome") -> None:
+        data = self.to_otlp() if format == "otlp" else self.to_chrome()
+        path.write_text(json.dumps(data))
+
+
+def _percentile(values: list[float], percent: int) -> float:
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[percent - 1]
+
+
+def _otlp_value(value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+tracer = Tracer()
+
+
+class _SpanTimer:
+    """Context manager returned by `span`."""
+
+    __slots__ = ("attributes", "name", "start_ns")
+
+    def __init__(self, name: str, attributes: dict[str, Any]):
+        self.name = name
+        self.attributes = attributes
+        self.start_ns = 0
+
+    def set(self, **attributes: Any) -> None:
+        """Add attributes once they are known, e.g. the size of what was fetched."""
+        self.attributes.update(attributes)
+
+    def __enter__(self) -> "_SpanTimer":
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        if exc_type is not None:
+            self.attributes["error"] = exc_type.__name__
+        tracer.record(self.name, self.start_ns, time.perf_counter_ns(), **self.attributes)
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def span(name: str, **attributes: Any) -> _SpanTimer | _NoopSpan:
+    """Time a `with` block as a span called `name`, with attributes such as the URL it concerns.
+
+    Stage names are dotted, e.g. "browser.navigate"; the part before the first dot is the category.
+    """
+    if not tracer.enabled:
+        return _NOOP_SPAN
+    return _SpanTimer(name, attributes)
+
+
+def enable_tracing() -> Tracer:
+    """Start recording spans into the process-wide tracer."""
+    tracer.enabled = True
+    return tracer
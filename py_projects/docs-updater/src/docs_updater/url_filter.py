@@ -0,0 +1,186 @@
+"""Compiled rules that decide which links a crawl follows."""
+
+from dataclasses import dataclass, field
+from fnmatch import translate
+import re
+from urllib.parse import urlsplit
+
+# Links matching any of these are never documentation pages
+DEFAULT_EXCLUDE = [
+    r"re:\.(jpg|jpeg|png|gif|svg|ico|pdf|zip|tar|gz|exe|dmg)$",  # Binary files
+    r"re:/signin|/login|/signup|/register|/auth",  # Auth pages
+    r"re:/search\?",  # Search queries
+    r"re:github\.com|twitter\.com|facebook\.com|linkedin\.com",  # Social media
+]
+
+# Links matching any of these look like documentation pages
+DEFAULT_INCLUDE = [
+    r"re:/(docs|documentation|guide|tutorial|reference|api|manual)/",
+    r"re:\.mdx?$",
+]
+
+_GLOB_CHARS = re.compile(r"[*?\[]")
+
+_MAX_MEMO = 100_000
+
+
+@dataclass(frozen=True)
+class FilterDecision:
+    """Whether a URL is followed, and which rule decided it."""
+
+    accepted: bool
+    reason: str
+
+    def __bool__(self) -> bool:
+        return self.accepted
+
+
+@dataclass
+class _TrieNode:
+    children: dict[str, "_TrieNode"] = field(default_factory=dict)
+    # The rule that ends at this node, if any
+    rule: str | None = None
+
+
+class PrefixTrie:
+    """Host and path prefixes split on "/", for longest-prefix lookups in O(path depth)."""
+
+    def __init__(self):
+        self.root = _TrieNode()
+
+    def add(self, prefix: str, rule: str) -> None:
+        node = self.root
+        for part in prefix.strip("/").split("/"):
+            node = node.children.setdefault(part, _TrieNode())
+        node.rule = rule
+
+    def match(self, key: str) -> str | None:
+        """Get the rule of the longest prefix that `key` starts with, segment by segment."""
+        node, found = self.root, None
+        for part in key.strip("/").split("/"):
+            node = node.children.get(part)
+            if node is None:
+                break
+            found = node.rule or found
+        return found
+
+
+class _RuleSet:
+    """A list of rules compiled into one combined regex plus a prefix trie.
+
+    Each rule is one of:
+
+    - `re:<regex>`, searched for in the URL's path and query
+    - a glob containing `*`, `?` or `[`, matched against the full URL
+    - a plain prefix: `/path/` for a path on the seed's host, or `host/path/` for any host
+    """
+
+    def __init__(self, rules: list[str], host: str):
+        self.rules = rules
+        self.prefixes = PrefixTrie()
+        regexes, globs = [], []
+        for i, rule in enumerate(rules):
+            if rule.startswith("re:"):
+                regexes.append(f"(?P<r{i}>{rule[3:]})")
+            elif _GLOB_CHARS.search(rule):
+                globs.append(f"(?P<r{i}>{translate(rule)})")
+            else:
+                self.prefixes.add(f"{host}{rule}" if rule.startswith("/") else rule, rule)
+        # Globs are kept apart from regexes so they can be matched once from the start, not searched
+        self.search = re.compile("|".join(regexes), re.IGNORECASE).search if regexes else None
+        self.match_glob = re.compile("|".join(globs), re.IGNORECASE).match if globs else None
+
+    def match(self, url: str, rest: str, host_path: str) -> str | None:
+        """Get a rule that matches the URL, or None.
+
+        `rest` is the URL after its origin and `host_path` its host and path without the query.
+        """
+        m = self.search(rest) if self.search is not None else None
+        if m is None and self.match_glob is not None:
+            m = self.match_glob(url)
+        if m is not None:
+            # Every alternative is a named group r<index>, and it is the last to close when it matches
+            assert m.lastgroup is not None
+            return self.rules[int(m.lastgroup[1:])]
+        return self.prefixes.match(host_path) if self.prefixes.root.children else None
+
+
+def scope_prefix(seed_path: str) -> str:
+    """Get the path prefix that every page under the seed shares, or "" for a site root."""
+    # A seed that names a file (e.g. /docs/index.html) is scoped to its directory
+    if not seed_path.endswith("/") and "." in seed_path.rsplit("/", 1)[-1]:
+        seed_path = seed_path.rsplit("/", 1)[0]
+
+    prefix = seed_path.rstrip("/") + "/"
+    return "" if prefix == "/" else prefix
+
+
+class UrlFilter:
+    """Decides whether a link found during a crawl of `seed_url` should be followed.
+
+    Rules are checked in order, and the first that applies decides:
+
+    1. Links to another scheme or host are rejected.
+    2. Links matching an exclude rule (`exclude`, then the built-in ones) are rejected.
+    3. Links matching an `include` rule are accepted.
+    4. Links under the seed's own path are accepted.
+    5. Links matching a built-in docs-like pattern (e.g. `/docs/`, `.md`) are accepted.
+    6. Everything else is rejected.
+
+    All rules of a kind are compiled into a single regex and prefix trie, so classifying a link
+    costs one regex search and one trie walk however many rules there are.
+    """
+
+    def __init__(self, seed_url: str, include: list[str] | None = None, exclude: list[str] | None = None):
+        parts = urlsplit(seed_url)
+        self.origin = f"{parts.scheme}://{parts.netloc}"
+        self.host = parts.netloc
+        self.scope = scope_prefix(parts.path)
+        self.include = _RuleSet(include or [], self.host)
+        self.exclude = _RuleSet([*(exclude or []), *DEFAULT_EXCLUDE], self.host)
+        self.docs_like = _RuleSet(DEFAULT_INCLUDE, self.host)
+        # Link-heavy pages repeat the same links many times, so decisions are memoized per URL
+        self._decisions: dict[str, FilterDecision] = {}
+
+    def _decide(self, url: str) -> FilterDecision:
+        if not url.startswith(self.origin) or url[len(self.origin) : len(self.origin) + 1] not in ("", "/", "?", "#"):
+            return FilterDecision(False, f"different site than {self.origin}")
+
+        rest = url[len(self.origin) :]
+        path = rest.partition("#")[0].partition("?")[0] or "/"
+        host_path = self.host + path
+        if rule := self.exclude.match(url, rest, host_path):
+            return FilterDecision(False, f"matches exclude rule {rule!r}")
+        if rule := self.include.match(url, rest, host_path):
+            return FilterDecision(True, f"matches include rule {rule!r}")
+        if self.scope and path.startswith(self.scope):
+            return FilterDecision(True, f"under the seed path {self.scope}")
+        if rule := self.docs_like.match(url, rest, host_path):
+            return FilterDecision(True, f"looks like documentation ({rule!r})")
+        return FilterDecision(False, "no include rule matched")
+
+    def explain(self, url: str) -> FilterDecision:
+        """Classify a URL and say which rule decided it."""
+        decision = self._decisions.get(url)
+        if decision is None:
+            if len(self._decisions) >= _MAX_MEMO:
+                self._decisions.clear()
+            decision = self._decisions[url] = self._decide(url)
+        return decision
+
+    def accepts(self, url: str) -> bool:
+        return self.explain(url).accepted
+
+
+def parse_rules(text: str) -> tuple[list[str], list[str]]:
+    """Split a space-separated rule string like `+/api/ -*changelog*` into (include, exclude) rules.
+
+    Rules starting with `-` are excludes; anything else (optionally prefixed with `+`) is an include.
+    """
+    include, exclude = [], []
+    for token in text.split():
+        if token.startswith("-"):
+            exclude.append(token[1:])
+        else:
+            include.append(token.removeprefix("+"))
+    return [rule for rule in include if rule], [rule for rule in exclude if rule]
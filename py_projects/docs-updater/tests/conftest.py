@@ -0,0 +1,20 @@
+import pytest
+import tiktoken
+
+from docs_updater import tokens
+
+
+@pytest.fixture
+def byte_encoder(monkeypatch: pytest.MonkeyPatch) -> tiktoken.Encoding:
+    """Replace the tiktoken encoding with one token per byte, which needs no download."""
+    encoder = tiktoken.Encoding(
+        "bytes", pat_str=r"\S+|\s+", mergeable_ranks={bytes([i]): i for i in range(256)}, special_tokens={}
+    )
+    monkeypatch.setattr(tokens, "get_encoder", lambda name=tokens.DEFAULT_ENCODING: encoder)
+    return encoder
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path_factory: pytest.TempPathFactory, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Keep caches and journals out of the real cache directory."""
+    monkeypatch.setenv("DOCS_UPDATER_CACHE_DIR", str(tmp_path_factory.mktemp("cache")))
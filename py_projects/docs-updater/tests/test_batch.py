@@ -0,0 +1,79 @@
+import asyncio
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+import httpx
+import pytest
+
+from docs_updater import crawler, http_cache, http_client
+from docs_updater.batch import SourceConfig, format_summaries, sync_source
+from docs_updater.http_cache import HttpCache
+
+
+class Site:
+    """A docs site served from a dict of markdown pages; pages missing from it return 404."""
+
+    def __init__(self, pages: dict[str, str]):
+        self.pages = pages
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path not in self.pages:
+            return httpx.Response(404)
+        return httpx.Response(200, text=self.pages[request.url.path], headers={"content-type": "text/markdown"})
+
+
+@pytest.fixture
+async def site(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> AsyncIterator[Site]:
+    site = Site(
+        {
+            "/docs/": "# Docs\n\n[A](a.md) [B](b.md)\n",
+            "/docs/a.md": "# A\n\nFirst page.\n",
+            "/docs/b.md": "# B\n\nSecond page.\n",
+        }
+    )
+
+    async def no_browser(url: str, **kwargs) -> crawler.URLResult:
+        raise RuntimeError("no browser in tests")
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(site))
+    cache = HttpCache(tmp_path / "http.sqlite")
+    monkeypatch.setattr(http_client, "_default_client", client)
+    monkeypatch.setattr(http_cache, "_default_cache", cache)
+    monkeypatch.setattr(crawler, "_handle_web_content", no_browser)
+    yield site
+    await client.aclose()
+    cache.close()
+
+
+async def test_pages_that_fail_to_crawl_are_kept_and_reported(tmp_path: Path, site: Site):
+    source = SourceConfig(url="https://docs.test/docs/", folder="docs", prune=True)
+    output_dir = tmp_path / "out" / "docs"
+
+    first = await sync_source(source, tmp_path / "out", 4, asyncio.Semaphore(4))
+    assert first.ok
+    assert sorted(path.name for path in output_dir.glob("*.md")) == ["docs.md", "docs_a.md", "docs_b.md"]
+
+    # The page still exists but cannot be fetched this time
+    del site.pages["/docs/b.md"]
+    second = await sync_source(source, tmp_path / "out", 4, asyncio.Semaphore(4))
+
+    assert (output_dir / "docs_b.md").read_text() == "# B\n\nSecond page.\n"
+    assert second.failed == 1
+    assert not second.ok
+    assert format_summaries([second]).startswith("[FAILED] docs:")
+
+
+@pytest.mark.parametrize(("prune", "kept"), [(False, True), (True, False)])
+async def test_crawled_pages_no_longer_linked_are_only_deleted_with_prune(
+    tmp_path: Path, site: Site, prune: bool, kept: bool
+):
+    source = SourceConfig(url="https://docs.test/docs/", folder="docs", prune=prune)
+    await sync_source(source, tmp_path / "out", 4, asyncio.Semaphore(4))
+
+    site.pages["/docs/"] = "# Docs\n\n[A](a.md)\n"
+    del site.pages["/docs/b.md"]
+    summary = await sync_source(source, tmp_path / "out", 4, asyncio.Semaphore(4))
+
+    assert summary.ok
+    assert (tmp_path / "out" / "docs" / "docs_b.md").exists() is kept
+    assert ("1 no longer listed but kept" in summary.summary) is kept
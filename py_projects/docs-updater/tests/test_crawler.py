@@ -0,0 +1,120 @@
+from pathlib import Path
+
+import httpx
+import pytest
+
+from docs_updater import crawler
+from docs_updater.http_cache import HttpCache, content_hash
+from docs_updater.journal import Journal
+from docs_updater.render_policy import RenderLevel, RenderPolicy
+
+RENDERED = "# Guide\n\n" + "Rendered by the browser. " * 20
+
+
+@pytest.fixture
+def client() -> httpx.AsyncClient:
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith(".md"):
+            return httpx.Response(
+                200, text="# Guide\n\nSee [setup](setup.md).\n", headers={"content-type": "text/plain"}
+            )
+        return httpx.Response(
+            200, text="<html><body><p>Loading...</p></body></html>", headers={"content-type": "text/html"}
+        )
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+@pytest.fixture
+def no_browser(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    rendered: list[str] = []
+
+    async def render(url: str, **kwargs) -> crawler.URLResult:
+        rendered.append(url)
+        return crawler.URLResult(url=url, markdown=RENDERED)
+
+    monkeypatch.setattr(crawler, "_handle_web_content", render)
+    return rendered
+
+
+async def test_markdown_is_never_rendered(tmp_path: Path, client: httpx.AsyncClient, no_browser: list[str]):
+    policy = RenderPolicy()
+    policy.record("https://docs.test/guide/intro", RenderLevel.SCROLL)
+
+    result = await crawler._fetch_page(
+        "https://docs.test/guide/page.md", client=client, cache=HttpCache(tmp_path / "http.sqlite"), policy=policy
+    )
+
+    assert result.is_markdown
+    assert result.markdown.startswith("# Guide")
+    assert [link.url for link in result.links] == ["setup.md"]
+    assert no_browser == []
+
+
+async def test_html_follows_the_render_policy(tmp_path: Path, client: httpx.AsyncClient, no_browser: list[str]):
+    policy = RenderPolicy()
+    policy.record("https://docs.test/guide/intro", RenderLevel.RENDER)
+
+    result = await crawler._fetch_page(
+        "https://docs.test/guide/page", client=client, cache=HttpCache(tmp_path / "http.sqlite"), policy=policy
+    )
+
+    assert result.markdown == RENDERED
+    assert no_browser == ["https://docs.test/guide/page"]
+
+
+async def test_crawl_saves_pages_listed_in_llms_txt_once(tmp_path: Path, no_browser: list[str]):
+    pages = {
+        "/docs/": "# Docs\n\n[Intro](intro.md)\n",
+        "/docs/intro.md": "# Intro\n\nWelcome.\n",
+        "/llms.txt": "# Site\n\n- [Intro](/docs/intro.md)\n- [Setup](/docs/setup.md)\n",
+        "/llms-full.txt": "# Intro\n\nWelcome.\n\n# Setup\n\nInstall it.\n",
+        "/docs/setup.md": "# Setup\n\nInstall it.\n",
+    }
+    requested: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requested.append(request.url.path)
+        if request.url.path not in pages:
+            return httpx.Response(404)
+        return httpx.Response(200, text=pages[request.url.path], headers={"content-type": "text/markdown"})
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        crawl = await crawler.crawl_docs(
+            "https://docs.test/docs/",
+            client=client,
+            cache=HttpCache(tmp_path / "http.sqlite"),
+            render_policy=RenderPolicy(),
+        )
+
+    assert [file.path for file in crawl.files] == ["docs.md", "docs_intro.md", "docs_setup.md"]
+    assert crawl.failed == []
+    assert "/llms-full.txt" not in requested
+    assert no_browser == []
+
+
+async def test_resumed_crawl_refetches_pages_whose_content_does_not_match_its_hash(
+    tmp_path: Path, client: httpx.AsyncClient
+):
+    journal = Journal(tmp_path / "journal.sqlite")
+    cache = HttpCache(tmp_path / "http.sqlite")
+    seed = "https://docs.test/guide/intro.md"
+    await crawler.crawl_docs(seed, client=client, cache=cache, journal=journal)
+    # As if the crawl had been interrupted with one page journaled intact and one damaged
+    journal.mark_done("https://docs.test/guide/intro.md", "guide_intro.md", content_hash(b"# Old\n"), content="# Old\n")
+    journal.mark_done("https://docs.test/guide/setup.md", "guide_setup.md", "stale", content="# Truncated")
+
+    crawl = await crawler.crawl_docs(seed, client=client, cache=cache, journal=journal)
+
+    assert {file.path: file.content for file in crawl.files} == {
+        "guide_intro.md": "# Old\n",
+        "guide_setup.md": "# Guide\n\nSee [setup](setup.md).\n",
+    }
+    entry = journal.get("https://docs.test/guide/setup.md")
+    assert entry is not None
+    assert entry.content_hash == content_hash(crawl.files[1].content.encode())
+
+    # A crawl with other settings starts over instead of returning the journaled page
+    crawl = await crawler.crawl_docs(seed, max_depth=1, client=client, cache=cache, journal=journal)
+    assert crawl.files[0].content == "# Guide\n\nSee [setup](setup.md).\n"
+    journal.close()
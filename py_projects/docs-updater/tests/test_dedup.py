@@ -0,0 +1,44 @@
+import random
+
+from docs_updater.dedup import ContentIndex, simhash
+
+
+def _page(seed: int, words: int = 2000) -> str:
+    rng = random.Random(seed)
+    return " ".join(f"word{rng.randrange(5000)}" for _ in range(words))
+
+
+def _edit(page: str, position: int) -> str:
+    words = page.split()
+    words[position] = "changed"
+    return " ".join(words)
+
+
+def test_exact_duplicates_ignore_whitespace():
+    index = ContentIndex()
+
+    assert index.add("https://example.com/a", "# Title\n\nSome  text.\n") is None
+    assert index.add("https://example.com/b", "# Title\nSome text.") == "https://example.com/a"
+    assert index.add("https://example.com/c", "# Title\n\nOther text.") is None
+
+
+def test_near_duplicates_only_when_enabled():
+    page = _page(3)
+    edited = _edit(page, 1000)
+
+    exact = ContentIndex()
+    near = ContentIndex(near_duplicates=True)
+    for index in (exact, near):
+        index.add("https://example.com/a", page)
+
+    assert exact.add("https://example.com/b", edited) is None
+    assert near.add("https://example.com/b", edited) == "https://example.com/a"
+    assert near.add("https://example.com/c", _page(2)) is None
+
+
+def test_simhash_distance_tracks_similarity():
+    page = _page(3)
+    edited = _edit(page, 1000)
+
+    assert (simhash(page) ^ simhash(edited)).bit_count() <= 3
+    assert (simhash(page) ^ simhash(_page(4))).bit_count() > 10
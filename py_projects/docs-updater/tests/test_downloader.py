@@ -0,0 +1,64 @@
+from pathlib import Path
+
+from docs_updater.downloader import download_all, refresh_folder
+from docs_updater.http_cache import content_hash
+from docs_updater.journal import DONE, Journal
+from docs_updater.models import MarkdownFile
+
+
+async def _download(files: list[MarkdownFile], output_dir: Path, journal: Journal) -> list[str]:
+    return [result.file.path async for result in download_all(files, output_dir, journal=journal) if result.ok]
+
+
+async def test_crawled_pages_are_journaled_by_content_hash(tmp_path: Path):
+    journal = Journal(tmp_path / "journal.sqlite")
+    page = MarkdownFile(url="https://example.com/a", path="a.md", content="# A\n")
+
+    assert await _download([page], tmp_path / "out", journal) == ["a.md"]
+
+    entry = journal.get(page.url)
+    assert entry is not None
+    assert (entry.status, entry.content_hash) == (DONE, content_hash(b"# A\n"))
+    journal.close()
+
+
+async def test_resume_skips_only_files_with_the_same_hash(tmp_path: Path):
+    output_dir = tmp_path / "out"
+    journal = Journal(tmp_path / "journal.sqlite")
+    pages = [MarkdownFile(url=f"https://example.com/{name}", path=f"{name}.md", content=f"# {name}\n") for name in "ab"]
+    await _download(pages, output_dir, journal)
+    (output_dir / "a.md").write_text("left by the interrupted run")
+    (output_dir / "b.md").write_text("left by the interrupted run")
+
+    # The site changed b since the interrupted run, so only a counts as already saved
+    pages = [
+        MarkdownFile(url="https://example.com/a", path="a.md", content="# a\n"),
+        MarkdownFile(url="https://example.com/b", path="b.md", content="# b, edited\n"),
+    ]
+    assert sorted(await _download(pages, output_dir, journal)) == ["a.md", "b.md"]
+
+    assert (output_dir / "a.md").read_text() == "left by the interrupted run"
+    assert (output_dir / "b.md").read_text() == "# b, edited\n"
+    entry = journal.get("https://example.com/b")
+    assert entry is not None
+    assert entry.content_hash == content_hash(b"# b, edited\n")
+    journal.close()
+
+
+async def test_refresh_only_deletes_files_missing_from_a_complete_listing(tmp_path: Path):
+    def listing(*names: str, sha: bool) -> list[MarkdownFile]:
+        return [
+            MarkdownFile(url=f"https://example.com/{name}", path=f"{name}.md", content=name, sha=name if sha else "")
+            for name in names
+        ]
+
+    crawled, github = tmp_path / "crawled", tmp_path / "github"
+    for output_dir, sha in ((crawled, False), (github, True)):
+        await refresh_folder(listing("a", "b", sha=sha), output_dir)
+        plan, _ = await refresh_folder(listing("a", sha=sha), output_dir)
+        assert (output_dir / "b.md").exists() is not sha
+        assert (plan.removed, plan.kept) == ((["b.md"], []) if sha else ([], ["b.md"]))
+
+    plan, _ = await refresh_folder(listing("a", sha=False), crawled, prune=True)
+    assert plan.removed == ["b.md"]
+    assert not (crawled / "b.md").exists()
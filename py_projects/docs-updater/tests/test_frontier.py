@@ -0,0 +1,37 @@
+import pytest
+
+from docs_updater.frontier import CrawlFrontier, canonicalize
+
+
+@pytest.mark.parametrize(
+    ("url", "expected"),
+    [
+        ("HTTPS://Example.COM:443/docs/", "https://example.com/docs"),
+        ("http://example.com:80/docs/index.html", "http://example.com/docs"),
+        ("http://example.com:8080/docs", "http://example.com:8080/docs"),
+        ("https://example.com", "https://example.com/"),
+        ("https://example.com/index.htm#top", "https://example.com/"),
+        ("https://example.com/a?b=2&a=1&utm_source=x&ref=y", "https://example.com/a?a=1&b=2"),
+        ("https://example.com/a?q=", "https://example.com/a?q="),
+        ("https://example.com/Docs", "https://example.com/Docs"),
+    ],
+)
+def test_canonicalize(url: str, expected: str):
+    assert canonicalize(url) == expected
+
+
+async def test_frontier_deduplicates_on_canonical_urls():
+    frontier = CrawlFrontier(max_depth=1, max_pages=3)
+
+    assert frontier.add("https://example.com/docs/#intro", 0)
+    assert not frontier.add("https://EXAMPLE.com/docs/index.html", 0)
+    assert not frontier.add("https://example.com/deep", 2)
+    assert frontier.add("https://example.com/a?utm_source=x", 1)
+    frontier.mark_seen("https://example.com/done")
+    assert frontier.seen("https://example.com/done/")
+    assert not frontier.add("https://example.com/b", 1)
+
+    # URLs are queued as given, minus their fragment, so relative links still resolve against them
+    assert (await frontier.get()).url == "https://example.com/docs/"
+    item = await frontier.get()
+    assert (item.url, item.depth) == ("https://example.com/a?utm_source=x", 1)
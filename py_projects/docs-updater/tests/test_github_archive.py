@@ -0,0 +1,88 @@
+import gzip
+import io
+import tarfile
+
+import httpx
+import pytest
+
+from docs_updater.github_archive import RawUrl, TarStreamReader, stream_github_tarball
+from docs_updater.models import MarkdownFile
+
+LONG_PATH = "repo-abc123/docs/" + "nested/" * 20 + "deep.md"
+
+MEMBERS = {
+    "repo-abc123/README.md": b"# Readme\n",
+    "repo-abc123/docs/guide.md": b"# Guide\n" + b"x" * 1500,
+    "repo-abc123/docs/empty.md": b"",
+    "repo-abc123/src/main.py": b"print('hi')\n",
+    LONG_PATH: b"# Deep\n",
+}
+
+
+def _tarball(tar_format: int) -> bytes:
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w", format=tar_format) as tar:
+        directory = tarfile.TarInfo("repo-abc123/docs")
+        directory.type = tarfile.DIRTYPE
+        tar.addfile(directory)
+        for path, content in MEMBERS.items():
+            info = tarfile.TarInfo(path)
+            info.size = len(content)
+            tar.addfile(info, io.BytesIO(content))
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("tar_format", [tarfile.PAX_FORMAT, tarfile.GNU_FORMAT])
+@pytest.mark.parametrize("chunk_size", [7, 512, 1 << 20])
+def test_reader_yields_wanted_members(tar_format: int, chunk_size: int):
+    data = _tarball(tar_format)
+    reader = TarStreamReader(lambda path: path.endswith(".md"))
+
+    members = []
+    for start in range(0, len(data), chunk_size):
+        members += reader.feed(data[start : start + chunk_size])
+
+    assert dict(members) == {path: content for path, content in MEMBERS.items() if path.endswith(".md")}
+    assert reader.done
+
+
+def test_reader_stops_at_the_end_marker():
+    reader = TarStreamReader(lambda path: True)
+
+    members = list(reader.feed(_tarball(tarfile.PAX_FORMAT) + b"trailing garbage"))
+
+    assert len(members) == len(MEMBERS)
+    assert reader.done
+
+
+@pytest.mark.parametrize(
+    ("url", "expected"),
+    [
+        ("https://raw.githubusercontent.com/o/r/main/docs/a.md", RawUrl("o", "r", "main", "docs/a.md")),
+        ("https://raw.githubusercontent.com/o/r/main", None),
+        ("https://github.com/o/r/blob/main/a.md", None),
+    ],
+)
+def test_raw_url_parse(url: str, expected: RawUrl | None):
+    assert RawUrl.parse(url) == expected
+
+
+async def test_stream_github_tarball_fills_in_requested_files():
+    archive = gzip.compress(_tarball(tarfile.PAX_FORMAT))
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.url.path == "/owner/repo/tar.gz/abc123"
+        return httpx.Response(200, stream=httpx.ByteStream(archive))
+
+    paths = {
+        path: MarkdownFile(url=f"https://raw.githubusercontent.com/owner/repo/abc123/{path}", path=path)
+        for path in ["docs/guide.md", LONG_PATH.partition("/")[2], "docs/missing.md"]
+    }
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        files = [file async for file in stream_github_tarball("owner", "repo", "abc123", paths, client)]
+
+    assert {file.path: file.content for file in files} == {
+        "docs/guide.md": MEMBERS["repo-abc123/docs/guide.md"].decode(),
+        LONG_PATH.partition("/")[2]: "# Deep\n",
+    }
+    assert paths["docs/missing.md"].content == ""
@@ -0,0 +1,144 @@
+from pathlib import Path
+
+import httpx
+import pytest
+
+from docs_updater import github_source
+from docs_updater.github_source import get_github_files, resolve_source
+from docs_updater.http_cache import HttpCache
+
+REPO = "/repos/owner/repo"
+
+
+def _blob(path: str) -> dict:
+    return {"path": path, "type": "blob", "sha": f"blob-{path}"}
+
+
+def _tree(path: str, sha: str) -> dict:
+    return {"path": path, "type": "tree", "sha": sha}
+
+
+class FakeGitHub:
+    """Answers the commits and git trees endpoints for one repo, recording each path requested."""
+
+    def __init__(self, refs: dict[str, str], trees: dict[str, list[dict]], truncated: frozenset[str] = frozenset()):
+        self.refs = refs
+        self.trees = trees
+        # Trees whose recursive listing GitHub truncates
+        self.truncated = truncated
+        self.requested: list[str] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        self.requested.append(f"{path}?{request.url.query.decode()}" if request.url.query else path)
+        if path.startswith(f"{REPO}/commits/"):
+            sha = self.refs.get(path.removeprefix(f"{REPO}/commits/"))
+            return httpx.Response(200, text=sha) if sha else httpx.Response(404)
+
+        sha = path.removeprefix(f"{REPO}/git/trees/")
+        if "recursive" in request.url.params and sha in self.truncated:
+            return httpx.Response(200, json={"tree": self.trees[sha][:1], "truncated": True})
+        if "recursive" in request.url.params:
+            return httpx.Response(200, json={"tree": self._walk(sha, ""), "truncated": False})
+        return httpx.Response(200, json={"tree": self.trees[sha], "truncated": False})
+
+    def _walk(self, sha: str, prefix: str) -> list[dict]:
+        items = []
+        for item in self.trees[sha]:
+            items.append({**item, "path": prefix + item["path"]})
+            if item["type"] == "tree":
+                items += self._walk(item["sha"], f"{prefix}{item['path']}/")
+        return items
+
+
+@pytest.fixture(autouse=True)
+def resolved_refs(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(github_source, "_resolved_refs", {})
+
+
+async def _files(url: str, api: FakeGitHub, tmp_path: Path) -> list[tuple[str, str]]:
+    cache = HttpCache(tmp_path / "cache.sqlite")
+    async with httpx.AsyncClient(transport=httpx.MockTransport(api)) as client:
+        files = await get_github_files(url, client, cache)
+    cache.close()
+    return [(file.path, file.url) for file in files]
+
+
+async def test_default_branch_is_resolved_to_a_commit(tmp_path: Path):
+    api = FakeGitHub(
+        refs={"HEAD": "c0ffee"},
+        trees={
+            "c0ffee": [_blob("README.md"), _blob("setup.py"), _tree("docs", "t-docs")],
+            "t-docs": [_blob("guide.mdx"), _blob("logo.png")],
+        },
+    )
+
+    files = await _files("https://github.com/owner/repo", api, tmp_path)
+
+    assert files == [
+        ("README.md", "https://raw.githubusercontent.com/owner/repo/c0ffee/README.md"),
+        ("docs/guide.mdx", "https://raw.githubusercontent.com/owner/repo/c0ffee/docs/guide.mdx"),
+    ]
+    assert api.requested[0] == f"{REPO}/commits/HEAD"
+
+
+async def test_ref_with_slashes_tries_longer_prefixes(tmp_path: Path):
+    api = FakeGitHub(refs={"release/v1": "beef"}, trees={})
+    cache = HttpCache(tmp_path / "cache.sqlite")
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(api)) as client:
+        source = await resolve_source("https://github.com/owner/repo/tree/release/v1/docs", client, cache)
+        # The resolved ref is reused; only the shorter prefix that does not exist is asked about again
+        again = await resolve_source("https://github.com/owner/repo/tree/release/v1/docs/api", client, cache)
+    cache.close()
+
+    assert (source.ref, source.sha, source.subpath) == ("release/v1", "beef", "docs")
+    assert (again.ref, again.sha, again.subpath) == ("release/v1", "beef", "docs/api")
+    assert api.requested == [f"{REPO}/commits/release", f"{REPO}/commits/release/v1", f"{REPO}/commits/release"]
+
+
+async def test_unknown_ref_raises(tmp_path: Path):
+    api = FakeGitHub(refs={}, trees={})
+    cache = HttpCache(tmp_path / "cache.sqlite")
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(api)) as client:
+        with pytest.raises(ValueError, match="Could not find nope"):
+            await resolve_source("https://github.com/owner/repo/tree/nope/docs", client, cache)
+    cache.close()
+
+
+async def test_truncated_tree_lists_only_subtrees_under_the_subpath(tmp_path: Path):
+    api = FakeGitHub(
+        refs={"main": "root"},
+        trees={
+            "root": [_blob("README.md"), _tree("docs", "t-docs"), _tree("docs2", "t-docs2"), _tree("src", "t-src")],
+            "t-docs": [_blob("index.md"), _tree("guide", "t-guide")],
+            "t-guide": [_blob("start.md")],
+            "t-docs2": [_blob("other.md")],
+            "t-src": [_blob("notes.md")],
+        },
+        truncated=frozenset({"root"}),
+    )
+
+    files = await _files("https://github.com/owner/repo/tree/main/docs", api, tmp_path)
+
+    assert [path for path, _ in files] == ["guide/start.md", "index.md"]
+    assert files[0][1] == "https://raw.githubusercontent.com/owner/repo/root/docs/guide/start.md"
+    assert f"{REPO}/git/trees/root" in api.requested
+    assert f"{REPO}/git/trees/t-docs?recursive=1" in api.requested
+    assert not any("t-docs2" in path or "t-src" in path for path in api.requested)
+
+
+async def test_subpath_does_not_match_sibling_with_the_same_prefix(tmp_path: Path):
+    api = FakeGitHub(
+        refs={"main": "root"},
+        trees={
+            "root": [_tree("docs", "t-docs"), _tree("docs2", "t-docs2"), _blob("docs.md")],
+            "t-docs": [_blob("a.md")],
+            "t-docs2": [_blob("b.md")],
+        },
+    )
+
+    files = await _files("https://github.com/owner/repo/tree/main/docs", api, tmp_path)
+
+    assert [path for path, _ in files] == ["a.md"]
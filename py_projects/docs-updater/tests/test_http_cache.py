@@ -0,0 +1,102 @@
+from pathlib import Path
+import time
+
+import httpx
+import pytest
+
+from docs_updater.http_cache import HttpCache, cached_get
+
+URL = "https://docs.example.com/page"
+
+
+class FakeServer:
+    """Serves one page with validators, answering 304 when the request's validators still match."""
+
+    def __init__(self, body: bytes, etag: str | None = '"v1"', last_modified: str | None = None):
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.requests: list[httpx.Request] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        headers = {"content-type": "text/markdown"}
+        if self.etag:
+            headers["etag"] = self.etag
+        if self.last_modified:
+            headers["last-modified"] = self.last_modified
+        if (self.etag and request.headers.get("if-none-match") == self.etag) or (
+            self.last_modified and request.headers.get("if-modified-since") == self.last_modified
+        ):
+            return httpx.Response(304, headers=headers)
+        return httpx.Response(200, headers=headers, content=self.body)
+
+
+@pytest.fixture
+def cache(tmp_path: Path):
+    cache = HttpCache(tmp_path / "http_cache.sqlite")
+    yield cache
+    cache.close()
+
+
+async def _get(server: FakeServer, cache: HttpCache, url: str = URL) -> tuple[httpx.Response, bool]:
+    async with httpx.AsyncClient(transport=httpx.MockTransport(server)) as client:
+        return await cached_get(client, url, cache)
+
+
+@pytest.mark.parametrize(
+    ("etag", "last_modified", "validator"),
+    [('"v1"', None, "if-none-match"), (None, "Wed, 21 Oct 2026 07:28:00 GMT", "if-modified-since")],
+)
+async def test_unchanged_response_is_reused_after_304(
+    cache: HttpCache, etag: str | None, last_modified: str | None, validator: str
+):
+    server = FakeServer(b"# Page", etag, last_modified)
+
+    first, first_cached = await _get(server, cache)
+    second, second_cached = await _get(server, cache)
+
+    assert (first.status_code, first_cached) == (200, False)
+    assert (second.status_code, second_cached) == (200, True)
+    assert second.content == b"# Page"
+    assert second.headers["content-type"] == "text/markdown"
+    assert validator not in server.requests[0].headers
+    assert validator in server.requests[1].headers
+
+
+async def test_changed_response_replaces_the_cached_copy(cache: HttpCache):
+    server = FakeServer(b"# Old")
+    await _get(server, cache)
+    cache.put_rendered(URL, '{"markdown": "old"}')
+
+    server.body, server.etag = b"# New", '"v2"'
+    response, cached = await _get(server, cache)
+
+    entry = cache.get(URL)
+    assert (response.content, cached) == (b"# New", False)
+    assert entry is not None
+    assert (entry.content, entry.etag) == (b"# New", '"v2"')
+    # The rendered result belonged to the old content
+    assert entry.rendered is None
+
+
+async def test_error_responses_are_not_cached(cache: HttpCache):
+    async with httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(500))) as client:
+        response, cached = await cached_get(client, URL, cache)
+
+    assert (response.status_code, cached) == (500, False)
+    assert cache.get(URL) is None
+
+
+async def test_prune_drops_old_then_least_recently_fetched(cache: HttpCache):
+    for i in range(4):
+        await _get(FakeServer(b"x" * 100), cache, f"{URL}/{i}")
+    # Page 0 was last fetched long ago, page 1 a while ago
+    cache._db.execute("UPDATE responses SET fetched_at = ? WHERE url = ?", (time.time() - 3600, f"{URL}/0"))
+    cache._db.execute("UPDATE responses SET fetched_at = ? WHERE url = ?", (time.time() - 60, f"{URL}/1"))
+    cache._db.commit()
+
+    assert cache.prune(max_age=600, max_bytes=1000) == 1
+    assert cache.prune(max_age=600, max_bytes=250) == 1
+
+    assert [cache.get(f"{URL}/{i}") is not None for i in range(4)] == [False, False, True, True]
@@ -0,0 +1,37 @@
+from pathlib import Path
+
+from docs_updater.journal import DONE, PENDING, Journal
+
+
+def test_resume_requires_the_same_settings(tmp_path: Path):
+    journal = Journal(tmp_path / "journal.sqlite")
+    assert not journal.resume({"url": "https://example.com", "depth": 3})
+    journal.add_pending("https://example.com/a")
+    journal.mark_done("https://example.com/b", "b.md", "hash", content="# B")
+    journal.close()
+
+    journal = Journal(tmp_path / "journal.sqlite")
+    assert journal.resume({"depth": 3, "url": "https://example.com"})
+    assert [entry.url for entry in journal.entries(PENDING, DONE)] == ["https://example.com/a", "https://example.com/b"]
+
+    assert not journal.resume({"url": "https://example.com", "depth": 4})
+    assert not journal.has_progress()
+    journal.close()
+
+
+def test_stale_journals_are_discarded(tmp_path: Path):
+    journal = Journal(tmp_path / "journal.sqlite")
+    journal.resume({"url": "https://example.com"})
+    journal.add_pending("https://example.com/a")
+
+    assert not journal.resume({"url": "https://example.com"}, max_age=-1)
+    assert not journal.has_progress()
+    journal.close()
+
+
+def test_finish_deletes_the_journal(tmp_path: Path):
+    journal = Journal(tmp_path / "journal.sqlite")
+    journal.add_pending("https://example.com/a")
+    journal.finish()
+
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,52 @@
+from pathlib import Path
+
+from docs_updater.manifest import MANIFEST_NAME, Manifest, ManifestEntry, is_complete_listing, plan_refresh
+from docs_updater.models import MarkdownFile
+
+
+def _file(path: str, sha: str = "") -> MarkdownFile:
+    return MarkdownFile(url=f"https://example.com/{path}", path=path, sha=sha)
+
+
+def _manifest(shas: dict[str, str]) -> Manifest:
+    files = {path: ManifestEntry(sha, f"https://example.com/{path}", "") for path, sha in shas.items()}
+    return Manifest(source="https://example.com", files=files)
+
+
+def test_plan_refresh_compares_shas():
+    manifest = _manifest({"a.md": "1", "b.md": "2", "docs/c.md": "3", "gone.md": "4"})
+    files = [_file("a.md", "1"), _file("b.md", "changed"), _file("docs/c.md", "3"), _file("new.md", "5")]
+
+    plan = plan_refresh(files, manifest)
+
+    assert [file.path for file in plan.added] == ["new.md"]
+    assert [file.path for file in plan.changed] == ["b.md"]
+    assert [file.path for file in plan.unchanged] == ["a.md", "docs/c.md"]
+    assert plan.removed == ["gone.md"]
+    assert [file.path for file in plan.to_download] == ["new.md", "b.md"]
+    assert plan.summary() == "1 added, 1 changed, 1 removed, 2 unchanged"
+
+
+def test_files_without_a_sha_are_always_downloaded():
+    plan = plan_refresh([_file("page.md")], _manifest({"page.md": ""}))
+
+    assert [file.path for file in plan.changed] == ["page.md"]
+
+
+def test_manifest_round_trip(tmp_path: Path):
+    assert Manifest.load(tmp_path) == Manifest()
+
+    manifest = Manifest(source="https://example.com")
+    manifest.record(_file("docs/a.md", "abc"))
+    manifest.save(tmp_path)
+    loaded = Manifest.load(tmp_path)
+
+    assert (tmp_path / MANIFEST_NAME).exists()
+    assert loaded == manifest
+    assert plan_refresh([_file("docs/a.md", "abc")], loaded).unchanged
+
+
+def test_only_listings_with_shas_are_complete():
+    assert is_complete_listing([_file("a.md", "1"), _file("b.md", "2")])
+    assert not is_complete_listing([_file("a.md", "1"), _file("page.md")])
+    assert not is_complete_listing([])
@@ -0,0 +1,99 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
+import pytest
+
+from docs_updater import postprocess
+from docs_updater.postprocess import MarkdownProcessor
+
+
+@pytest.fixture
+def batches(monkeypatch: pytest.MonkeyPatch) -> tuple[list[list[str]], threading.Event]:
+    """Replace the worker-side conversion with one that records each batch and waits until released."""
+    sent: list[list[str]] = []
+    release = threading.Event()
+
+    def convert_batch(pages: list[tuple[str, str]]) -> list[postprocess.Converted | Exception]:
+        sent.append([url for url, _ in pages])
+        release.wait(timeout=5)
+        return [ValueError(url) if "bad" in html else (f"# {url}", []) for url, html in pages]
+
+    monkeypatch.setattr(postprocess, "_convert_batch", convert_batch)
+    return sent, release
+
+
+def _processor() -> MarkdownProcessor:
+    processor = MarkdownProcessor(workers=1, batch_size=4, max_pending=6, inline_below=0)
+    # Threads instead of worker processes, so the patched conversion is used
+    processor._executor = ThreadPoolExecutor(max_workers=1)
+    return processor
+
+
+async def test_pages_are_batched_and_callers_wait_for_room(batches):
+    sent, release = batches
+    processor = _processor()
+    urls = [f"https://example.com/{i}" for i in range(10)]
+
+    tasks = [asyncio.create_task(processor.convert(url, "<p>page</p>")) for url in urls]
+    await asyncio.sleep(0.05)
+
+    # One batch is converting and two pages wait; the other four callers wait for room
+    assert sent == [urls[:4]]
+    assert processor._queue is not None
+    assert processor._queue.qsize() == 2
+    assert not any(task.done() for task in tasks)
+
+    release.set()
+    results = await asyncio.gather(*tasks)
+
+    assert [markdown for markdown, _ in results] == [f"# {url}" for url in urls]
+    assert all(len(batch) <= 4 for batch in sent)
+    assert sorted(url for batch in sent for url in batch) == sorted(urls)
+    await processor.close()
+
+
+async def test_failed_page_does_not_fail_its_batch(batches):
+    _, release = batches
+    release.set()
+    processor = _processor()
+
+    good, bad = await asyncio.gather(
+        processor.convert("https://example.com/good", "<p>good</p>"),
+        processor.convert("https://example.com/bad", "<p>bad</p>"),
+        return_exceptions=True,
+    )
+
+    assert good == ("# https://example.com/good", [])
+    assert isinstance(bad, ValueError)
+    await processor.close()
+
+
+async def test_close_stops_dispatchers_and_restarts_on_use(batches):
+    _, release = batches
+    release.set()
+    processor = _processor()
+    await processor.convert("https://example.com/a", "<p>a</p>")
+    dispatchers = processor._dispatchers
+
+    await processor.close()
+
+    assert all(task.cancelled() for task in dispatchers)
+    assert processor._dispatchers == []
+    assert processor._executor is None
+
+    processor._executor = ThreadPoolExecutor(max_workers=1)
+    assert await processor.convert("https://example.com/b", "<p>b</p>") == ("# https://example.com/b", [])
+    await processor.close()
+
+
+async def test_small_pages_convert_in_process(batches):
+    sent, _ = batches
+    processor = MarkdownProcessor(workers=1, inline_below=1000)
+
+    markdown, links = await processor.convert("https://example.com/", '<p>Hi <a href="/a">A</a></p>')
+
+    assert "Hi" in markdown
+    assert links == [("/a", "A")]
+    assert sent == []
+    assert processor._dispatchers == []
@@ -0,0 +1,119 @@
+import asyncio
+from pathlib import Path
+import time
+
+import httpx
+from loguru import logger
+import pytest
+
+from docs_updater.batch import load_scheduler_config
+from docs_updater.http_client import create_http_client
+from docs_updater.scheduler import SchedulerConfig, SchedulingTransport, scheduler_config
+
+
+def test_per_host_rate_caps_every_host():
+    config = scheduler_config(2.0, {"docs.example.com": 1.0})
+
+    assert config.default_rate == 2.0
+    assert config.host_rates == {"api.github.com": 2.0, "docs.example.com": 1.0}
+    assert scheduler_config() == SchedulerConfig()
+
+
+def test_sync_config_sets_rates(tmp_path: Path):
+    path = tmp_path / "sources.toml"
+    path.write_text(
+        'per_host_rate = 4\nhost_rates = { "api.github.com" = 1 }\n\n[[sources]]\nurl = "x"\nfolder = "x"\n'
+    )
+
+    assert load_scheduler_config(path) == scheduler_config(4, {"api.github.com": 1})
+    assert load_scheduler_config(path, per_host_rate=8).default_rate == 8
+
+
+async def test_requests_to_a_host_are_paced():
+    config = scheduler_config(20.0)
+    config.default_burst = 1
+    async with create_http_client(httpx.MockTransport(lambda request: httpx.Response(200)), config) as client:
+        started = time.monotonic()
+        await asyncio.gather(*(client.get(f"https://docs.example.com/{i}") for i in range(5)))
+        elapsed = time.monotonic() - started
+
+    # One request goes straight away, then one every 1/20s
+    assert elapsed >= 4 / 20 * 0.9
+
+
+@pytest.fixture
+def sleeps(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    """Record every delay the scheduler waits for, without actually waiting."""
+    recorded: list[float] = []
+    real_sleep = asyncio.sleep
+
+    async def sleep(delay: float) -> None:
+        recorded.append(delay)
+        await real_sleep(0)
+
+    monkeypatch.setattr(asyncio, "sleep", sleep)
+    return recorded
+
+
+async def _get(responses: list[httpx.Response], url: str = "https://docs.example.com/page") -> tuple[int, int]:
+    """GET through a scheduler whose server answers with `responses` in turn; returns the final status and calls."""
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        return responses[min(calls, len(responses)) - 1]
+
+    transport = SchedulingTransport(httpx.MockTransport(handler), SchedulerConfig(max_retries=2))
+    transport.github_token = None
+    async with httpx.AsyncClient(transport=transport) as client:
+        response = await client.get(url)
+    return response.status_code, calls
+
+
+async def test_429_waits_for_retry_after(sleeps: list[float]):
+    assert await _get([httpx.Response(429, headers={"retry-after": "7"}), httpx.Response(200)]) == (200, 2)
+    assert sleeps == [7.0]
+
+
+async def test_server_errors_back_off_exponentially(sleeps: list[float]):
+    assert await _get([httpx.Response(503), httpx.Response(502), httpx.Response(200)]) == (200, 3)
+    assert 0.25 <= sleeps[0] <= 0.5
+    assert 0.5 <= sleeps[1] <= 1.0
+
+
+async def test_retries_are_limited(sleeps: list[float]):
+    assert await _get([httpx.Response(500)]) == (500, 3)
+    assert len(sleeps) == 2
+
+
+async def test_github_rate_limit_waits_for_reset(sleeps: list[float]):
+    reset = str(int(time.time()) + 10)
+    limited = httpx.Response(403, headers={"x-ratelimit-remaining": "0", "x-ratelimit-reset": reset})
+
+    assert await _get([limited, httpx.Response(200)], "https://api.github.com/repos/o/r") == (200, 2)
+    assert 9 <= sleeps[0] <= 12
+
+
+async def test_secondary_rate_limit_403_is_retried(sleeps: list[float]):
+    assert await _get([httpx.Response(403, headers={"retry-after": "3"}), httpx.Response(200)]) == (200, 2)
+    assert sleeps == [3.0]
+
+
+async def test_other_403s_are_not_retried(sleeps: list[float]):
+    assert await _get([httpx.Response(403), httpx.Response(200)]) == (403, 1)
+    assert sleeps == []
+
+
+async def test_waits_over_max_wait_give_up_with_a_hint(sleeps: list[float]):
+    errors: list[str] = []
+    sink = logger.add(errors.append, level="ERROR", format="{message}")
+    try:
+        limited = httpx.Response(429, headers={"retry-after": "3600"})
+        status = await _get([limited, httpx.Response(200)], "https://api.github.com/repos/o/r")
+    finally:
+        logger.remove(sink)
+
+    assert status == (429, 1)
+    assert sleeps == []
+    assert "set GITHUB_TOKEN" in errors[0]
@@ -0,0 +1,87 @@
+import random
+
+import pytest
+
+from docs_updater.models import MarkdownFile
+from docs_updater.selection import SelectionTree
+
+PATHS = ["README.md", "docs/a.md", "docs/b.md", "docs/api/c.md", "docs/api/v2/d.md", "guide/e.md"]
+
+
+@pytest.fixture
+def files() -> list[MarkdownFile]:
+    return [MarkdownFile(url=f"https://example.com/{path}", path=path) for path in PATHS]
+
+
+def _selected(tree: SelectionTree) -> set[str]:
+    return {file.path for file in tree.selected_files()}
+
+
+def test_counts_and_listing(files: list[MarkdownFile]):
+    tree = SelectionTree([*files, files[0]])
+
+    dirs, top = tree.list_dir()
+    assert [node.path for node in dirs] == ["docs", "guide"]
+    assert [file.path for file in top] == ["README.md"]
+    assert tree.total == len(PATHS)
+    assert tree.dir_counts("docs") == (0, 4)
+    assert tree.dir_counts("docs/api") == (0, 2)
+
+
+def test_select_dir_then_single_files(files: list[MarkdownFile]):
+    tree = SelectionTree(files)
+
+    tree.set_dir("docs", True)
+    assert tree.selected == 4
+    assert tree.dir_counts("docs/api/v2") == (1, 1)
+
+    tree.toggle_file(files[3])  # docs/api/c.md
+    assert tree.dir_counts("docs") == (3, 4)
+    assert tree.dir_counts("docs/api") == (1, 2)
+    assert _selected(tree) == {"docs/a.md", "docs/b.md", "docs/api/v2/d.md"}
+
+    tree.toggle_dir("docs")
+    assert _selected(tree) == set(PATHS[1:5])
+    tree.toggle_dir("docs")
+    assert tree.selected == 0
+    assert not tree.is_selected(files[1])
+
+
+def test_nested_marks_are_resolved_in_order(files: list[MarkdownFile]):
+    tree = SelectionTree(files)
+
+    tree.set_dir("", True)
+    tree.set_dir("docs/api", False)
+    tree.set_dir("docs", True)
+    tree.set_file(files[4], False)
+
+    assert _selected(tree) == set(PATHS) - {"docs/api/v2/d.md"}
+    assert tree.selected == len(PATHS) - 1
+    assert tree.dir_counts("docs/api") == (1, 2)
+
+
+def test_matches_a_plain_set_under_random_operations():
+    rng = random.Random(0)
+    paths = [f"d{i % 3}/s{i % 5}/f{i}.md" for i in range(60)] + [f"f{i}.md" for i in range(5)]
+    files = {path: MarkdownFile(url=path, path=path) for path in paths}
+    dirs = sorted({path.rsplit("/", n)[0] for path in paths for n in (1, 2) if path.count("/") >= n} | {""})
+    tree = SelectionTree(list(files.values()))
+    expected: set[str] = set()
+
+    for _ in range(500):
+        if rng.random() < 0.5:
+            path = rng.choice(paths)
+            tree.toggle_file(files[path])
+            expected ^= {path}
+        else:
+            directory, selected = rng.choice(dirs), rng.random() < 0.5
+            tree.set_dir(directory, selected)
+            under = {path for path in paths if path.startswith(f"{directory}/") or not directory}
+            expected = expected | under if selected else expected - under
+
+        assert tree.selected == len(expected)
+        directory = rng.choice(dirs)
+        under = {path for path in expected if path.startswith(f"{directory}/") or not directory}
+        assert tree.dir_counts(directory)[0] == len(under)
+
+    assert _selected(tree) == expected
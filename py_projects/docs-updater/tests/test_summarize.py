@@ -0,0 +1,152 @@
+import asyncio
+from collections.abc import AsyncIterator, Awaitable, Callable
+import json
+from pathlib import Path
+import time
+
+import httpx
+from openai import AsyncOpenAI
+import pytest
+
+from docs_updater.llm.summarize import Summarizer, SummaryCache, _retry_after
+
+Handler = Callable[[httpx.Request], Awaitable[httpx.Response]]
+
+
+def _response(text: str) -> httpx.Response:
+    """A minimal Responses API reply whose output text is `text`."""
+    body = {
+        "id": "resp_1",
+        "object": "response",
+        "created_at": 0,
+        "model": "test-model",
+        "status": "completed",
+        "parallel_tool_calls": False,
+        "tool_choice": "auto",
+        "tools": [],
+        "output": [
+            {
+                "id": "msg_1",
+                "type": "message",
+                "role": "assistant",
+                "status": "completed",
+                "content": [{"type": "output_text", "text": text, "annotations": []}],
+            }
+        ],
+    }
+    return httpx.Response(200, json=body)
+
+
+class FakeApi:
+    """Answers Responses API calls with a summary of their input, after `rate_limited` 429 replies."""
+
+    def __init__(self, rate_limited: int = 0, retry_after: float = 0.05, delay: float = 0.0):
+        self.rate_limited = rate_limited
+        self.retry_after = retry_after
+        self.delay = delay
+        self.requests: list[tuple[float, str]] = []
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        text = json.loads(request.content)["input"]
+        self.requests.append((time.monotonic(), text))
+        limited = len(self.requests) <= self.rate_limited
+        await asyncio.sleep(self.delay)
+        if limited:
+            return httpx.Response(
+                429, json={"error": {"message": "slow down"}}, headers={"retry-after": str(self.retry_after)}
+            )
+        return _response(f"summary of {text}")
+
+
+@pytest.fixture
+async def make_summarizer(tmp_path: Path) -> AsyncIterator[Callable[..., Summarizer]]:
+    clients: list[httpx.AsyncClient] = []
+    cache = SummaryCache(tmp_path / "summaries.sqlite")
+
+    def make(api: FakeApi, **kwargs) -> Summarizer:
+        http_client = httpx.AsyncClient(transport=httpx.MockTransport(api))
+        clients.append(http_client)
+        client = AsyncOpenAI(api_key="test", base_url="http://llm.test/v1", http_client=http_client)
+        return Summarizer(client, model="test-model", cache=cache, **kwargs)
+
+    yield make
+    for client in clients:
+        await client.aclose()
+    cache.close()
+
+
+async def test_summaries_are_cached(make_summarizer: Callable[..., Summarizer]):
+    api = FakeApi()
+    summarizer = make_summarizer(api)
+
+    assert await summarizer.summarize("page one") == ("summary of page one", False)
+    assert await summarizer.summarize("page one") == ("summary of page one", True)
+    # A new summarizer sharing the cache, e.g. the next run, does not call the API either
+    assert await make_summarizer(api).summarize("page one") == ("summary of page one", True)
+    assert await summarizer.summarize("page one", instructions="other prompt") == ("summary of page one", False)
+
+    assert len(api.requests) == 2
+
+
+async def test_identical_requests_share_one_call(make_summarizer: Callable[..., Summarizer]):
+    api = FakeApi(delay=0.05)
+    summarizer = make_summarizer(api)
+
+    results = await asyncio.gather(*(summarizer.summarize(text) for text in ["same", "same", "same", "other"]))
+
+    assert [summary for summary, _ in results] == ["summary of same"] * 3 + ["summary of other"]
+    assert sorted(text for _, text in api.requests) == ["other", "same"]
+    assert summarizer.api_calls == 2
+
+
+async def test_rate_limits_back_off_and_lower_concurrency(make_summarizer: Callable[..., Summarizer]):
+    api = FakeApi(rate_limited=1, retry_after=0.2, delay=0.01)
+    summarizer = make_summarizer(api, max_concurrency=4)
+
+    limits: list[int] = []
+    rate_limited = summarizer.limiter.rate_limited
+
+    def record(retry_after: float) -> None:
+        rate_limited(retry_after)
+        limits.append(summarizer.limiter.limit)
+
+    summarizer.limiter.rate_limited = record
+    started = time.monotonic()
+    results = await asyncio.gather(*(summarizer.summarize(f"page {i}") for i in range(4)))
+
+    assert [summary for summary, _ in results] == [f"summary of page {i}" for i in range(4)]
+    assert limits == [2]
+    # Every request after the 429 waited for its Retry-After
+    assert all(sent >= started + 0.2 for sent, _ in api.requests[4:])
+    assert len(api.requests) == 5
+
+
+async def test_gives_up_after_max_retries(make_summarizer: Callable[..., Summarizer]):
+    from openai import RateLimitError
+
+    api = FakeApi(rate_limited=10, retry_after=0.01)
+    summarizer = make_summarizer(api, max_retries=2)
+
+    with pytest.raises(RateLimitError):
+        await summarizer.summarize("page")
+
+    assert len(api.requests) == 3
+
+
+@pytest.mark.parametrize(
+    ("headers", "expected"),
+    [
+        ({"retry-after": "3"}, (3.0, 3.0)),
+        ({"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"}, (1.0, 2.0)),
+        ({}, (1.0, 2.0)),
+        (None, (1.0, 2.0)),
+    ],
+)
+def test_retry_after_falls_back_to_backoff(headers: dict[str, str] | None, expected: tuple[float, float]):
+    request = httpx.Request("POST", "https://api.example.com/v1/responses")
+    error = httpx.HTTPStatusError(
+        "rate limited", request=request, response=httpx.Response(429, headers=headers, request=request)
+    )
+    low, high = expected
+
+    assert low <= _retry_after(error if headers is not None else ValueError("no response"), attempt=1) <= high
@@ -0,0 +1,113 @@
+from pathlib import Path
+
+import pytest
+
+from docs_updater.tokens import CHUNKS_MARKER, INDEX_NAME, chunk_folder, chunks_dir, report_folder, split_markdown
+
+pytestmark = pytest.mark.usefixtures("byte_encoder")
+
+
+@pytest.fixture
+def docs(tmp_path: Path) -> Path:
+    folder = tmp_path / "docs" / "site"
+    (folder / "sub").mkdir(parents=True)
+    (folder / "big.md").write_text("# Big\n\n" + "".join(f"## Part {i}\n\n{'word ' * 60}\n\n" for i in range(5)))
+    for i in range(4):
+        (folder / "sub" / f"small{i}.md").write_text(f"# Small {i}\n\nshort page\n")
+    return folder
+
+
+def test_report_counts_every_page(docs: Path):
+    report = report_folder(docs, budget=500)
+
+    assert len(report.files) == 5
+    assert [file.path for file in report.oversized] == ["big.md"]
+    assert (docs / INDEX_NAME).exists()
+
+
+def test_chunk_folder_splits_and_packs(docs: Path):
+    report = chunk_folder(docs, chunks_dir(docs), budget=500)
+
+    names = {file.path for file in report.files}
+    assert {"big.part-1.md", "big.part-2.md", "pack-001.md"} <= names
+    assert all(file.tokens <= 500 for file in report.files)
+    assert (docs / "big.md").exists()
+
+
+def test_chunk_folder_only_replaces_its_own_files(docs: Path):
+    output = chunks_dir(docs)
+    chunk_folder(docs, output, budget=500)
+    (output / "notes.md").write_text("kept")
+
+    (docs / "big.md").unlink()
+    chunk_folder(docs, output, budget=500)
+
+    assert not (output / "big.part-1.md").exists()
+    assert (output / "notes.md").read_text() == "kept"
+    assert (output / CHUNKS_MARKER).exists()
+
+
+@pytest.mark.parametrize("output", [".", "..", "sub"])
+def test_chunk_folder_refuses_overlapping_output(docs: Path, output: str):
+    with pytest.raises(ValueError, match="outside the folder"):
+        chunk_folder(docs, docs / output, budget=500)
+
+    assert (docs / "big.md").exists()
+
+
+def test_chunk_folder_refuses_foreign_folder(docs: Path):
+    other = docs.parent / "other"
+    other.mkdir()
+    (other / "b.md").write_text("someone else's docs")
+
+    with pytest.raises(ValueError, match="not written by a previous chunk run"):
+        chunk_folder(docs, other, budget=500)
+
+    assert (other / "b.md").exists()
+
+
+def _count(text: str) -> int:
+    return len(text)
+
+
+def test_split_keeps_heading_with_its_first_paragraph():
+    markdown = "# Intro\n\nshort\n\n## Long\n\n" + "\n\n".join(["x" * 30] * 4) + "\n\n## Tail\n\nend\n"
+
+    chunks = split_markdown(markdown, 40, _count)
+
+    assert "".join(chunks) == markdown
+    assert chunks[0] == "# Intro\n\nshort\n\n"
+    assert chunks[1].startswith("## Long\n\nxxx")
+    assert chunks[-1] == "## Tail\n\nend\n"
+    assert not any(chunk.rstrip().endswith("## Long") for chunk in chunks)
+
+
+def test_split_does_not_pack_paragraphs_across_sections():
+    markdown = "## A\n\n" + "a" * 30 + "\n\n" + "a" * 5 + "\n\n## B\n\nb\n"
+
+    chunks = split_markdown(markdown, 40, _count)
+
+    assert chunks == ["## A\n\n" + "a" * 30 + "\n", "\n" + "a" * 5 + "\n\n", "## B\n\nb\n"]
+
+
+@pytest.mark.parametrize(
+    ("opener", "inner", "closer"), [("~~~", "```", "~~~"), ("```", "~~~", "```"), ("````", "```", "````")]
+)
+def test_split_never_breaks_inside_a_code_block(opener: str, inner: str, closer: str):
+    code = f"{opener}\n{inner}\n\n# not a heading\n\n{inner}\n{closer}\n"
+    markdown = "# Start\n\n" + "s" * 30 + "\n\n" + code + "\n# End\n\n" + "e" * 30 + "\n"
+
+    chunks = split_markdown(markdown, 40, _count)
+
+    assert "".join(chunks) == markdown
+    assert any(code in chunk for chunk in chunks)
+
+
+def test_report_keeps_pages_named_like_an_index(docs: Path):
+    (docs / "_index.md").write_text("# Section\n\nA Hugo section page.\n")
+
+    report = report_folder(docs)
+
+    assert "_index.md" in {file.path for file in report.files}
+    assert (docs / "_index.md").read_text() == "# Section\n\nA Hugo section page.\n"
+    assert INDEX_NAME not in {file.path for file in report_folder(docs).files}
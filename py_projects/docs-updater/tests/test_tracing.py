@@ -0,0 +1,80 @@
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+
+from docs_updater import tracing
+from docs_updater.tracing import Tracer, span
+
+
+@pytest.fixture
+def tracer(monkeypatch: pytest.MonkeyPatch) -> Tracer:
+    tracer = Tracer()
+    monkeypatch.setattr(tracing, "tracer", tracer)
+    return tracer
+
+
+def test_spans_are_not_recorded_until_enabled(tracer: Tracer):
+    with span("crawl.page", url="https://example.com/"):
+        pass
+
+    assert tracer.spans == []
+
+
+def test_nested_spans_export_as_chrome_trace(tracer: Tracer, tmp_path: Path):
+    tracer.enabled = True
+    with span("crawl.page", url="https://example.com/") as outer:
+        with span("browser.navigate"):
+            pass
+        with pytest.raises(ValueError, match="bad page"), span("crawl.parse"):
+            raise ValueError("bad page")
+        outer.set(bytes=42)
+
+    path = tmp_path / "trace.json"
+    tracer.write(path)
+    trace = json.loads(path.read_text())
+
+    assert trace["displayTimeUnit"] == "ms"
+    events = {event["name"]: event for event in trace["traceEvents"]}
+    assert list(events) == ["browser.navigate", "crawl.parse", "crawl.page"]
+    page, navigate = events["crawl.page"], events["browser.navigate"]
+    assert {event["ph"] for event in events.values()} == {"X"}
+    assert (page["cat"], navigate["cat"]) == ("crawl", "browser")
+    assert page["args"] == {"url": "https://example.com/", "bytes": 42}
+    assert events["crawl.parse"]["args"] == {"error": "ValueError"}
+    # Children run inside their parent, on the same track
+    assert page["ts"] <= navigate["ts"]
+    assert navigate["ts"] + navigate["dur"] <= page["ts"] + page["dur"]
+    assert navigate["tid"] == page["tid"]
+
+
+async def test_concurrent_tasks_get_their_own_tracks(tracer: Tracer):
+    tracer.enabled = True
+
+    async def fetch(i: int) -> None:
+        with span("crawl.fetch", i=i):
+            await asyncio.sleep(0)
+
+    await asyncio.gather(*(fetch(i) for i in range(3)))
+
+    events = tracer.to_chrome()["traceEvents"]
+    assert len({event["tid"] for event in events}) == 3
+
+
+def test_summary_reports_percentiles_per_stage(tracer: Tracer):
+    tracer.enabled = True
+    # 0, 1, ..., 100 ms, so the percentiles fall on exact values
+    for ms in range(101):
+        tracer.record("crawl.fetch", 0, ms * 1_000_000)
+    tracer.record("crawl.parse", 0, 2_000_000)
+
+    header, fetch, parse = tracer.summary().splitlines()
+
+    assert header.split() == ["stage", "count", "p50", "ms", "p95", "ms", "total", "s"]
+    assert fetch.split() == ["crawl.fetch", "101", "50.0", "95.0", "5.05"]
+    assert parse.split() == ["crawl.parse", "1", "2.0", "2.0", "0.00"]
+
+
+def test_summary_without_spans(tracer: Tracer):
+    assert tracer.summary() == "No spans recorded"
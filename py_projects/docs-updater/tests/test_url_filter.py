@@ -0,0 +1,65 @@
+import pytest
+
+from docs_updater.url_filter import PrefixTrie, UrlFilter, parse_rules, scope_prefix
+
+
+def test_prefix_trie_finds_the_longest_prefix():
+    trie = PrefixTrie()
+    trie.add("example.com/docs/", "docs")
+    trie.add("example.com/docs/v2/", "v2")
+
+    assert trie.match("example.com/docs/v2/intro") == "v2"
+    assert trie.match("example.com/docs/v1/intro") == "docs"
+    assert trie.match("example.com/docsite/") is None
+    assert trie.match("other.com/docs/") is None
+
+
+@pytest.mark.parametrize(
+    ("seed_path", "expected"),
+    [("/", ""), ("", ""), ("/docs", "/docs/"), ("/docs/", "/docs/"), ("/docs/index.html", "/docs/")],
+)
+def test_scope_prefix(seed_path: str, expected: str):
+    assert scope_prefix(seed_path) == expected
+
+
+@pytest.mark.parametrize(
+    ("url", "accepted", "reason"),
+    [
+        ("https://example.com/guide/intro", True, "under the seed path"),
+        ("https://example.com/guide", False, "no include rule"),
+        ("https://example.com/v2/intro", True, "include rule '/v2/'"),
+        ("https://example.com/guide/changelog", False, "exclude rule '*changelog*'"),
+        ("https://example.com/guide/v1/old", False, "exclude rule 're:/v1/'"),
+        ("https://example.com/guide/logo.png", False, "exclude rule"),
+        ("https://example.com/blog/post", False, "no include rule"),
+        ("https://example.com/reference/api", True, "looks like documentation"),
+        ("https://example.com/notes.md", True, "looks like documentation"),
+        ("https://example.com.evil.test/guide/", False, "different site"),
+        ("http://example.com/guide/intro", False, "different site"),
+    ],
+)
+def test_url_filter_decisions(url: str, accepted: bool, reason: str):
+    url_filter = UrlFilter("https://example.com/guide/", include=["/v2/"], exclude=["*changelog*", "re:/v1/"])
+
+    decision = url_filter.explain(url)
+
+    assert decision.accepted is accepted
+    assert reason in decision.reason
+    assert url_filter.accepts(url) is accepted
+
+
+def test_exclude_rules_win_over_include_rules():
+    url_filter = UrlFilter("https://example.com/", include=["/api/"], exclude=["/api/internal/"])
+
+    assert url_filter.accepts("https://example.com/api/public")
+    assert not url_filter.accepts("https://example.com/api/internal/secret")
+
+
+def test_host_prefix_rules_apply_to_the_named_host():
+    url_filter = UrlFilter("https://example.com/", include=["example.com/blog/"])
+
+    assert url_filter.explain("https://example.com/blog/post").reason == "matches include rule 'example.com/blog/'"
+
+
+def test_parse_rules():
+    assert parse_rules("+/api/ -*changelog* /v2/ - +") == (["/api/", "/v2/"], ["*changelog*"])